@@ -0,0 +1,143 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from apps.netbox_api.netbox_client import get_netbox_client
+
+
+# отдельный пул потоков под I/O к NetBox: event loop не блокируется,
+# а число одновременных запросов ограничено NETBOX_ASYNC_MAX_WORKERS
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_netbox_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.NETBOX_ASYNC_MAX_WORKERS,
+                    thread_name_prefix="netbox-io",
+                )
+    return _executor
+
+
+async def run_in_netbox_executor(func, *args, **kwargs):
+    """Выполняет блокирующий вызов pynetbox в пуле, сохраняя contextvars."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_netbox_executor(), call)
+
+
+class AsyncNetBoxClient:
+    """
+    Async-обёртка над NetBoxClient с тем же набором под-клиентов:
+    general / assets / devices. HTTP идёт через общий пул соединений.
+    """
+    def __init__(self, client=None):
+        self.sync_client = client or get_netbox_client()
+
+        self.jira_url = self.sync_client.jira_url
+        self.netbox_url = self.sync_client.netbox_url
+
+        # под-клиенты
+        self.general = AsyncNetBoxGeneral(self.sync_client.general)
+        self.assets = AsyncNetBoxAssets(self.sync_client.assets)
+        self.devices = AsyncNetBoxDevices(self.sync_client.devices)
+
+
+class AsyncNetBoxBase:
+    """Базовый класс для async под-клиентов (оборачивает sync под-клиент)."""
+    def __init__(self, sync):
+        self.sync = sync
+
+    async def _call(self, method_name, *args, **kwargs):
+        return await run_in_netbox_executor(getattr(self.sync, method_name), *args, **kwargs)
+
+    async def _list(self, method_name, *args, **kwargs):
+        # RecordSet ленивый: выкачиваем все страницы в потоке, а не в event loop
+        method = getattr(self.sync, method_name)
+        return await run_in_netbox_executor(lambda: list(method(*args, **kwargs)))
+
+
+class AsyncNetBoxGeneral(AsyncNetBoxBase):
+    """General: sites, locations, journal."""
+    # SITES GET
+    async def get_sites(self, **filters):
+        return await self._list("get_sites", **filters)
+
+    async def get_locations(self, **filters):
+        return await self._list("get_locations", **filters)
+
+    # JOURNAL POST
+    async def create_journal_entry(self, data: dict):
+        return await self._call("create_journal_entry", data)
+
+    async def delete_journal_entry(self, entry):
+        return await self._call("delete_journal_entry", entry)
+
+
+class AsyncNetBoxAssets(AsyncNetBoxBase):
+    """Inventory (assets): get/post/update/delete."""
+    # ASSET GET
+    async def get_assets(self, **filters):
+        return await self._list("get_assets", **filters)
+
+    async def get_asset_by_id(self, asset_id: int):
+        return await self._call("get_asset_by_id", asset_id)
+
+    async def get_assets_data(self, **filters):
+        return await self._list("get_assets_data", **filters)
+
+    async def get_assets_page_data(self, limit: int, offset: int = 0, **filters):
+        return await self._call("get_assets_page_data", limit, offset, **filters)
+
+    async def get_asset_data_by_id(self, asset_id: int):
+        return await self._call("get_asset_data_by_id", asset_id)
+
+    async def get_assets_by_ids(self, asset_ids: list[int], chunk_size: int = None) -> dict:
+        return await self._call("get_assets_by_ids", asset_ids, chunk_size)
+
+    async def get_asset_types(self, **filters):
+        return await self._list("get_asset_types", **filters)
+
+    # ASSET POST
+    async def delete_asset(self, asset):
+        return await self._call("delete_asset", asset)
+
+    async def create_assets(self, assets_data: list[dict]):
+        """Массовое создание assets в NetBox"""
+        return await self._call("create_assets", assets_data)
+
+    async def bulk_create_assets(self, assets_data: list[dict], chunk_size: int = None, max_workers: int = None):
+        return await self._call("bulk_create_assets", assets_data, chunk_size, max_workers)
+
+    async def update_asset(self, asset, data: dict):
+        return await self._call("update_asset", asset, data)
+
+    async def bulk_update_assets(self, updates: list[dict], chunk_size: int = None):
+        return await self._call("bulk_update_assets", updates, chunk_size)
+
+    async def bulk_delete_assets(self, asset_ids: list[int], chunk_size: int = None):
+        return await self._call("bulk_delete_assets", asset_ids, chunk_size)
+
+
+class AsyncNetBoxDevices(AsyncNetBoxBase):
+    """Device: get/update."""
+
+    # DEVICE GET
+    async def get_device(self, device_id: int):
+        return await self._call("get_device", device_id)
+
+    # DEVICE POST
+    async def update_device(self, device, data: dict):
+        return await self._call("update_device", device, data)
+
+    async def patch_device(self, device_id: int, data: dict):
+        return await self._call("patch_device", device_id, data)
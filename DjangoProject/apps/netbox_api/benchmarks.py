@@ -0,0 +1,232 @@
+"""
+Микробенчмарки горячих мест сервисного слоя (manage.py bench_services).
+
+Данные — синтетические объекты с интерфейсом pynetbox Record (атрибуты
+и []) или сырой JSON NetBox, NetBox не нужен. baseline хранится в BASELINE_PATH.
+
+Время зависит от машины и её загрузки, поэтому сравнение идёт в единицах
+калибровки — фиксированного цикла на чистом Python. Калибровка меряется
+парой к каждому замеру (соседи по серверу мешают обоим одинаково), из repeat
+пар берётся медиана отношения time / calibration.
+
+Единицы сравнимы только на той же машине и версии Python: baseline с другого
+хоста показывается для справки, но не роняет проверку (см. same_host).
+"""
+import gc
+import json
+import platform
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+
+from apps.netbox_api.services.assets import (
+    AssetsService,
+    build_assets_payload,
+    build_site_location_map,
+    simplify_asset_data,
+)
+from apps.netbox_api.services.journal import build_assets_modernization_journal, build_assets_repair_journal
+
+BASELINE_PATH = Path(__file__).with_name("benchmarks_baseline.json")
+
+SIZES = (1_000, 10_000, 100_000)
+
+# минимальная длительность одного замера, сек
+MIN_MEASURE_TIME = 0.05
+
+NETBOX_URL = "https://netbox.example"
+JIRA_URL = "https://jira.example/browse"
+
+
+class BenchRecord(SimpleNamespace):
+    """Как pynetbox Record: доступ и через атрибут, и через []"""
+
+    def __getitem__(self, item):
+        return getattr(self, item)
+
+
+def make_assets(size: int) -> list:
+    types = [BenchRecord(id=i, model=f"Model {i}", display=f"Model {i}") for i in range(1, 41)]
+    locations = [BenchRecord(id=i, name=f"ЗИП {i}", display=f"ЗИП {i}") for i in range(1, 26)]
+    return [
+        BenchRecord(
+            id=i,
+            display=f"SN{i:010d}",
+            serial=f"SN{i:010d}",
+            status=BenchRecord(value="stored", label="Stored"),
+            inventoryitem_type=types[i % len(types)],
+            storage_location=locations[i % len(locations)],
+            custom_fields={"DeliveryTask": f"DT-{i % 300}", "Install_in": None, "ModernizationDate": None},
+        )
+        for i in range(size)
+    ]
+
+
+def make_assets_data(size: int) -> list[dict]:
+    """То же, что make_assets, но сырым JSON NetBox (list-эндпоинт)"""
+    return [
+        {
+            "id": i,
+            "display": f"SN{i:010d}",
+            "serial": f"SN{i:010d}",
+            "status": {"value": "stored", "label": "Stored"},
+            "inventoryitem_type": {"id": 1 + i % 40, "model": f"Model {1 + i % 40}", "display": f"Model {1 + i % 40}"},
+            "storage_location": {"id": 1 + i % 25, "name": f"ЗИП {1 + i % 25}", "display": f"ЗИП {1 + i % 25}"},
+            "custom_fields": {"DeliveryTask": f"DT-{i % 300}", "Install_in": None, "ModernizationDate": None},
+        }
+        for i in range(size)
+    ]
+
+
+def make_items(size: int) -> list[dict]:
+    """items для create_assets на size assets: по 10 штук, половина с серийниками"""
+    items = []
+    for i in range(max(1, size // 10)):
+        item = {"inventoryitem_type_id": 1 + i % 40, "count": 10}
+        if i % 2:
+            item["serials"] = [f"SN{i:08d}{j}" for j in range(10)]
+        items.append(item)
+    return items
+
+
+def make_sites_and_locations(size: int):
+    """size локаций, по 20 на сайт"""
+    sites = [BenchRecord(id=i, name=f"DC-{i}") for i in range(max(1, size // 20))]
+    locations = [
+        BenchRecord(id=i, name=f"ЗИП {i}", site=BenchRecord(id=i % len(sites), name=sites[i % len(sites)].name))
+        for i in range(size)
+    ]
+    return sites, locations
+
+
+def _journal_kwargs(assets) -> dict:
+    return {
+        "device": BenchRecord(id=1, name="srv-1", asset_tag="TAG000001"),
+        "assets": assets,
+        "jira_task": "DC-1",
+        "netbox_url": NETBOX_URL,
+        "jira_url": JIRA_URL,
+    }
+
+
+def _simplify(assets):
+    # без клиента NetBox: _simplify_asset его не использует
+    service = AssetsService.__new__(AssetsService)
+    return [service._simplify_asset(a) for a in assets]
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: callable  # size -> данные (в замер не входит)
+    run: callable  # данные -> результат
+
+
+BENCHMARKS = (
+    Benchmark("simplify_asset", make_assets, _simplify),
+    Benchmark("simplify_asset_data", make_assets_data, lambda data: [simplify_asset_data(a) for a in data]),
+    Benchmark("create_assets_payload", make_items, lambda items: build_assets_payload(items, 1, "DT-1")),
+    Benchmark("site_location_map", make_sites_and_locations, lambda data: build_site_location_map(*data)),
+    Benchmark("repair_journal", make_assets, lambda assets: build_assets_repair_journal(**_journal_kwargs(assets))),
+    Benchmark(
+        "modernization_journal",
+        make_assets,
+        lambda assets: build_assets_modernization_journal(**_journal_kwargs(assets)),
+    ),
+)
+
+
+def host_id() -> str:
+    """Машина и интерпретатор, на которых единицы калибровки сравнимы"""
+    return f"{platform.node()} {platform.machine()} {platform.python_implementation()} {platform.python_version()}"
+
+
+def _timed_loop(func, number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - started
+
+
+def _autorange(func) -> int:
+    """Сколько вызовов в замере, чтобы он занял MIN_MEASURE_TIME (как timeit.autorange)"""
+    number = 1
+    while _timed_loop(func, number) < MIN_MEASURE_TIME:
+        number *= 2
+    return number
+
+
+def _calibration_work():
+    """Эталонная нагрузка: цикл со словарями и f-строками, ~ как в сервисном слое"""
+    return [{"id": i, "name": f"item-{i}"} for i in range(10_000)]
+
+
+def measure(func, repeat: int) -> tuple[float, float]:
+    """
+    (секунды, единицы калибровки) одного вызова: медианы из repeat пар
+    «калибровка, замер». GC на время замеров выключен.
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        number, calibration_number = _autorange(func), _autorange(_calibration_work)
+        seconds, units = [], []
+        for _ in range(repeat):
+            calibration = _timed_loop(_calibration_work, calibration_number) / calibration_number
+            elapsed = _timed_loop(func, number) / number
+            seconds.append(elapsed)
+            units.append(elapsed / calibration)
+        return statistics.median(seconds), statistics.median(units)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def run_benchmarks(sizes=SIZES, repeat: int = 9, names=None) -> dict:
+    """{"host": ..., "seconds": {"имя/размер": сек}, "results": {"имя/размер": единицы калибровки}}"""
+    seconds, results = {}, {}
+    for benchmark in BENCHMARKS:
+        if names and benchmark.name not in names:
+            continue
+        for size in sizes:
+            data = benchmark.setup(size)
+            key = f"{benchmark.name}/{size}"
+            seconds[key], results[key] = measure(lambda: benchmark.run(data), repeat)
+    return {"host": host_id(), "seconds": seconds, "results": results}
+
+
+def same_host(current: dict, baseline: dict) -> bool:
+    return bool(baseline) and baseline.get("host") == current["host"]
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[dict]:
+    """
+    Строки сравнения с baseline; regression — время в единицах калибровки
+    выросло больше чем на threshold (0.25 = +25%).
+    """
+    rows = []
+    for key, units in current["results"].items():
+        base = baseline.get("results", {}).get(key)
+        row = {"benchmark": key, "seconds": current["seconds"][key], "ratio": None, "regression": False}
+        if base:
+            ratio = units / base
+            row.update(ratio=ratio, regression=ratio > 1 + threshold)
+        rows.append(row)
+    return rows
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> dict:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_baseline(current: dict, path: Path = BASELINE_PATH):
+    """Прогон части бенчмарков обновляет только их, если baseline с той же машины; иначе пишется заново"""
+    baseline = load_baseline(path)
+    results = dict(baseline.get("results", {})) if same_host(current, baseline) else {}
+    results.update(current["results"])
+    data = {"host": current["host"], "results": results}
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
@@ -0,0 +1,410 @@
+"""
+Локальный фиктивный NetBox для нагрузочных тестов (manage.py fake_netbox, load_test).
+
+Реализует только то, чем пользуется этот сервис:
+    dcim: sites, locations, devices; extras: journal-entries;
+    plugins/inventory: assets, inventory-item-types.
+Списки с limit/offset/next, фильтры по полям (id, *_id, status, tag,
+last_updated__gte), ?fields=, bulk POST/PATCH/DELETE и операции по id.
+
+Данные синтетические (FakeNetBoxDataset.generate) и живут в памяти,
+latency — искусственная задержка каждого ответа.
+"""
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+API_PREFIX = "/api/"
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+ENDPOINTS = (
+    "dcim/sites",
+    "dcim/locations",
+    "dcim/devices",
+    "extras/journal-entries",
+    "plugins/inventory/assets",
+    "plugins/inventory/inventory-item-types",
+)
+
+# endpoint -> {поле: endpoint объекта, на который оно ссылается}
+REFERENCES = {
+    "dcim/locations": {"site": "dcim/sites"},
+    "dcim/devices": {"site": "dcim/sites", "location": "dcim/locations"},
+    "plugins/inventory/assets": {
+        "inventoryitem_type": "plugins/inventory/inventory-item-types",
+        "storage_site": "dcim/sites",
+        "storage_location": "dcim/locations",
+    },
+}
+
+# поля-choices NetBox отдаёт как {"value", "label"}
+CHOICE_FIELDS = ("status", "kind")
+
+# параметры запроса, которые не являются фильтрами
+CONTROL_PARAMS = ("limit", "offset", "fields", "brief", "ordering")
+
+
+class FakeNetBoxError(Exception):
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class FakeNetBoxDataset:
+    """Объекты по endpoint: {endpoint: {id: dict}}; ссылки хранятся как id"""
+
+    def __init__(self):
+        self.objects = {endpoint: {} for endpoint in ENDPOINTS}
+        self._next_id = {endpoint: 1 for endpoint in ENDPOINTS}
+        self.lock = threading.RLock()
+
+    @classmethod
+    def generate(
+        cls,
+        sites: int = 5,
+        locations: int = 4,
+        devices: int = 200,
+        asset_types: int = 40,
+        assets: int = 10_000,
+        seed: int = 1,
+    ) -> "FakeNetBoxDataset":
+        """locations — на каждый сайт; 20% assets установлены в устройства"""
+        rnd = random.Random(seed)
+        dataset = cls()
+        started = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+        def updated(i):
+            return (started + timedelta(minutes=i)).isoformat()
+
+        for i in range(1, sites + 1):
+            dataset.add("dcim/sites", {
+                "name": f"DC-{i}", "slug": f"dc-{i}", "tags": ["dc"], "last_updated": updated(i),
+            })
+        site_ids = list(dataset.objects["dcim/sites"])
+        for site_id in site_ids:
+            for j in range(1, locations + 1):
+                dataset.add("dcim/locations", {
+                    "name": f"ЗИП {site_id}-{j}", "slug": f"zip-{site_id}-{j}", "site": site_id,
+                    "last_updated": updated(site_id * 100 + j),
+                })
+        location_ids = list(dataset.objects["dcim/locations"])
+        for i in range(1, asset_types + 1):
+            dataset.add("plugins/inventory/inventory-item-types", {
+                "model": f"Model {i}", "slug": f"model-{i}", "last_updated": updated(i),
+            })
+        type_ids = list(dataset.objects["plugins/inventory/inventory-item-types"])
+        for i in range(1, devices + 1):
+            dataset.add("dcim/devices", {
+                "name": f"srv-{i}", "asset_tag": f"TAG{i:06d}", "site": rnd.choice(site_ids),
+                "custom_fields": {"ModernizationDate": None}, "last_updated": updated(i),
+            })
+        device_ids = list(dataset.objects["dcim/devices"])
+        for i in range(1, assets + 1):
+            used = rnd.random() < 0.2
+            dataset.add("plugins/inventory/assets", {
+                "serial": f"SN{i:010d}",
+                "status": "used" if used else "stored",
+                "inventoryitem_type": rnd.choice(type_ids),
+                "storage_location": None if used else rnd.choice(location_ids),
+                "custom_fields": {
+                    "DeliveryTask": f"DT-{1 + i % 300}",
+                    "Install_in": rnd.choice(device_ids) if used and device_ids else None,
+                    "ModernizationDate": None,
+                },
+                "last_updated": updated(i),
+            })
+        return dataset
+
+    def add(self, endpoint: str, data: dict) -> dict:
+        with self.lock:
+            object_id = self._next_id[endpoint]
+            self._next_id[endpoint] += 1
+            obj = {"id": object_id, "last_updated": _now(), **data}
+            self.objects[endpoint][object_id] = obj
+            return obj
+
+    def ids(self, endpoint: str, **filters) -> list[int]:
+        """id объектов, совпадающих по значениям полей (для генераторов нагрузки)"""
+        with self.lock:
+            return [
+                obj["id"] for obj in self.objects[endpoint].values()
+                if all(obj.get(k) == v for k, v in filters.items())
+            ]
+
+    # ---- чтение ----
+
+    def get(self, endpoint: str, object_id: int) -> dict:
+        obj = self.objects[endpoint].get(object_id)
+        if obj is None:
+            raise FakeNetBoxError(404, "No object matches the given query.")
+        return obj
+
+    def filter(self, endpoint: str, params: dict) -> list[dict]:
+        filters = {k: v for k, v in params.items() if k not in CONTROL_PARAMS}
+        with self.lock:
+            objects = list(self.objects[endpoint].values())
+        return [obj for obj in objects if all(self._match(obj, k, v) for k, v in filters.items())]
+
+    @staticmethod
+    def _match(obj: dict, key: str, values: list[str]) -> bool:
+        if key.endswith("__gte"):
+            value = obj.get(key[:-5])
+            return value is not None and str(value) >= values[0]
+        if key == "tag":
+            return any(tag in obj.get("tags", []) for tag in values)
+        if key.startswith("cf_"):
+            value = (obj.get("custom_fields") or {}).get(key[3:])
+        elif key.endswith("_id") and key[:-3] in obj:
+            value = obj[key[:-3]]
+        else:
+            value = obj.get(key)
+        return str(value) in values
+
+    # ---- запись ----
+
+    def create(self, endpoint: str, data: dict) -> dict:
+        return self.add(endpoint, self._writable(endpoint, data))
+
+    def update(self, endpoint: str, object_id: int, data: dict) -> dict:
+        with self.lock:
+            obj = self.get(endpoint, object_id)
+            data = self._writable(endpoint, data)
+            custom_fields = data.pop("custom_fields", None)
+            obj.update(data)
+            if custom_fields:
+                obj["custom_fields"] = {**(obj.get("custom_fields") or {}), **custom_fields}
+            obj["last_updated"] = _now()
+            return obj
+
+    def delete(self, endpoint: str, object_id: int):
+        with self.lock:
+            self.get(endpoint, object_id)
+            del self.objects[endpoint][object_id]
+
+    def _writable(self, endpoint: str, data: dict) -> dict:
+        if not isinstance(data, dict):
+            raise FakeNetBoxError(400, "Ожидался объект")
+        data = {k: v for k, v in data.items() if k not in ("id", "url", "display", "last_updated")}
+        for field, target in REFERENCES.get(endpoint, {}).items():
+            value = data.get(field)
+            if isinstance(value, dict):
+                value = data[field] = value.get("id")
+            if value is not None and value not in self.objects[target]:
+                raise FakeNetBoxError(400, f"{field}: Related object not found using the provided numeric ID: {value}")
+        for field in CHOICE_FIELDS:
+            if isinstance(data.get(field), dict):
+                data[field] = data[field].get("value")
+        return data
+
+    # ---- сериализация ----
+
+    def serialize(self, endpoint: str, obj: dict, base_url: str, fields: list[str] = None) -> dict:
+        result = {"id": obj["id"], "url": f"{base_url}{endpoint}/{obj['id']}/", "display": self._display(obj)}
+        references = REFERENCES.get(endpoint, {})
+        for key, value in obj.items():
+            if key == "id":
+                continue
+            if key in references:
+                target = self.objects[references[key]].get(value) if value is not None else None
+                value = self._brief(references[key], target, base_url) if target else None
+            elif key in CHOICE_FIELDS and value is not None:
+                value = {"value": value, "label": str(value).capitalize()}
+            elif key == "tags":
+                value = [{"name": tag, "slug": tag} for tag in value]
+            result[key] = value
+        if fields:
+            result = {k: v for k, v in result.items() if k in fields}
+        return result
+
+    def _brief(self, endpoint: str, obj: dict, base_url: str) -> dict:
+        brief = {"id": obj["id"], "url": f"{base_url}{endpoint}/{obj['id']}/", "display": self._display(obj)}
+        for key in ("name", "slug", "model"):
+            if key in obj:
+                brief[key] = obj[key]
+        return brief
+
+    @staticmethod
+    def _display(obj: dict) -> str:
+        return str(obj.get("name") or obj.get("model") or obj.get("serial") or obj["id"])
+
+
+class FakeNetBoxHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # заголовки и тело одним сегментом, иначе keep-alive упирается в delayed ACK (~40 мс)
+    disable_nagle_algorithm = True
+    wbufsize = -1
+    server: "FakeNetBoxHTTPServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_PUT(self):
+        self._handle("PATCH")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def _handle(self, method: str):
+        if self.server.latency:
+            time.sleep(self.server.latency * (1 + random.uniform(-self.server.jitter, self.server.jitter)))
+        self.server.requests += 1
+        try:
+            status, body = self._dispatch(method)
+        except FakeNetBoxError as e:
+            status, body = e.status, {"detail": e.detail}
+        self._send(status, body)
+
+    def _dispatch(self, method: str):
+        url = urlsplit(self.path)
+        path = url.path
+        if not path.startswith(API_PREFIX):
+            raise FakeNetBoxError(404, "Not found.")
+        path = path[len(API_PREFIX):].strip("/")
+        endpoint, _, object_id = path.rpartition("/")
+        if not object_id.isdigit():
+            endpoint, object_id = path, None
+        if endpoint not in ENDPOINTS:
+            raise FakeNetBoxError(404, "Not found.")
+
+        dataset = self.server.dataset
+        params = parse_qs(url.query)
+        fields = params["fields"][0].split(",") if params.get("fields") else None
+        base_url = f"http://{self.headers.get('Host')}{API_PREFIX}"
+
+        def out(obj):
+            return dataset.serialize(endpoint, obj, base_url, fields)
+
+        if object_id is not None:
+            object_id = int(object_id)
+            if method == "GET":
+                return 200, out(dataset.get(endpoint, object_id))
+            if method == "PATCH":
+                return 200, out(dataset.update(endpoint, object_id, self._body()))
+            if method == "DELETE":
+                dataset.delete(endpoint, object_id)
+                return 204, None
+            raise FakeNetBoxError(405, f'Method "{method}" not allowed.')
+
+        if method == "GET":
+            return 200, self._page(endpoint, params, out)
+
+        body = self._body()
+        items = body if isinstance(body, list) else [body]
+        # NetBox выполняет bulk-запрос в одной транзакции — проверяем всё до изменений
+        with dataset.lock:
+            if method == "POST":
+                for item in items:
+                    dataset._writable(endpoint, item)
+                created = [out(dataset.create(endpoint, item)) for item in items]
+                return 201, created if isinstance(body, list) else created[0]
+            for item in items:
+                dataset.get(endpoint, (item or {}).get("id"))
+            if method == "PATCH":
+                return 200, [out(dataset.update(endpoint, item["id"], item)) for item in items]
+            if method == "DELETE":
+                for item in items:
+                    dataset.delete(endpoint, item["id"])
+                return 204, None
+        raise FakeNetBoxError(405, f'Method "{method}" not allowed.')
+
+    def _page(self, endpoint: str, params: dict, out) -> dict:
+        objects = self.server.dataset.filter(endpoint, params)
+        limit = int(params.get("limit", [DEFAULT_PAGE_SIZE])[0]) or MAX_PAGE_SIZE
+        limit = min(limit, MAX_PAGE_SIZE)
+        offset = int(params.get("offset", [0])[0])
+        page = objects[offset:offset + limit]
+
+        next_url = None
+        if offset + limit < len(objects):
+            query = {k: v for k, v in params.items() if k not in ("limit", "offset")}
+            query.update(limit=[limit], offset=[offset + limit])
+            next_url = f"http://{self.headers.get('Host')}{API_PREFIX}{endpoint}/?{urlencode(query, doseq=True)}"
+        return {"count": len(objects), "next": next_url, "previous": None, "results": [out(o) for o in page]}
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"null")
+        except ValueError:
+            raise FakeNetBoxError(400, "JSON parse error")
+
+    def _send(self, status: int, body):
+        data = b"" if body is None else json.dumps(body, ensure_ascii=False).encode()
+        self.send_response(status)
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("API-Version", "4.2")
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FakeNetBoxHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, dataset: FakeNetBoxDataset, latency: float = 0.0, jitter: float = 0.0):
+        super().__init__(address, FakeNetBoxHandler)
+        self.dataset = dataset
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+
+
+class FakeNetBox:
+    """
+    Фиктивный NetBox в фоновом потоке:
+        with FakeNetBox(FakeNetBoxDataset.generate(assets=1000), latency=0.02) as netbox:
+            ... settings.NETBOX_URL = netbox.url ...
+    latency — задержка ответа, сек; jitter — разброс задержки (доля от latency).
+    """
+
+    def __init__(self, dataset: FakeNetBoxDataset = None, host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0):
+        self.dataset = dataset or FakeNetBoxDataset.generate()
+        self.server = FakeNetBoxHTTPServer((host, port), self.dataset, latency, jitter)
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeNetBox":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-netbox", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
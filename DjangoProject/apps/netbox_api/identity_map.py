@@ -0,0 +1,148 @@
+"""
+Identity map запросов к NetBox в рамках одного HTTP-запроса.
+
+Внутри identity_scope() (его открывает NetBoxIdentityMapMiddleware)
+уже загруженные Records возвращаются без повторного GET:
+ключ — (endpoint, поле, значение), например ("dcim.devices", "id", 10).
+Вне scope (management-команды, фоновые потоки без контекста) всё
+идёт в NetBox как раньше.
+
+Записи по endpoint сбрасываются при изменении объектов через клиент.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class IdentityMap:
+    def __init__(self):
+        self._records = {}
+        # шаги workflow работают в других потоках с тем же map
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            record = self._records.get(key, _MISSING)
+            if record is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return record
+
+    def put(self, key, record):
+        with self._lock:
+            self._records[key] = record
+
+    def get_or_load(self, key, loader):
+        record = self.get(key, _MISSING)
+        if record is _MISSING:
+            record = loader()
+            self.put(key, record)
+        return record
+
+    def invalidate(self, endpoint: str):
+        with self._lock:
+            for key in [k for k in self._records if k[0] == endpoint]:
+                del self._records[key]
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "records": len(self._records)}
+
+
+_current: ContextVar = ContextVar("netbox_identity_map", default=None)
+
+_totals = {"scopes": 0, "hits": 0, "misses": 0}
+_totals_lock = threading.Lock()
+
+
+def current_identity_map() -> IdentityMap:
+    return _current.get()
+
+
+@contextmanager
+def identity_scope():
+    identity_map = IdentityMap()
+    token = _current.set(identity_map)
+    try:
+        yield identity_map
+    finally:
+        _current.reset(token)
+        with _totals_lock:
+            _totals["scopes"] += 1
+            _totals["hits"] += identity_map.hits
+            _totals["misses"] += identity_map.misses
+        if identity_map.hits:
+            logger.debug("netbox identity map: %s", identity_map.stats())
+
+
+def memoized(key: tuple, loader):
+    """loader() или уже загруженный в этом запросе объект"""
+    identity_map = _current.get()
+    if identity_map is None:
+        return loader()
+    return identity_map.get_or_load(key, loader)
+
+
+def remember(key: tuple, record):
+    identity_map = _current.get()
+    if identity_map is not None:
+        identity_map.put(key, record)
+
+
+def lookup(key: tuple):
+    """Объект из identity map или None"""
+    identity_map = _current.get()
+    return identity_map.get(key) if identity_map is not None else None
+
+
+def invalidate(endpoint: str):
+    identity_map = _current.get()
+    if identity_map is not None:
+        identity_map.invalidate(endpoint)
+
+
+def identity_map_stats() -> dict:
+    """Суммарные попадания/промахи по всем запросам процесса"""
+    with _totals_lock:
+        totals = dict(_totals)
+    lookups = totals["hits"] + totals["misses"]
+    totals["hit_ratio"] = round(totals["hits"] / lookups, 3) if lookups else None
+    return totals
+
+
+def reset_identity_map_stats():
+    with _totals_lock:
+        for key in _totals:
+            _totals[key] = 0
+
+
+class NetBoxIdentityMapMiddleware:
+    """Открывает identity_scope на время обработки запроса (WSGI и ASGI)"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with identity_scope():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with identity_scope():
+            return await self.get_response(request)
@@ -0,0 +1,240 @@
+"""
+Нагрузочный прогон маршрутов apps/netbox_api/urls.py (manage.py load_test).
+
+Сервис поднимается в этом же процессе (WSGI-сервер с пулом из workers
+потоков) поверх FakeNetBox; на каждый маршрут идёт requests запросов
+от concurrency клиентов. Результат — RPS и p50/p95/p99 на маршрут для
+каждой пары (workers, concurrency).
+
+Маршрут без генератора запроса в ROUTE_REQUESTS (загрузка файла,
+статус задачи) пропускается и попадает в отчёт как skipped.
+"""
+import itertools
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+import requests
+from django.core.wsgi import get_wsgi_application
+from django.urls import reverse
+
+from apps.netbox_api import urls as netbox_urls
+from apps.netbox_api.fake_netbox import FakeNetBoxDataset
+
+ASSETS = "plugins/inventory/assets"
+TYPES = "plugins/inventory/inventory-item-types"
+
+
+class LoadContext:
+    """Случайные id из датасета; stored-assets для repair/modernization раздаются без повторов"""
+
+    def __init__(self, dataset: FakeNetBoxDataset, seed: int = 1):
+        self.dataset = dataset
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stored = iter(dataset.ids(ASSETS, status="stored"))
+        self._counter = itertools.count(1)
+
+    def choice(self, endpoint: str) -> int:
+        with self._lock:
+            return self.random.choice(self.dataset.ids(endpoint))
+
+    def stored_assets(self, count: int) -> list[int]:
+        with self._lock:
+            return list(itertools.islice(self._stored, count))
+
+    def next_number(self) -> int:
+        return next(self._counter)
+
+
+def _get(**kwargs):
+    return lambda ctx: ("GET", kwargs, None)
+
+
+def _asset_detail(ctx):
+    return "GET", {"asset_id": ctx.choice(ASSETS)}, None
+
+
+def _create(ctx):
+    body = {
+        "items": [{"inventoryitem_type_id": ctx.choice(TYPES), "count": 2}],
+        "storage_location_id": ctx.choice("dcim/locations"),
+        "delivery_task": f"LOAD-{ctx.next_number()}",
+    }
+    return "POST", {}, body
+
+
+def _operation(ctx):
+    body = {
+        "device_id": ctx.choice("dcim/devices"),
+        "asset_ids": ctx.stored_assets(2),
+        "jira_task": f"LOAD-{ctx.next_number()}",
+    }
+    return "POST", {}, body
+
+
+# url name -> ctx -> (метод, kwargs для reverse, тело)
+ROUTE_REQUESTS = {
+    "assets_list": _get(),
+    "assets_export_csv": _get(),
+    "assets_export_xlsx": _get(),
+    "asset_detail": _asset_detail,
+    "asset_types_list": _get(),
+    "site_location_list": _get(),
+    "assets_create": _create,
+    "assets_repair": _operation,
+    "assets_modernization": _operation,
+    "async_assets_list": _get(),
+    "async_asset_detail": _asset_detail,
+    "async_asset_types_list": _get(),
+    "async_site_location_list": _get(),
+    "async_assets_create": _create,
+    "async_assets_repair": _operation,
+    "async_assets_modernization": _operation,
+    "netbox_pool_stats": _get(),
+    "netbox_reference_cache": _get(),
+    "netbox_response_cache": _get(),
+    "netbox_identity_map": _get(),
+    "netbox_health": _get(),
+    "metrics": _get(),
+}
+
+
+def route_names() -> list[str]:
+    return [p.name for p in netbox_urls.urlpatterns if p.name]
+
+
+def is_write(name: str) -> bool:
+    return ROUTE_REQUESTS.get(name) in (_create, _operation)
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank перцентиль по отсортированному списку"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+@dataclass
+class RouteResult:
+    route: str
+    workers: int
+    concurrency: int
+    requests: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+    latencies: list = field(default_factory=list, repr=False)
+    # первые ответы с ошибкой — чтобы было понятно, что сломалось
+    error_samples: list = field(default_factory=list)
+
+    @property
+    def rps(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies)
+        data = asdict(self)
+        data.pop("latencies")
+        data.update(
+            rps=round(self.rps, 1),
+            p50_ms=round(percentile(latencies, 50) * 1000, 1),
+            p95_ms=round(percentile(latencies, 95) * 1000, 1),
+            p99_ms=round(percentile(latencies, 99) * 1000, 1),
+        )
+        return data
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class PooledWSGIServer(ThreadingMixIn, WSGIServer):
+    """WSGI-сервер, обрабатывающий запросы пулом из workers потоков"""
+
+    workers = 1
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+    def serve_forever(self, poll_interval=0.5):
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="wsgi") as self.pool:
+            super().serve_forever(poll_interval)
+
+
+class ServiceServer:
+    """Этот сервис на 127.0.0.1:<свободный порт> в фоновом потоке"""
+
+    def __init__(self, workers: int):
+        server_class = type("Server", (PooledWSGIServer,), {"workers": workers})
+        self.server = make_server("127.0.0.1", 0, get_wsgi_application(), server_class, _QuietHandler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, name="load-test-wsgi", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        self._thread.join()
+
+
+class LoadRunner:
+    def __init__(self, context: LoadContext, requests_per_route: int = 200, timeout: float = 60.0):
+        self.context = context
+        self.requests_per_route = requests_per_route
+        self.timeout = timeout
+
+    def run_route(self, base_url: str, route: str, workers: int, concurrency: int) -> RouteResult:
+        build = ROUTE_REQUESTS[route]
+        result = RouteResult(route, workers, concurrency)
+        lock = threading.Lock()
+        remaining = iter(range(self.requests_per_route))
+
+        def client():
+            with requests.Session() as session:
+                while True:
+                    with lock:
+                        if next(remaining, None) is None:
+                            return
+                    method, kwargs, body = build(self.context)
+                    url = base_url + reverse(route, kwargs=kwargs)
+                    start = time.perf_counter()
+                    try:
+                        response = session.request(method, url, json=body, timeout=self.timeout)
+                        error = None if response.ok else f"{response.status_code} {response.text[:200]!r}"
+                    except requests.RequestException as e:
+                        error = str(e)
+                    elapsed = time.perf_counter() - start
+                    with lock:
+                        result.requests += 1
+                        result.latencies.append(elapsed)
+                        if error:
+                            result.errors += 1
+                            if len(result.error_samples) < 3:
+                                result.error_samples.append(error)
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=client, name=f"load-client-{i}") for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    def run(self, routes: list[str], workers: list[int], concurrency: list[int]):
+        """Генератор RouteResult по всем сочетаниям"""
+        for worker_count in workers:
+            with ServiceServer(worker_count) as service:
+                for clients in concurrency:
+                    for route in routes:
+                        yield self.run_route(service.url, route, worker_count, clients)
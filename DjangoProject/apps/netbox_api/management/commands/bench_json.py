@@ -0,0 +1,73 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from config import fastjson
+from config.fastjson import FastJSONParser, FastJSONRenderer
+
+
+def synthetic_assets(count: int) -> list[dict]:
+    """Список активов в формате simplify_asset"""
+    statuses = ["stored", "used", "retired", "planned"]
+    return [
+        {
+            "id": i,
+            "display": f"SSD-{i:06d}",
+            "serial": f"SN{i:010d}",
+            "status": statuses[i % len(statuses)],
+            "model": {"id": 1 + i % 40, "model": f"Samsung PM9A3 {1 + i % 4}TB"},
+            "storage_location": {"id": 1 + i % 25, "name": f"ЗИП ряд {1 + i % 25}"},
+            "custom_fields": {
+                "delivery": f"Поставка №{1 + i % 300}",
+                "repair_date": None,
+                "modernization_date": "2025-08-01" if i % 7 == 0 else None,
+                "device_id": i % 5000 or None,
+            },
+        }
+        for i in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = "Сравнивает stdlib JSONRenderer/JSONParser и FastJSON* на синтетическом списке активов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=50_000, help="кол-во активов в списке")
+        parser.add_argument("--repeat", type=int, default=5, help="кол-во прогонов, берётся лучший")
+
+    def handle(self, *args, **options):
+        if fastjson.orjson is None:
+            self.stdout.write(self.style.WARNING("orjson не установлен — FastJSON работает через stdlib"))
+
+        data = synthetic_assets(options["count"])
+        repeat = options["repeat"]
+
+        stdlib_bytes, stdlib_render = self._best(lambda: JSONRenderer().render(data), repeat)
+        fast_bytes, fast_render = self._best(lambda: FastJSONRenderer().render(data), repeat)
+        if stdlib_bytes != fast_bytes:
+            raise CommandError("вывод FastJSONRenderer отличается от JSONRenderer")
+
+        _, stdlib_parse = self._best(lambda: JSONParser().parse(io.BytesIO(stdlib_bytes)), repeat)
+        _, fast_parse = self._best(lambda: FastJSONParser().parse(io.BytesIO(stdlib_bytes)), repeat)
+
+        self.stdout.write(f"assets={options['count']} size={len(stdlib_bytes) / 1024 / 1024:.1f} MB")
+        self.stdout.write(self._line("render", stdlib_render, fast_render))
+        self.stdout.write(self._line("parse", stdlib_parse, fast_parse))
+
+    @staticmethod
+    def _best(func, repeat: int):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return result, best
+
+    @staticmethod
+    def _line(name: str, stdlib: float, fast: float) -> str:
+        return f"{name:<7} stdlib={stdlib * 1000:8.1f} ms  fast={fast * 1000:8.1f} ms  x{stdlib / fast:.1f}"
+
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.netbox_api.benchmarks import (
+    BASELINE_PATH,
+    BENCHMARKS,
+    SIZES,
+    compare,
+    load_baseline,
+    run_benchmarks,
+    same_host,
+    save_baseline,
+)
+
+
+def int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+class Command(BaseCommand):
+    help = "Микробенчмарки сервисного слоя (simplify, payload, site/location map, journal) и сравнение с baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int_list, default=list(SIZES), help="размеры, напр. 1000,10000")
+        parser.add_argument("--repeat", type=int, default=9, help="кол-во пар калибровка/замер, берётся медиана")
+        parser.add_argument("--only", default="", help="имена бенчмарков через запятую")
+        parser.add_argument("--threshold", type=float, default=0.25, help="допустимое замедление, 0.25 = +25%%")
+        parser.add_argument("--save-baseline", action="store_true", help=f"записать результат в {BASELINE_PATH.name}")
+
+    def handle(self, *args, **options):
+        names = [n for n in options["only"].split(",") if n]
+        unknown = set(names) - {b.name for b in BENCHMARKS}
+        if unknown:
+            raise CommandError(f"Неизвестные бенчмарки: {', '.join(sorted(unknown))}")
+
+        current = run_benchmarks(options["sizes"], options["repeat"], names)
+        baseline = load_baseline()
+        rows = compare(current, baseline, options["threshold"])
+
+        self.stdout.write(f"host: {current['host']}")
+        for row in rows:
+            self.stdout.write(self._line(row))
+
+        if options["save_baseline"]:
+            save_baseline(current)
+            self.stdout.write(f"baseline saved: {BASELINE_PATH}")
+            return
+
+        regressions = [row["benchmark"] for row in rows if row["regression"]]
+        if regressions and not same_host(current, baseline):
+            self.stdout.write(self.style.WARNING(
+                f"baseline снят на другой машине ({baseline.get('host')}) — замедления только для справки; "
+                f"для проверки здесь перезапишите его с --save-baseline"
+            ))
+            return
+        if regressions:
+            raise CommandError(f"Замедление больше {options['threshold']:.0%}: {', '.join(regressions)}")
+
+    def _line(self, row: dict) -> str:
+        line = f"{row['benchmark']:<34} {row['seconds'] * 1000:10.2f} ms"
+        if row["ratio"] is None:
+            return line + "  (нет в baseline)"
+        line += f"  x{row['ratio']:.2f} к baseline"
+        return self.style.ERROR(line) if row["regression"] else line
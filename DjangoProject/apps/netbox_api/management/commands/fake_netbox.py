@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from apps.netbox_api.fake_netbox import FakeNetBox, FakeNetBoxDataset
+
+
+class Command(BaseCommand):
+    help = "Фиктивный NetBox с синтетическими данными (для нагрузки на сервис, NETBOX_URL=http://host:port)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8800)
+        parser.add_argument("--sites", type=int, default=5)
+        parser.add_argument("--locations", type=int, default=4, help="локаций на сайт")
+        parser.add_argument("--devices", type=int, default=200)
+        parser.add_argument("--asset-types", type=int, default=40)
+        parser.add_argument("--assets", type=int, default=10_000)
+        parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа, мс")
+        parser.add_argument("--jitter", type=float, default=0.2, help="разброс задержки, доля от latency")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        dataset = FakeNetBoxDataset.generate(
+            sites=options["sites"],
+            locations=options["locations"],
+            devices=options["devices"],
+            asset_types=options["asset_types"],
+            assets=options["assets"],
+            seed=options["seed"],
+        )
+        netbox = FakeNetBox(
+            dataset,
+            host=options["host"],
+            port=options["port"],
+            latency=options["latency"] / 1000,
+            jitter=options["jitter"],
+        )
+        self.stdout.write(f"fake NetBox: {netbox.url} (assets={options['assets']}, latency={options['latency']} ms)")
+        try:
+            netbox.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            netbox.server.server_close()
+        self.stdout.write(f"requests served: {netbox.server.requests}")
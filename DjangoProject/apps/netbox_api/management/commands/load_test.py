@@ -0,0 +1,76 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from apps.netbox_api.fake_netbox import FakeNetBox, FakeNetBoxDataset
+from apps.netbox_api.loadtest import ROUTE_REQUESTS, LoadContext, LoadRunner, is_write, route_names
+from apps.netbox_api.netbox_client import reset_netbox_clients
+from apps.netbox_api.services.reference_cache import reference_cache
+
+
+def int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+class Command(BaseCommand):
+    help = "Нагрузка на маршруты inventory поверх фиктивного NetBox: RPS и p50/p95/p99"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--routes", default="", help="имена маршрутов через запятую (по умолчанию все чтения)")
+        parser.add_argument("--writes", action="store_true", help="добавить create/repair/modernization")
+        parser.add_argument("--workers", type=int_list, default=[4], help="потоков сервиса, напр. 1,4,8")
+        parser.add_argument("--concurrency", type=int_list, default=[1, 8], help="клиентов, напр. 1,8,32")
+        parser.add_argument("--requests", type=int, default=200, help="запросов на маршрут в каждом прогоне")
+        parser.add_argument("--assets", type=int, default=2_000)
+        parser.add_argument("--devices", type=int, default=200)
+        parser.add_argument("--latency", type=float, default=5.0, help="задержка фиктивного NetBox, мс")
+        parser.add_argument("--json", dest="json_path", help="сохранить результаты в файл")
+
+    def handle(self, *args, **options):
+        available = route_names()
+        if options["routes"]:
+            routes = options["routes"].split(",")
+            unknown = [r for r in routes if r not in available]
+            if unknown:
+                raise CommandError(f"Неизвестные маршруты: {', '.join(unknown)}")
+        else:
+            routes = [r for r in available if options["writes"] or not is_write(r)]
+        skipped = [r for r in routes if r not in ROUTE_REQUESTS]
+        routes = [r for r in routes if r in ROUTE_REQUESTS]
+        if skipped:
+            self.stdout.write(self.style.WARNING(f"skipped (нет генератора запроса): {', '.join(skipped)}"))
+
+        dataset = FakeNetBoxDataset.generate(assets=options["assets"], devices=options["devices"])
+        runner = LoadRunner(LoadContext(dataset), requests_per_route=options["requests"])
+        results = []
+
+        with FakeNetBox(dataset, latency=options["latency"] / 1000) as netbox:
+            with override_settings(NETBOX_URL=netbox.url, NETBOX_TOKEN="load-test"):
+                reset_netbox_clients()
+                reference_cache.invalidate()
+                try:
+                    self.stdout.write(
+                        f"{'route':<28} {'workers':>7} {'conc':>5} {'n':>6} {'err':>5} "
+                        f"{'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+                    )
+                    for result in runner.run(routes, options["workers"], options["concurrency"]):
+                        summary = result.summary()
+                        results.append(summary)
+                        self.stdout.write(self._line(summary))
+                        for sample in summary["error_samples"]:
+                            self.stdout.write(self.style.ERROR(f"    {sample}"))
+                finally:
+                    reset_netbox_clients()
+                    reference_cache.invalidate()
+
+        if options["json_path"]:
+            with open(options["json_path"], "w", encoding="utf-8") as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def _line(s: dict) -> str:
+        return (
+            f"{s['route']:<28} {s['workers']:>7} {s['concurrency']:>5} {s['requests']:>6} {s['errors']:>5} "
+            f"{s['rps']:>8} {s['p50_ms']:>8} {s['p95_ms']:>8} {s['p99_ms']:>8}"
+        )
@@ -0,0 +1,43 @@
+import os
+import socket
+import threading
+
+from django.core.management.base import BaseCommand
+
+from apps.netbox_api.services.jobs import JobWorker
+
+
+class Command(BaseCommand):
+    help = "Воркер фоновых задач (очередь Job в БД): bulk create, repair/modernization, кабели"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="обработать очередь и выйти")
+        parser.add_argument("--threads", type=int, default=1, help="сколько задач выполнять параллельно")
+        parser.add_argument("--interval", type=float, default=None, help="пауза опроса пустой очереди, сек")
+
+    def handle(self, *args, **options):
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        stop = threading.Event()
+        processed = []
+
+        def work(index):
+            worker = JobWorker(name=f"{prefix}:{index}")
+            processed.append(worker.run(once=options["once"], poll_interval=options["interval"], stop=stop))
+
+        threads = [
+            threading.Thread(target=work, args=(i,), name=f"job-worker-{i}", daemon=True)
+            for i in range(max(1, options["threads"]))
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(1)
+        except KeyboardInterrupt:
+            # текущие задачи дорабатывают, новые не берутся
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        self.stdout.write(f"processed jobs: {sum(processed)}")
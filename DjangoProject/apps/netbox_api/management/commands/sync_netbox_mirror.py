@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.netbox_api.services.mirror import MIRROR_SPECS, MirrorSyncService
+
+
+class Command(BaseCommand):
+    help = "Синхронизирует локальное зеркало NetBox (delta по last_updated, --full для reconcile)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="полный проход с удалением пропавших объектов")
+        parser.add_argument("--only", nargs="+", choices=list(MIRROR_SPECS), help="синхронизировать только эти типы")
+        parser.add_argument("--loop", action="store_true", help="работать постоянно")
+        parser.add_argument("--interval", type=int, default=60, help="пауза между delta-проходами, сек")
+        parser.add_argument("--full-every", type=int, default=3600, help="как часто делать reconcile в режиме --loop, сек")
+
+    def handle(self, *args, **options):
+        service = MirrorSyncService()
+        full = options["full"]
+        last_full = None
+
+        while True:
+            started = time.monotonic()
+            if options["loop"] and (last_full is None or started - last_full >= options["full_every"]):
+                full = True
+            stats = service.sync(full=full, object_types=options["only"])
+            if full:
+                last_full = started
+
+            for object_type, result in stats.items():
+                self.stdout.write(
+                    f"{object_type}: {result['mode']} upserted={result['upserted']} deleted={result['deleted']}"
+                )
+
+            if not options["loop"]:
+                break
+            full = False
+            time.sleep(max(0, options["interval"] - (time.monotonic() - started)))
@@ -0,0 +1,371 @@
+"""
+Метрики запросов к NetBox и входящих запросов в формате Prometheus.
+
+    - operation("assets.get_assets") — декоратор методов под-клиентов
+      NetBoxClient: время и ошибки операции целиком; ленивые RecordSet
+      pynetbox меряются по мере итерации;
+    - NetBoxHTTPAdapter пишет каждый HTTP-запрос с именем текущей операции:
+      время, статус, полученные байты, страницы (успешные GET), повторы;
+    - состояние circuit breaker и bulkhead NetBox (apps/netbox_api/resilience.py);
+    - RequestMetricsMiddleware — время входящих запросов по имени route;
+    - попадания в кэш готовых ответов (services/response_cache.py);
+    - render_metrics() — текст для /inventory/metrics/.
+
+Значения живут в памяти процесса: у каждого gunicorn-воркера свои,
+Prometheus собирает их с каждого воркера отдельно.
+"""
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from pynetbox.core.query import RequestError
+
+# границы бакетов гистограмм, секунды
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+UNKNOWN_OPERATION = "unknown"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = labels
+        self.buckets = buckets
+        # labels -> [счётчики по бакетам..., count, sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def count(self, *labels) -> int:
+        series = self._values.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            values = sorted((labels, list(series)) for labels, series in self._values.items())
+        for labels, series in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                le = 'le="+Inf"' if bound == "+Inf" else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(series[-1])}")
+        return lines
+
+
+netbox_operation_duration = Histogram(
+    "netbox_operation_duration_seconds",
+    "Время операции клиента NetBox (вызов метода под-клиента целиком)",
+    ("operation",),
+)
+netbox_operation_errors = Counter(
+    "netbox_operation_errors_total",
+    "Операции клиента NetBox, завершившиеся ошибкой, по HTTP-статусу или типу исключения",
+    ("operation", "status"),
+)
+netbox_request_duration = Histogram(
+    "netbox_http_request_duration_seconds",
+    "Время HTTP-запроса к NetBox",
+    ("operation", "method"),
+)
+netbox_requests = Counter(
+    "netbox_http_requests_total",
+    "HTTP-запросы к NetBox по статусу ответа",
+    ("operation", "method", "status"),
+)
+netbox_response_bytes = Counter(
+    "netbox_http_response_bytes_total",
+    "Байты, полученные от NetBox",
+    ("operation",),
+)
+netbox_pages = Counter(
+    "netbox_http_pages_total",
+    "Успешные GET к NetBox (страницы списков и отдельные объекты)",
+    ("operation",),
+)
+netbox_retries = Counter(
+    "netbox_http_retries_total",
+    "Повторы идемпотентных запросов к NetBox (обрыв, таймаут, 502/503/504)",
+    ("operation", "method"),
+)
+netbox_breaker_state = Gauge(
+    "netbox_circuit_breaker_state",
+    "Circuit breaker NetBox: 0 — closed, 1 — half_open, 2 — open",
+    ("netbox",),
+)
+netbox_breaker_rejected = Counter(
+    "netbox_circuit_breaker_rejected_total",
+    "Запросы к NetBox, отклонённые без отправки (breaker открыт)",
+    ("operation",),
+)
+netbox_bulkhead_wait = Histogram(
+    "netbox_bulkhead_wait_seconds",
+    "Ожидание слота bulkhead перед запросом к NetBox (только запросы, попавшие в очередь)",
+    ("kind",),
+)
+netbox_bulkhead_in_flight = Gauge(
+    "netbox_bulkhead_in_flight",
+    "Запросы к NetBox в полёте по bulkhead: read / write",
+    ("kind",),
+)
+netbox_bulkhead_rejected = Counter(
+    "netbox_bulkhead_rejected_total",
+    "Запросы к NetBox, не дождавшиеся слота bulkhead (очередь полна или таймаут)",
+    ("kind", "operation"),
+)
+http_request_duration = Histogram(
+    "inventory_http_request_duration_seconds",
+    "Время обработки входящего запроса",
+    ("route", "method", "status"),
+)
+response_cache_requests = Counter(
+    "inventory_response_cache_requests_total",
+    "Обращения к кэшу готовых ответов: hit / miss",
+    ("route", "result"),
+)
+response_cache_bytes = Gauge(
+    "inventory_response_cache_bytes",
+    "Размер кэша готовых ответов (все кодировки)",
+)
+
+REGISTRY = (
+    netbox_operation_duration,
+    netbox_operation_errors,
+    netbox_request_duration,
+    netbox_requests,
+    netbox_response_bytes,
+    netbox_pages,
+    netbox_retries,
+    netbox_breaker_state,
+    netbox_breaker_rejected,
+    netbox_bulkhead_wait,
+    netbox_bulkhead_in_flight,
+    netbox_bulkhead_rejected,
+    http_request_duration,
+    response_cache_requests,
+    response_cache_bytes,
+)
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics():
+    for metric in REGISTRY:
+        metric.reset()
+
+
+_operation: ContextVar = ContextVar("netbox_operation", default=UNKNOWN_OPERATION)
+
+
+def current_operation() -> str:
+    return _operation.get()
+
+
+@contextmanager
+def operation_scope(name: str):
+    token = _operation.set(name)
+    try:
+        yield
+    finally:
+        _operation.reset(token)
+
+
+def error_status(e: Exception) -> str:
+    if isinstance(e, RequestError):
+        return str(e.req.status_code)
+    return type(e).__name__
+
+
+class _InstrumentedIterator:
+    """Ленивый результат pynetbox: HTTP идёт при итерации, меряем её"""
+
+    def __init__(self, name: str, iterator):
+        self._name = name
+        self._iterator = iterator
+        self._elapsed = 0.0
+        self._done = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            with operation_scope(self._name):
+                return next(self._iterator)
+        except StopIteration:
+            self._finish(start)
+            raise
+        except Exception as e:
+            self._finish(start)
+            netbox_operation_errors.inc(self._name, error_status(e))
+            raise
+        finally:
+            self._elapsed += time.perf_counter() - start
+
+    def _finish(self, start: float):
+        if not self._done:
+            self._done = True
+            netbox_operation_duration.observe(self._elapsed + time.perf_counter() - start, self._name)
+
+    def __len__(self):
+        with operation_scope(self._name):
+            return len(self._iterator)
+
+    def __getattr__(self, item):
+        return getattr(self._iterator, item)
+
+
+def operation(name: str):
+    """Декоратор метода под-клиента NetBox: имя операции для метрик"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                with operation_scope(name):
+                    result = func(*args, **kwargs)
+            except Exception as e:
+                netbox_operation_errors.inc(name, error_status(e))
+                netbox_operation_duration.observe(time.perf_counter() - start, name)
+                raise
+            if hasattr(result, "__next__"):
+                return _InstrumentedIterator(name, result)
+            netbox_operation_duration.observe(time.perf_counter() - start, name)
+            return result
+        return wrapper
+    return decorator
+
+
+def observe_netbox_request(method: str, duration: float, response=None, error: Exception = None, stream=False):
+    """Вызывается из NetBoxHTTPAdapter.send на каждый HTTP-запрос"""
+    name = current_operation()
+    netbox_request_duration.observe(duration, name, method)
+    if error is not None:
+        netbox_requests.inc(name, method, type(error).__name__)
+        return
+    netbox_requests.inc(name, method, str(response.status_code))
+    size = response.headers.get("Content-Length")
+    if size and size.isdigit():
+        netbox_response_bytes.inc(name, amount=int(size))
+    elif not stream:
+        # chunked-ответ: Session всё равно прочитает тело целиком
+        netbox_response_bytes.inc(name, amount=len(response.content))
+    if method == "GET" and response.ok:
+        netbox_pages.inc(name)
+
+
+class RequestMetricsMiddleware:
+    """Время входящих запросов по имени route (WSGI и ASGI)"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self._observe(request, response, start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self._observe(request, response, start)
+        return response
+
+    @staticmethod
+    def _observe(request, response, start: float):
+        match = getattr(request, "resolver_match", None)
+        # неизвестные url не размножают серии
+        route = match.view_name if match else "unmatched"
+        http_request_duration.observe(
+            time.perf_counter() - start, route, request.method, str(response.status_code)
+        )
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MirrorAsset',
+            fields=[
+                ('id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('display', models.CharField(blank=True, max_length=255, null=True)),
+                ('serial', models.CharField(blank=True, db_index=True, max_length=255, null=True)),
+                ('status', models.CharField(blank=True, db_index=True, max_length=50, null=True)),
+                ('inventoryitem_type_id', models.PositiveIntegerField(blank=True, db_index=True, null=True)),
+                ('inventoryitem_type_model', models.CharField(blank=True, max_length=255, null=True)),
+                ('storage_location_id', models.PositiveIntegerField(blank=True, db_index=True, null=True)),
+                ('storage_location_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('custom_fields', models.JSONField(blank=True, default=dict)),
+                ('last_updated', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MirrorAssetType',
+            fields=[
+                ('id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('model', models.CharField(max_length=255)),
+                ('last_updated', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MirrorLocation',
+            fields=[
+                ('id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('site_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('site_name', models.CharField(blank=True, max_length=255)),
+                ('last_updated', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MirrorSite',
+            fields=[
+                ('id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('last_updated', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MirrorSyncState',
+            fields=[
+                ('object_type', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('cursor', models.DateTimeField(blank=True, null=True)),
+                ('synced_at', models.DateTimeField(blank=True, null=True)),
+                ('full_synced_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:53
+
+import apps.netbox_api.models
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_api', '0002_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(max_length=50)),
+                ('params', models.JSONField(default=dict, encoder=apps.netbox_api.models.JobJSONEncoder)),
+                ('state', models.CharField(db_index=True, default='queued', max_length=20)),
+                ('progress', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(blank=True, null=True)),
+                ('result', models.JSONField(blank=True, encoder=apps.netbox_api.models.JobJSONEncoder, null=True)),
+                ('error', models.JSONField(blank=True, encoder=apps.netbox_api.models.JobJSONEncoder, null=True)),
+                ('worker', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
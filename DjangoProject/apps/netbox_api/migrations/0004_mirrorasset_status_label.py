@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+
+def resync_assets(apps, schema_editor):
+    # в status лежал label ("Stored"), а не value: зеркало assets перечитываем целиком
+    MirrorSyncState = apps.get_model('netbox_api', 'MirrorSyncState')
+    MirrorSyncState.objects.filter(object_type='asset').update(cursor=None, synced_at=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_api', '0003_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mirrorasset',
+            name='status_label',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.RunPython(resync_assets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:40
+
+import rest_framework.utils.encoders
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('netbox_api', '0005_job_heartbeat_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='idempotencykey',
+            name='response_body',
+            field=models.JSONField(blank=True, encoder=rest_framework.utils.encoders.JSONEncoder, null=True),
+        ),
+        migrations.AddField(
+            model_name='idempotencykey',
+            name='response_headers',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
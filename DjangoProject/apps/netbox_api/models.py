@@ -0,0 +1,136 @@
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+from pynetbox.core.response import Record
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class MirrorSite(models.Model):
+    """Локальная копия dcim.site (только сайты с тегом dc)"""
+    id = models.PositiveIntegerField(primary_key=True)  # id в NetBox
+    name = models.CharField(max_length=255)
+    last_updated = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.name
+
+
+class MirrorLocation(models.Model):
+    """Локальная копия dcim.location"""
+    id = models.PositiveIntegerField(primary_key=True)
+    name = models.CharField(max_length=255)
+    site_id = models.PositiveIntegerField(null=True, blank=True)
+    site_name = models.CharField(max_length=255, blank=True)
+    last_updated = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.name
+
+
+class MirrorAssetType(models.Model):
+    """Локальная копия inventory item type (плагин inventory)"""
+    id = models.PositiveIntegerField(primary_key=True)
+    model = models.CharField(max_length=255)
+    last_updated = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.model
+
+
+class MirrorAsset(models.Model):
+    """
+    Локальная копия asset (плагин inventory).
+    Хранит ровно те поля, что нужны simplify_asset.
+    """
+    id = models.PositiveIntegerField(primary_key=True)
+    display = models.CharField(max_length=255, blank=True, null=True)
+    serial = models.CharField(max_length=255, blank=True, null=True, db_index=True)
+    status = models.CharField(max_length=50, blank=True, null=True, db_index=True)  # value choice-поля
+    status_label = models.CharField(max_length=100, blank=True, null=True)
+    inventoryitem_type_id = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    inventoryitem_type_model = models.CharField(max_length=255, blank=True, null=True)
+    storage_location_id = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    storage_location_name = models.CharField(max_length=255, blank=True, null=True)
+    custom_fields = models.JSONField(default=dict, blank=True)
+    last_updated = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.display or str(self.id)
+
+
+class MirrorSyncState(models.Model):
+    """Состояние синхронизации зеркала по типу объекта"""
+    object_type = models.CharField(max_length=50, primary_key=True)  # site / location / asset_type / asset
+    cursor = models.DateTimeField(null=True, blank=True)  # max last_updated из NetBox
+    synced_at = models.DateTimeField(null=True, blank=True)  # последняя успешная синхронизация
+    full_synced_at = models.DateTimeField(null=True, blank=True)  # последний полный reconcile
+
+    def __str__(self):
+        return self.object_type
+
+
+class IdempotencyKey(models.Model):
+    """
+    Idempotency-Key операций, меняющих данные в NetBox (create/repair/modernization).
+    Повтор запроса с тем же ключом получает сохранённый ответ без обращения к NetBox.
+    """
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+
+    scope = models.CharField(max_length=255)  # METHOD + path эндпоинта
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)  # sha256 тела запроса
+    state = models.CharField(max_length=20, default=IN_PROGRESS)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    # тем же encoder, что и DRF renderer: повтор отдаёт то же тело (datetime с микросекундами)
+    response_body = models.JSONField(null=True, blank=True, encoder=JSONEncoder)
+    response_headers = models.JSONField(null=True, blank=True)  # Location, ETag, ... для повтора
+    created_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "key"], name="unique_idempotency_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.key}"
+
+
+class JobJSONEncoder(DjangoJSONEncoder):
+    """Records сохраняем в JSON NetBox, как их отдаёт DRF renderer: choice-поля — {"value", "label"}"""
+    def default(self, o):
+        if isinstance(o, Record):
+            return dict(o)
+        return super().default(o)
+
+
+class Job(models.Model):
+    """
+    Фоновая задача: тяжёлая операция с NetBox, выполняется воркером
+    (manage.py run_jobs), а не внутри HTTP-запроса.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=50)  # ключ JOB_HANDLERS
+    params = models.JSONField(default=dict, encoder=JobJSONEncoder)
+    state = models.CharField(max_length=20, default=QUEUED, db_index=True)
+    progress = models.PositiveIntegerField(default=0)  # обработано объектов
+    total = models.PositiveIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True, encoder=JobJSONEncoder)
+    error = models.JSONField(null=True, blank=True, encoder=JobJSONEncoder)
+    worker = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # воркер обновляет, пока выполняет задачу; давно не обновлялся — воркер умер
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.kind} {self.id} ({self.state})"
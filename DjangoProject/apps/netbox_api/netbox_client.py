@@ -1,96 +1,550 @@
+import contextvars
+import random
+import socket
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+
 import pynetbox
 import requests
 import urllib3
-import warnings
-from urllib3.exceptions import InsecureRequestWarning
 from django.conf import settings
+from pynetbox.core.query import RequestError
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.exceptions import InsecureRequestWarning
+
+from apps.netbox_api.identity_map import invalidate, lookup, memoized, remember
+from apps.netbox_api.metrics import current_operation, netbox_retries, observe_netbox_request, operation
+from apps.netbox_api.resilience import (
+    IDEMPOTENT_METHODS,
+    RETRY_STATUSES,
+    Bulkhead,
+    CircuitBreaker,
+    NetBoxUnavailable,
+    is_failure,
+    operation_timeout,
+)
+from apps.netbox_api.timing import record
+from apps.netbox_api.progress import advance
+
+
+# убираем ssl warning, если используется самоподписанный сертификат
+# (один раз на процесс, а не на каждый запрос)
+urllib3.disable_warnings(InsecureRequestWarning)
+warnings.filterwarnings("ignore", category=InsecureRequestWarning)
+
+
+class NetBoxHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter для NetBox: таймаут по умолчанию + TCP keep-alive.
+    pynetbox не передаёт timeout в session, поэтому подставляем его здесь.
+    Каждый запрос пишется в метрики с именем текущей операции клиента.
+
+    Read-таймаут берётся по операции (operation_timeout) и ограничивает
+    запрос вместе с повторами; GET повторяется NETBOX_RETRY_ATTEMPTS раз,
+    breaker отклоняет запросы, пока NetBox в отказе, bulkhead ограничивает
+    число одновременных запросов (см. resilience.py).
+    """
+    def __init__(self, timeout=None, keepalive=True, breaker=None, bulkhead=None, **kwargs):
+        self.timeout = timeout
+        self.keepalive = keepalive
+        self.breaker = breaker
+        self.bulkhead = bulkhead
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.keepalive:
+            kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+            ]
+        super().init_poolmanager(*args, **kwargs)
+
+    def _timeouts(self, timeout, name: str) -> tuple:
+        if timeout is None:
+            connect, read = self.timeout or (None, None)
+            return connect, operation_timeout(name, read)
+        if isinstance(timeout, tuple):
+            return timeout
+        return timeout, timeout
+
+    def send(self, request, timeout=None, **kwargs):
+        name = current_operation()
+        connect, read = self._timeouts(timeout, name)
+        deadline = time.monotonic() + read if read is not None else None
+        attempts = 1 + (settings.NETBOX_RETRY_ATTEMPTS if request.method in IDEMPOTENT_METHODS else 0)
+
+        for attempt in range(attempts):
+            if self.breaker is not None:
+                self.breaker.before_request(name)
+            attempt_read = read if deadline is None else max(0.001, deadline - time.monotonic())
+            response = error = None
+            sent = False
+            try:
+                with self._slot(request.method, name):
+                    sent = True
+                    response = self._send_once(request, (connect, attempt_read), **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            finally:
+                # сюда же попадают и прочие исключения — breaker их тоже видит;
+                # не дождались слота bulkhead — запроса не было, пробу отпускаем
+                if self.breaker is not None:
+                    if sent:
+                        self.breaker.record(is_failure(response))
+                    else:
+                        self.breaker.cancel()
+
+            retryable = error is not None or response.status_code in RETRY_STATUSES
+            pause = random.uniform(0, settings.NETBOX_RETRY_BACKOFF * 2 ** attempt)
+            out_of_budget = deadline is not None and time.monotonic() + pause >= deadline
+            if not retryable or attempt == attempts - 1 or out_of_budget:
+                if error is not None:
+                    raise error
+                return response
+            if response is not None:
+                response.close()
+            netbox_retries.inc(name, request.method)
+            time.sleep(pause)
+
+    def _slot(self, method: str, name: str):
+        return self.bulkhead.slot(method, name) if self.bulkhead is not None else nullcontext()
+
+    def _send_once(self, request, timeout, **kwargs):
+        start = time.perf_counter()
+        response = error = None
+        try:
+            response = super().send(request, timeout=timeout, **kwargs)
+            return response
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            record(f"netbox.{current_operation()}", duration)
+            observe_netbox_request(
+                request.method, duration, response, error=error, stream=kwargs.get("stream", False)
+            )
+
+    def pool_stats(self) -> list[dict]:
+        """Состояние пулов соединений (по одному на host)."""
+        stats = []
+        pools = self.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            idle = sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0
+            stats.append({
+                "host": f"{pool.scheme}://{pool.host}:{pool.port}",
+                "maxsize": pool.pool.maxsize if pool.pool else 0,
+                "idle": idle,
+                "connections_created": pool.num_connections,
+                "requests": pool.num_requests,
+            })
+        return stats
+
+
+def build_session(breaker: CircuitBreaker = None, bulkhead: Bulkhead = None) -> requests.Session:
+    """Создаёт requests.Session с настроенным пулом соединений к NetBox."""
+    session = requests.Session()
+    session.verify = False  # ⚠️ лучше использовать нормальный SSL
+
+    adapter = NetBoxHTTPAdapter(
+        timeout=(settings.NETBOX_CONNECT_TIMEOUT, settings.NETBOX_READ_TIMEOUT),
+        keepalive=settings.NETBOX_TCP_KEEPALIVE,
+        breaker=breaker,
+        bulkhead=bulkhead,
+        pool_connections=settings.NETBOX_POOL_CONNECTIONS,
+        pool_maxsize=settings.NETBOX_POOL_MAXSIZE,
+        pool_block=settings.NETBOX_POOL_BLOCK,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
 
 class NetBoxClient:
     """
     Отвечает за инициализацию api + общие настройки сессии.
     Дальше раздаёт доступ к под-клиентам: general / assets / devices.
+
+    Создавать напрямую не нужно — используйте get_netbox_client(),
+    чтобы все запросы процесса шли через один пул соединений.
     """
     def __init__(self):
-        # убираем ssl warning, если используется самоподписанный сертификат
-        urllib3.disable_warnings(InsecureRequestWarning)
-        warnings.filterwarnings("ignore", category=InsecureRequestWarning)
+        # breaker на процесс: при отказах NetBox views сразу отвечают 503
+        self.breaker = CircuitBreaker.from_settings(settings.NETBOX_URL) if settings.NETBOX_BREAKER_ENABLED else None
+        # лимит одновременных запросов процесса к NetBox (чтение / запись)
+        self.bulkhead = Bulkhead.from_settings() if settings.NETBOX_BULKHEAD_ENABLED else None
 
         # создаём сессию
-        session = requests.Session()
-        session.verify = False  # ⚠️ лучше использовать нормальный SSL
+        self.session = build_session(self.breaker, self.bulkhead)
         
         # создаём клиент NetBox
         self.api = pynetbox.api(
             settings.NETBOX_URL,
             token=settings.NETBOX_TOKEN
         )
-        self.api.http_session = session
+        self.api.http_session = self.session
 
         self.jira_url = settings.JIRA_URL
         self.netbox_url = settings.NETBOX_URL
 
-                # под-клиенты
+        # под-клиенты (общий api -> общий пул соединений)
         self.general = NetBoxGeneral(self.api)
         self.assets = NetBoxAssets(self.api)
         self.devices = NetBoxDevices(self.api)
 
+    def pool_stats(self) -> list[dict]:
+        adapter = self.session.get_adapter(self.netbox_url or "https://")
+        return adapter.pool_stats() if isinstance(adapter, NetBoxHTTPAdapter) else []
+
+    def breaker_stats(self) -> dict:
+        if self.breaker is None:
+            return {"netbox": self.netbox_url, "state": "disabled"}
+        return self.breaker.stats()
+
+    def bulkhead_stats(self) -> dict:
+        return self.bulkhead.stats() if self.bulkhead is not None else {}
+
+    def close(self):
+        self.session.close()
+
+
+# реестр клиентов: один NetBoxClient на (url, token) в процессе
+_clients: dict[tuple, NetBoxClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_netbox_client() -> NetBoxClient:
+    """Возвращает общий для процесса NetBoxClient (потокобезопасно)."""
+    key = (settings.NETBOX_URL, settings.NETBOX_TOKEN)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = NetBoxClient()
+                _clients[key] = client
+    return client
+
+
+def reset_netbox_clients():
+    """Закрывает и сбрасывает все клиенты (тесты, смена настроек)."""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+# ключи identity map
+ASSETS_ENDPOINT = "plugins.inventory.assets"
+DEVICES_ENDPOINT = "dcim.devices"
+
+
+@dataclass
+class BulkResult:
+    """Результат bulk-операции: успешные id и ошибки NetBox по каждому id"""
+    succeeded: list = field(default_factory=list)
+    errors: dict = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
 
 class NetBoxBase:
     """Базовый класс для под-клиентов (получает общий self.api)."""
     def __init__(self, api):
         self.api = api
 
+    def _get_json(self, url: str, params: dict = None) -> dict:
+        """GET без pynetbox Record: сырой JSON ответа NetBox"""
+        headers = {"accept": "application/json"}
+        if self.api.token:
+            headers["authorization"] = f"Token {self.api.token}"
+        response = self.api.http_session.get(url, headers=headers, params=params)
+        if not response.ok:
+            raise RequestError(response)
+        return response.json()
+
+    def _list_url(self, path: str) -> str:
+        return f"{self.api.base_url}/{path.strip('/')}/"
+
+    def _list_version(self, path: str, filters: dict) -> str:
+        """count + max(last_updated) list-эндпоинта одним GET на один объект"""
+        params = {**filters, "limit": 1, "ordering": "-last_updated"}
+        if settings.NETBOX_ASSET_FIELD_PROJECTION:
+            params["fields"] = "id,last_updated"
+        data = self._get_json(self._list_url(path), params)
+        latest = data["results"][0].get("last_updated") if data["results"] else None
+        return f"{data['count']}:{latest or ''}"
+
+    def _iter_json(self, path: str, params: dict):
+        """Все страницы list-эндпоинта как dict (идём по next, в памяти одна страница)"""
+        url = self._list_url(path)
+        while url:
+            data = self._get_json(url, params)
+            yield from data["results"]
+            url, params = data.get("next"), None
+
+    def _bulk(
+        self,
+        items: list,
+        send,
+        item_id,
+        chunk_size: int = None,
+        max_workers: int = 1,
+        collect=None,
+    ) -> BulkResult:
+        """
+        Отправляет items чанками через send(chunk).
+        NetBox выполняет bulk-запрос в одной транзакции, поэтому если чанк
+        упал — повторяем его поштучно, чтобы понять, какие именно items сломаны.
+
+        max_workers > 1 — чанки отправляются параллельно (порядок результата
+        сохраняется). collect(chunk, response) -> что положить в succeeded,
+        по умолчанию id items чанка.
+        """
+        chunk_size = chunk_size or settings.NETBOX_BULK_CHUNK_SIZE
+        collect = collect or (lambda chunk, response: [item_id(i) for i in chunk])
+        chunks = [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+
+        def send_chunk(chunk) -> BulkResult:
+            chunk_result = self._send_chunk(chunk, send, item_id, collect)
+            advance(len(chunk))
+            return chunk_result
+
+        if max_workers > 1 and len(chunks) > 1:
+            contexts = [contextvars.copy_context() for _ in chunks]
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+                chunk_results = list(pool.map(lambda ctx, chunk: ctx.run(send_chunk, chunk), contexts, chunks))
+        else:
+            chunk_results = [send_chunk(chunk) for chunk in chunks]
+
+        result = BulkResult()
+        for chunk_result in chunk_results:
+            result.succeeded.extend(chunk_result.succeeded)
+            result.errors.update(chunk_result.errors)
+        return result
+
+    @staticmethod
+    def _send_chunk(chunk: list, send, item_id, collect) -> BulkResult:
+        result = BulkResult()
+        try:
+            result.succeeded.extend(collect(chunk, send(chunk)))
+            return result
+        except RequestError as e:
+            if len(chunk) == 1:
+                result.errors[item_id(chunk[0])] = str(e)
+                return result
+        except NetBoxUnavailable:
+            # breaker/bulkhead: запрос не отправлялся — это не ошибка items, а 503 всей операции
+            raise
+        except requests.RequestException as e:
+            # таймаут/обрыв: неизвестно, применил ли NetBox чанк — не повторяем
+            for item in chunk:
+                result.errors[item_id(item)] = str(e)
+            return result
+
+        for item in chunk:
+            try:
+                result.succeeded.extend(collect([item], send([item])))
+            except NetBoxUnavailable:
+                raise
+            except (RequestError, requests.RequestException) as e:
+                result.errors[item_id(item)] = str(e)
+        return result
+
 
 class NetBoxGeneral(NetBoxBase):
     """General: sites, locations, journal."""
     # SITES GET
-    def get_sites(self):
-        return self.api.dcim.sites.filter(tag="dc")
+    @operation("general.get_sites")
+    def get_sites(self, **filters):
+        return self.api.dcim.sites.filter(tag="dc", **filters)
 
-    def get_locations(self):
-        return self.api.dcim.locations.all()
+    @operation("general.get_locations")
+    def get_locations(self, **filters):
+        return self.api.dcim.locations.filter(**filters)
 
     # JOURNAL POST
+    @operation("general.create_journal_entry")
     def create_journal_entry(self, data: dict):
         return self.api.extras.journal_entries.create(data)
 
+    @operation("general.delete_journal_entry")
+    def delete_journal_entry(self, entry):
+        entry.delete()
+
 
 class NetBoxAssets(NetBoxBase):
     """Inventory (assets): get/post/update/delete."""
+
+    assets_path = "plugins/inventory/assets"
+    # поля, которые нужны simplify_asset_data (?fields= в NetBox 4+)
+    asset_fields = ("id", "display", "serial", "status", "inventoryitem_type", "storage_location", "custom_fields")
+
+    def _projection(self, params: dict) -> dict:
+        if settings.NETBOX_ASSET_FIELD_PROJECTION:
+            params["fields"] = ",".join(self.asset_fields)
+        return params
+
     # ASSET GET
+    @operation("assets.get_assets")
     def get_assets(self, **filters):
         return self.api.plugins.inventory.assets.filter(**filters)
 
+    @operation("assets.get_asset_by_id")
     def get_asset_by_id(self, asset_id: int):
-        return self.api.plugins.inventory.assets.get(id=asset_id)
+        return memoized(
+            (ASSETS_ENDPOINT, "id", asset_id),
+            lambda: self.api.plugins.inventory.assets.get(id=asset_id),
+        )
 
-    def get_asset_types(self):
-        return self.api.plugins.inventory.inventory_item_types.all()
+    # ASSET GET (сырой JSON с урезанным набором полей, без Record)
+    @operation("assets.get_assets_data")
+    def get_assets_data(self, **filters):
+        params = self._projection({"limit": settings.NETBOX_RAW_PAGE_SIZE, **filters})
+        return self._iter_json(self.assets_path, params)
+
+    @operation("assets.get_assets_page_data")
+    def get_assets_page_data(self, limit: int, offset: int = 0, **filters):
+        """Одна страница assets (limit/offset NetBox); возвращает (список dict, общее кол-во)"""
+        params = self._projection({**filters, "limit": limit, "offset": offset})
+        data = self._get_json(self._list_url(self.assets_path), params)
+        return data["results"], data["count"]
+
+    @operation("assets.get_assets_version")
+    def get_assets_version(self, **filters) -> str:
+        """Версия списка assets без загрузки самого списка (для ETag): count и max(last_updated)"""
+        return self._list_version(self.assets_path, filters)
+
+    @operation("assets.get_asset_data_by_id")
+    def get_asset_data_by_id(self, asset_id: int):
+        try:
+            return self._get_json(f"{self._list_url(self.assets_path)}{asset_id}/", self._projection({}))
+        except RequestError as e:
+            if e.req.status_code == 404:
+                return None
+            raise
+
+    @operation("assets.get_assets_by_ids")
+    def get_assets_by_ids(self, asset_ids: list[int], chunk_size: int = None) -> dict:
+        """
+        Пакетная загрузка assets: один filter(id=[...]) на чанк вместо GET на каждый id.
+        Чанки ограничивают длину URL. Возвращает {id: Record}, ненайденных id в нём нет.
+        Уже загруженные в этом запросе assets берутся из identity map.
+        id из JSON могут прийти строками — приводятся к int, как ключи Record.id.
+        """
+        chunk_size = chunk_size or settings.NETBOX_ID_BATCH_SIZE
+        found = {}
+        ids = []
+        for asset_id in dict.fromkeys(int(i) for i in asset_ids):
+            asset = lookup((ASSETS_ENDPOINT, "id", asset_id))
+            if asset is not None:
+                found[asset_id] = asset
+            else:
+                ids.append(asset_id)
+
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            for asset in self.api.plugins.inventory.assets.filter(id=chunk):
+                found[asset.id] = asset
+                remember((ASSETS_ENDPOINT, "id", asset.id), asset)
+        return found
+
+    @operation("assets.get_asset_types")
+    def get_asset_types(self, **filters):
+        return self.api.plugins.inventory.inventory_item_types.filter(**filters)
 
     # ASSET POST
+    @operation("assets.delete_asset")
     def delete_asset(self, asset):
         asset.delete()
+        invalidate(ASSETS_ENDPOINT)
 
+    @operation("assets.create_assets")
     def create_assets(self, assets_data: list[dict]):
         """Массовое создание assets в NetBox"""
         return self.api.plugins.inventory.assets.create(assets_data)
 
+    @operation("assets.bulk_create_assets")
+    def bulk_create_assets(
+        self,
+        assets_data: list[dict],
+        chunk_size: int = None,
+        max_workers: int = None,
+    ) -> BulkResult:
+        """
+        Создание assets чанками, до max_workers POST одновременно.
+        succeeded — созданные Records, errors — {индекс в assets_data: ошибка NetBox}
+        """
+        create = self.api.plugins.inventory.assets.create
+        return self._bulk(
+            list(enumerate(assets_data)),
+            send=lambda chunk: create([data for _, data in chunk]),
+            item_id=lambda item: item[0],
+            chunk_size=chunk_size or settings.NETBOX_CREATE_CHUNK_SIZE,
+            max_workers=max_workers or settings.NETBOX_CREATE_MAX_WORKERS,
+            collect=lambda chunk, created: list(created),
+        )
+
+    @operation("assets.update_asset")
     def update_asset(self, asset, data: dict):
         asset.update(data)
 
+    @operation("assets.bulk_update_assets")
+    def bulk_update_assets(self, updates: list[dict], chunk_size: int = None) -> BulkResult:
+        """Bulk PATCH: updates — список словарей с обязательным id"""
+        result = self._bulk(
+            updates,
+            send=self.api.plugins.inventory.assets.update,
+            item_id=lambda item: item["id"],
+            chunk_size=chunk_size,
+        )
+        invalidate(ASSETS_ENDPOINT)
+        return result
+
+    @operation("assets.bulk_delete_assets")
+    def bulk_delete_assets(self, asset_ids: list[int], chunk_size: int = None) -> BulkResult:
+        """Bulk DELETE по списку id"""
+        result = self._bulk(
+            list(asset_ids),
+            send=self.api.plugins.inventory.assets.delete,
+            item_id=lambda asset_id: asset_id,
+            chunk_size=chunk_size,
+        )
+        invalidate(ASSETS_ENDPOINT)
+        return result
+
 
 class NetBoxDevices(NetBoxBase):
     """Device: get/update."""
 
     # DEVICE GET
+    @operation("devices.get_device")
     def get_device(self, device_id: int):
-        return self.api.dcim.devices.get(id=device_id)
+        return memoized(
+            (DEVICES_ENDPOINT, "id", device_id),
+            lambda: self.api.dcim.devices.get(id=device_id),
+        )
 
     # DEVICE POST
+    @operation("devices.update_device")
     def update_device(self, device, data: dict):
         device.update(data)
 
+    @operation("devices.patch_device")
+    def patch_device(self, device_id: int, data: dict):
+        """PATCH по id, без сравнения с закэшированным состоянием Record"""
+        self.api.dcim.devices.update([{"id": device_id, **data}])
+        invalidate(DEVICES_ENDPOINT)
+
 
 
 # ### SITES GET
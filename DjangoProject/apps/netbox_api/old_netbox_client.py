@@ -13,6 +13,10 @@ from urllib3.exceptions import InsecureRequestWarning
 from django.conf import settings
 from pynetbox.core.query import RequestError
 
+from apps.netbox_api.identity_map import memoized
+from apps.netbox_api.progress import advance
+from apps.netbox_api.services.reference_cache import reference_cache
+
 
 class NetBoxClient:
     def __init__(self):
@@ -67,7 +71,10 @@ class NetBoxClient:
             """
 
             try:
-                return [{'id': dr.id, 'name': dr.name} for dr in self.api.dcim.device_roles.all()]
+                return reference_cache.get(
+                    "device_roles",
+                    lambda: [{'id': dr.id, 'name': dr.name} for dr in self.api.dcim.device_roles.all()],
+                )
             except Exception as e:
                 return {"error": str(e)}
         
@@ -78,7 +85,10 @@ class NetBoxClient:
             """
 
             try:
-                return [{'id': dt.id, 'model': dt.model, 'manufacturer': dt.manufacturer.name} for dt in self.api.dcim.device_types.all()]
+                return reference_cache.get(
+                    "device_types",
+                    lambda: [{'id': dt.id, 'model': dt.model, 'manufacturer': dt.manufacturer.name} for dt in self.api.dcim.device_types.all()],
+                )
             except Exception as e:
                 return {"error": str(e)}
 
@@ -88,7 +98,10 @@ class NetBoxClient:
             Результат выполнения name производителя
             """
             try:
-                return [m.name for m in self.api.dcim.manufacturers.all()]
+                return reference_cache.get(
+                    "manufacturers",
+                    lambda: [m.name for m in self.api.dcim.manufacturers.all()],
+                )
             except Exception as e:
                 return {"error": str(e)}
 
@@ -105,7 +118,11 @@ class NetBoxClient:
         def get_device_by_name(self, name):
             """Получить устройство по имени"""
             try:
-                device = self.api.dcim.devices.get(name=name)
+                # в create_cables один и тот же коммутатор встречается много раз
+                device = memoized(
+                    ("dcim.devices", "name", name),
+                    lambda: self.api.dcim.devices.get(name=name),
+                )
                 return device
             except Exception:
                 return None
@@ -131,27 +148,31 @@ class NetBoxClient:
             Учитывает, что локации принадлежат конкретному сайту.
             """
             try:
-                site_location_map = {}
-                # 1. Получаем все сайты
-                sites = list(self.api.dcim.sites.filter(tag='dc'))
-                for site in sites:
-                    
-                    site_location_map[site.name] = {
-                        "site_id": site.id,
-                        "locations": {}
-                    }
-
-                # 2. Получаем все локации и распределяем их по сайтам
-                locations = self.api.dcim.locations.all()
-                for loc in locations:
-                    site_name = loc.site.name
-                    if site_name in site_location_map:
-                        site_location_map[site_name]["locations"][loc.name] = loc.id
-                return site_location_map
-
+                return reference_cache.get("site_location_map", self._load_site_location_map)
             except Exception as e:
                 return {"error": str(e)}
 
+        def _load_site_location_map(self):
+            """Сайты (tag=dc) и их локации — загрузка для reference_cache"""
+            site_location_map = {}
+            # 1. Получаем все сайты
+            sites = list(self.api.dcim.sites.filter(tag='dc'))
+            site_names = {site.id: site.name for site in sites}
+            for site in sites:
+                
+                site_location_map[site.name] = {
+                    "site_id": site.id,
+                    "locations": {}
+                }
+
+            # 2. Получаем все локации и распределяем их по сайтам
+            locations = self.api.dcim.locations.all()
+            for loc in locations:
+                site_name = site_names.get(loc.site.id)
+                if site_name in site_location_map:
+                    site_location_map[site_name]["locations"][loc.name] = loc.id
+            return site_location_map
+
         # методы для создания данных 
         def create_devices(self, devices_data: list[dict]):
             """
@@ -236,6 +257,8 @@ class NetBoxClient:
                     errors.append({"cable": cable, "error": f"NetBox API error: {e}"})
                 except Exception as e:
                     errors.append({"cable": cable, "error": str(e)})
+                finally:
+                    advance()
 
             # Возвращаем результат
             if errors and not created:
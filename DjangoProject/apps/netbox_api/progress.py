@@ -0,0 +1,28 @@
+"""
+Прогресс фоновой задачи (run_jobs).
+
+Воркер открывает progress_scope(callback), а клиент NetBox и сервисы
+вызывают advance(n) по мере обработки объектов. Contextvar вместо
+callback-параметра: не нужно протаскивать его через все сигнатуры,
+потоки bulk-операций получают копию контекста и тот же callback.
+Вне задачи advance() ничего не делает.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current: ContextVar = ContextVar("job_progress", default=None)
+
+
+@contextmanager
+def progress_scope(callback):
+    token = _current.set(callback)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def advance(count: int = 1):
+    callback = _current.get()
+    if callback is not None:
+        callback(count)
@@ -0,0 +1,366 @@
+"""
+Защита от деградации NetBox: таймауты по операциям, повторы GET, circuit breaker.
+
+    - operation_timeout() — read-таймаут операции клиента из
+      NETBOX_OPERATION_TIMEOUTS (по имени "assets.get_assets_data" или
+      под-клиенту "assets"), иначе NETBOX_READ_TIMEOUT. Это бюджет одного
+      HTTP-запроса вместе с повторами;
+    - повторяются только GET/HEAD: обрыв, таймаут, 502/503/504, пауза —
+      случайная в [0, NETBOX_RETRY_BACKOFF * 2^попытка] (full jitter);
+    - CircuitBreaker — один на NetBoxClient, т.е. на процесс: если доля
+      ошибок за окно превысила порог, запросы отклоняются сразу
+      (NetBoxUnavailable -> 503 в NetBoxUnavailableMiddleware), после
+      паузы пропускается один пробный запрос;
+    - Bulkhead — лимит одновременных запросов процесса к NetBox, отдельно
+      на чтение (GET/HEAD) и запись. Сверх лимита — очередь не длиннее
+      NETBOX_BULKHEAD_QUEUE с ожиданием до NETBOX_BULKHEAD_TIMEOUT сек,
+      дальше NetBoxBusy (503). Запросы внутри @high_priority (repair,
+      modernization) обгоняют в очереди остальные.
+
+Связывает всё NetBoxHTTPAdapter.send.
+"""
+import functools
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import requests
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+
+from apps.netbox_api.metrics import (
+    netbox_breaker_rejected,
+    netbox_breaker_state,
+    netbox_bulkhead_in_flight,
+    netbox_bulkhead_rejected,
+    netbox_bulkhead_wait,
+)
+from apps.netbox_api.timing import record
+
+# что можно безопасно отправить повторно
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD"})
+# ответы прокси/NetBox, после которых есть смысл повторить
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+
+class NetBoxUnavailable(requests.RequestException):
+    """Запрос в NetBox не отправлялся: breaker открыт"""
+
+    def __init__(self, retry_after: int, message: str = None):
+        self.retry_after = retry_after
+        super().__init__(message or f"NetBox недоступен, повторите через {retry_after} сек")
+
+
+class NetBoxBusy(NetBoxUnavailable):
+    """Bulkhead: слот под запрос к NetBox не освободился вовремя"""
+
+    def __init__(self, kind: str, reason: str):
+        self.kind = kind
+        super().__init__(1, f"NetBox перегружен ({kind}): {reason}, повторите позже")
+
+
+def operation_timeout(name: str, default):
+    timeouts = settings.NETBOX_OPERATION_TIMEOUTS
+    if name in timeouts:
+        return timeouts[name]
+    return timeouts.get(name.split(".", 1)[0], default)
+
+
+def is_failure(response) -> bool:
+    """Что считается отказом NetBox для breaker: нет ответа (обрыв, таймаут) или 5xx"""
+    return response is None or response.status_code >= 500
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        window: float = 30,
+        min_requests: int = 10,
+        error_rate: float = 0.5,
+        cooldown: float = 15,
+        clock=time.monotonic,
+    ):
+        self.name = name
+        self.window = window
+        self.min_requests = min_requests
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self._clock = clock
+        # (время, отказ) за последние window сек
+        self._outcomes = deque()
+        self._failures = 0
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._times_opened = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+        netbox_breaker_state.set(0, name)
+
+    @classmethod
+    def from_settings(cls, name: str):
+        return cls(
+            name,
+            window=settings.NETBOX_BREAKER_WINDOW,
+            min_requests=settings.NETBOX_BREAKER_MIN_REQUESTS,
+            error_rate=settings.NETBOX_BREAKER_ERROR_RATE,
+            cooldown=settings.NETBOX_BREAKER_COOLDOWN,
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def before_request(self, operation: str):
+        """Пропустить запрос или сразу NetBoxUnavailable"""
+        with self._lock:
+            if self._state == self.OPEN:
+                waited = self._clock() - self._opened_at
+                if waited < self.cooldown:
+                    self._reject(operation, self.cooldown - waited)
+                self._set_state(self.HALF_OPEN)
+            if self._state == self.HALF_OPEN:
+                # в half_open в NetBox идёт только один пробный запрос
+                if self._probe_in_flight:
+                    self._reject(operation, self.cooldown)
+                self._probe_in_flight = True
+
+    def record(self, failed: bool):
+        with self._lock:
+            now = self._clock()
+            if self._state == self.HALF_OPEN:
+                self._probe_in_flight = False
+                if failed:
+                    self._open(now)
+                else:
+                    self._outcomes.clear()
+                    self._failures = 0
+                    self._set_state(self.CLOSED)
+                return
+            if self._state == self.OPEN:
+                # ответ на запрос, отправленный до открытия
+                return
+
+            self._outcomes.append((now, failed))
+            self._failures += failed
+            while self._outcomes and self._outcomes[0][0] < now - self.window:
+                self._failures -= self._outcomes.popleft()[1]
+            total = len(self._outcomes)
+            if total >= self.min_requests and self._failures / total >= self.error_rate:
+                self._open(now)
+
+    def cancel(self):
+        """Запрос так и не ушёл в NetBox: пробу half_open можно отдать другому"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = len(self._outcomes)
+            retry_after = None
+            if self._state == self.OPEN:
+                retry_after = max(0, math.ceil(self.cooldown - (self._clock() - self._opened_at)))
+            return {
+                "netbox": self.name,
+                "state": self._state,
+                "window_requests": total,
+                "window_failures": self._failures,
+                "error_rate": round(self._failures / total, 3) if total else 0.0,
+                "times_opened": self._times_opened,
+                "rejected": self._rejected,
+                "retry_after": retry_after,
+            }
+
+    def _open(self, now: float):
+        self._opened_at = now
+        self._times_opened += 1
+        self._outcomes.clear()
+        self._failures = 0
+        self._set_state(self.OPEN)
+
+    def _reject(self, operation: str, retry_after: float):
+        self._rejected += 1
+        netbox_breaker_rejected.inc(operation)
+        raise NetBoxUnavailable(max(1, math.ceil(retry_after)))
+
+    def _set_state(self, state: str):
+        self._state = state
+        netbox_breaker_state.set(self._STATE_VALUES[state], self.name)
+
+
+NORMAL_PRIORITY = 0
+HIGH_PRIORITY = 1
+
+_priority: ContextVar = ContextVar("netbox_priority", default=NORMAL_PRIORITY)
+
+
+def high_priority(func):
+    """Запросы к NetBox внутри func идут в очереди bulkhead первыми (sync и async)"""
+    if iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            token = _priority.set(HIGH_PRIORITY)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _priority.reset(token)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _priority.set(HIGH_PRIORITY)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _priority.reset(token)
+    return wrapper
+
+
+class _Compartment:
+    """Семафор с ограниченной очередью; ждущие обслуживаются по (приоритет, порядок)"""
+
+    def __init__(self, kind: str, limit: int, queue_size: int):
+        self.kind = kind
+        self.limit = limit
+        self.queue_size = queue_size
+        self.in_flight = 0
+        self.rejected = 0
+        # heap из [-приоритет, порядковый номер]
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def acquire(self, priority: int, timeout: float, operation: str):
+        with self._condition:
+            if self.in_flight < self.limit and not self._waiters:
+                self._take()
+                return
+            if len(self._waiters) >= self.queue_size:
+                self._reject(operation, "очередь заполнена")
+
+            entry = [-priority, next(self._sequence)]
+            heapq.heappush(self._waiters, entry)
+            start = time.monotonic()
+            deadline = start + timeout
+            while not (self._waiters[0] is entry and self.in_flight < self.limit):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self._condition.notify_all()
+                    self._reject(operation, f"нет свободного слота за {timeout:g} сек")
+                self._condition.wait(remaining)
+            heapq.heappop(self._waiters)
+            self._take()
+            # слотов могло освободиться несколько — пусть проверит следующий
+            self._condition.notify_all()
+
+        waited = time.monotonic() - start
+        netbox_bulkhead_wait.observe(waited, self.kind)
+        record("netbox.wait", waited)
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            netbox_bulkhead_in_flight.set(self.in_flight, self.kind)
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "waiting": len(self._waiters),
+                "queue_size": self.queue_size,
+                "rejected": self.rejected,
+            }
+
+    def _take(self):
+        self.in_flight += 1
+        netbox_bulkhead_in_flight.set(self.in_flight, self.kind)
+
+    def _reject(self, operation: str, reason: str):
+        self.rejected += 1
+        netbox_bulkhead_rejected.inc(self.kind, operation)
+        raise NetBoxBusy(self.kind, reason)
+
+
+class Bulkhead:
+    READ = "read"
+    WRITE = "write"
+
+    def __init__(self, reads: int, writes: int, queue_size: int, timeout: float):
+        self.timeout = timeout
+        self._compartments = {
+            self.READ: _Compartment(self.READ, reads, queue_size),
+            self.WRITE: _Compartment(self.WRITE, writes, queue_size),
+        }
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            reads=settings.NETBOX_MAX_CONCURRENT_READS,
+            writes=settings.NETBOX_MAX_CONCURRENT_WRITES,
+            queue_size=settings.NETBOX_BULKHEAD_QUEUE,
+            timeout=settings.NETBOX_BULKHEAD_TIMEOUT,
+        )
+
+    @contextmanager
+    def slot(self, method: str, operation: str):
+        """Держит слот, пока идёт HTTP-запрос"""
+        compartment = self._compartments[self.READ if method in IDEMPOTENT_METHODS else self.WRITE]
+        compartment.acquire(_priority.get(), self.timeout, operation)
+        try:
+            yield
+        finally:
+            compartment.release()
+
+    def stats(self) -> dict:
+        return {kind: compartment.stats() for kind, compartment in self._compartments.items()}
+
+
+def unavailable_response(e: NetBoxUnavailable) -> JsonResponse:
+    response = JsonResponse({"detail": str(e), "retry_after": e.retry_after}, status=503)
+    response["Retry-After"] = str(e.retry_after)
+    return response
+
+
+class NetBoxUnavailableMiddleware:
+    """NetBoxUnavailable из любой view (DRF, async) -> 503 с Retry-After"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if isinstance(exception, NetBoxUnavailable):
+            return unavailable_response(exception)
+        return None
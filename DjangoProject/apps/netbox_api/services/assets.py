@@ -1,39 +1,453 @@
+import base64
+import binascii
 from datetime import date
 
-from apps.netbox_api.services.journal import build_assets_repair_journal, build_assets_modernization_journal
-from apps.netbox_api.netbox_client import NetBoxClient
+from django.conf import settings
 from pynetbox.core.query import RequestError
 
+from apps.netbox_api.services.journal import build_assets_repair_journal, build_assets_modernization_journal
+from apps.netbox_api.netbox_client import get_netbox_client
+from apps.netbox_api.resilience import high_priority
+from apps.netbox_api.services.reference_cache import CacheEntry, reference_cache
+from apps.netbox_api.services.workflow import WorkflowError, WorkflowExecutor, WorkflowStep
+from apps.netbox_api.timing import timed
+
 
 
 class AssetsServiceError(Exception):
     pass
 
+
+class AssetsValidationError(AssetsServiceError):
+    """Проверка assets перед операцией: все проблемные id сразу"""
+    def __init__(self, missing_ids: list[int], used_ids: list[int]):
+        self.missing_ids = missing_ids
+        self.used_ids = used_ids
+        errors = []
+        if missing_ids:
+            errors.append(f"Комплектующие не найдены: asset_id = {', '.join(map(str, missing_ids))}")
+        if used_ids:
+            errors.append(f"Комплектующие уже используются: asset_id = {', '.join(map(str, used_ids))}")
+        super().__init__("; ".join(errors))
+
+
+class AssetsBulkError(AssetsServiceError):
+    """Bulk-операция в NetBox прошла не для всех assets"""
+    def __init__(self, message: str, errors: dict, recreated: dict = None):
+        self.errors = errors
+        # откат удаления: {старый id: новый id} пересозданных assets
+        self.recreated = recreated or {}
+        super().__init__(f"{message}: asset_id = {', '.join(map(str, errors))}")
+
+
+class AssetsWorkflowError(AssetsServiceError):
+    """Один из шагов операции упал; успешные шаги откатаны"""
+    def __init__(self, error: WorkflowError):
+        self.step = error.step
+        self.cause = error.cause
+        self.compensation_errors = error.compensation_errors
+        message = f"{error}. Выполненные шаги откатаны"
+        if error.compensation_errors:
+            message = f"{error}. Откат не удался для: {', '.join(error.compensation_errors)}"
+        super().__init__(message)
+
+
+def ensure_bulk_ok(result, message: str):
+    if not result.ok:
+        raise AssetsBulkError(message, result.errors)
+
+
+def service_error_payload(e: AssetsServiceError) -> dict:
+    """Тело ошибки сервиса; для валидации — списки проблемных asset_id"""
+    payload = {"detail": str(e)}
+    if isinstance(e, AssetsValidationError):
+        payload["missing_asset_ids"] = e.missing_ids
+        payload["used_asset_ids"] = e.used_ids
+    if isinstance(e, AssetsWorkflowError):
+        payload["failed_step"] = e.step
+        payload["rollback_errors"] = e.compensation_errors
+        e = e.cause
+    if isinstance(e, AssetsBulkError):
+        payload["failed_assets"] = [
+            {"id": asset_id, "error": error} for asset_id, error in e.errors.items()
+        ]
+        if e.recreated:
+            payload["recreated_assets"] = [
+                {"old_id": old_id, "new_id": new_id} for old_id, new_id in e.recreated.items()
+            ]
+    return payload
+
+
+def encode_cursor(offset: int) -> str:
+    """Непрозрачный курсор пагинации (внутри — offset NetBox)"""
+    return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    if not cursor:
+        return 0
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, offset = raw.split(":", 1)
+        if prefix != "o" or int(offset) < 0:
+            raise ValueError(cursor)
+        return int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise AssetsServiceError(f"Некорректный cursor: {cursor}")
+
+
+def parse_limit(limit) -> int:
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise AssetsServiceError(f"Некорректный limit: {limit}")
+    if limit <= 0:
+        raise AssetsServiceError(f"Некорректный limit: {limit}")
+    return min(limit, settings.ASSETS_PAGE_MAX_LIMIT)
+
+
+def page_payload(results: list, count: int, offset: int) -> dict:
+    """{count, next_cursor, results}; next_cursor = None на последней странице"""
+    next_offset = offset + len(results)
+    return {
+        "count": count,
+        "next_cursor": encode_cursor(next_offset) if results and next_offset < count else None,
+        "results": results,
+    }
+
+
+def build_site_location_map(sites, locations) -> dict:
+    """
+    Формирует карту: {site_name: {site_id, locations: {loc_name: loc_id}}}
+    """
+    site_location_map = {}
+    site_names = {}
+    for site in sites:
+        site_names[site.id] = site.name
+        site_location_map[site.name] = {
+            "site_id": site.id,
+            "locations": {}
+        }
+
+    for loc in locations:
+        # сайт берём из уже загруженных по id, не разыменовывая loc.site
+        site_name = site_names.get(loc.site.id)
+        if site_name in site_location_map:
+            site_location_map[site_name]["locations"][loc.name] = loc.id
+
+    return site_location_map
+
+
+def choice_value(value):
+    """Значение choice-поля NetBox ("stored"): из Record, JSON {"value", "label"} или строки"""
+    if isinstance(value, dict):
+        return value.get("value")
+    return getattr(value, "value", value)
+
+
+def choice_data(value):
+    """choice-поле в формате JSON NetBox {"value", "label"}, из чего бы оно ни пришло"""
+    if value is None or isinstance(value, dict):
+        return value
+    return {"value": choice_value(value), "label": getattr(value, "label", str(value))}
+
+
+def simplify_asset(asset) -> dict:
+    """Преобразует объект NetBox в простой словарь для frontend"""
+    it = getattr(asset, "inventoryitem_type", None)
+    model_info = {"id": it.id, "model": it.model} if it else {"id": None, "model": "N/A"}
+
+    loc = getattr(asset, "storage_location", None)
+    location_info = {"id": loc.id, "name": loc.name} if loc else {"id": None, "name": "N/A"}
+
+    return {
+        "id": asset.id,
+        "display": getattr(asset, "display", None),
+        "serial": getattr(asset, "serial", None),
+        "status": choice_data(getattr(asset, "status", None)),
+        "model": model_info,
+        "storage_location": location_info,
+        "custom_fields": getattr(asset, "custom_fields", {}),
+    }
+
+
+def simplify_asset_data(data: dict) -> dict:
+    """То же, что simplify_asset, но из сырого JSON NetBox — без pynetbox Record"""
+    it = data.get("inventoryitem_type")
+    model_info = {"id": it["id"], "model": it.get("model")} if it else {"id": None, "model": "N/A"}
+
+    loc = data.get("storage_location")
+    location_info = {"id": loc["id"], "name": loc.get("name")} if loc else {"id": None, "name": "N/A"}
+
+    return {
+        "id": data["id"],
+        "display": data.get("display"),
+        "serial": data.get("serial"),
+        "status": choice_data(data.get("status")),
+        "model": model_info,
+        "storage_location": location_info,
+        "custom_fields": data.get("custom_fields", {}),
+    }
+
+
+def build_assets_payload(
+    items: list[dict],
+    storage_location_id: int,
+    delivery_task: str
+) -> list[dict]:
+    """Разворачивает items (count/serials) в список assets для POST в NetBox"""
+    if not items:
+        raise AssetsServiceError("items не переданы")
+
+    assets_to_create = []
+
+    for item in items:
+        inventoryitem_type_id = item.get("inventoryitem_type_id")
+        count = item.get("count")
+        serials = item.get("serials", [])
+
+        if not inventoryitem_type_id or not count:
+            raise AssetsServiceError(f"Некорректный item: {item}")
+
+        # Случай 1 — с серийниками
+        if serials:
+            if len(serials) != count:
+                raise AssetsServiceError(
+                    f"Количество серийников ({len(serials)}) "
+                    f"не совпадает с count ({count})"
+                )
+
+            for sn in serials:
+                assets_to_create.append({
+                    "inventoryitem_type": inventoryitem_type_id,
+                    "serial": sn.strip() or None,
+                    "status": "stored",
+                    "storage_location": storage_location_id,
+                    "custom_fields": {
+                        "DeliveryTask": delivery_task
+                    }
+                })
+
+        # Случай 2 — без серийников
+        else:
+            for _ in range(count):
+                assets_to_create.append({
+                    "inventoryitem_type": inventoryitem_type_id,
+                    "status": "stored",
+                    "storage_location": storage_location_id,
+                    "custom_fields": {
+                        "DeliveryTask": delivery_task
+                    }
+                })
+
+    return assets_to_create
+
+
+def create_result(created: list[dict], assets_to_create: list[dict], errors: dict) -> dict:
+    """Ответ create_assets: созданные assets и упавшие items с ошибкой NetBox"""
+    return {
+        "created": created,
+        "failed": [
+            {"index": index, "item": assets_to_create[index], "error": error}
+            for index, error in sorted(errors.items())
+        ],
+    }
+
+
+def validate_operation_assets(asset_ids: list[int], found: dict) -> list:
+    """
+    Все assets должны существовать и не быть уже установленными.
+    found — результат get_assets_by_ids; повторяющиеся id учитываются один раз.
+    """
+    ids = list(dict.fromkeys(int(i) for i in asset_ids))
+    missing_ids = [i for i in ids if i not in found]
+    used_ids = [i for i in ids if i in found and choice_value(found[i].status) == "used"]
+    if missing_ids or used_ids:
+        raise AssetsValidationError(missing_ids, used_ids)
+    return [found[i] for i in ids]
+
+
+def operation_result(device, assets, modernization_date: str, assets_key: str) -> dict:
+    """Упрощённый ответ API для ремонта/модернизации"""
+    return {
+        "status": "success",
+        "device": {
+            "id": device.id,
+            "name": device.name,
+            "asset_tag": device.asset_tag,
+            "ModernizationDate": modernization_date,
+        },
+        assets_key: [
+            {
+                "id": a.id,
+                "model": a.inventoryitem_type["model"],
+                "serial": a.serial,
+            }
+            for a in assets
+        ],
+        "total": len(assets),
+    }
+
+
+def journal_entry_payload(device_id: int, journal_comment: str) -> dict:
+    return {
+        "assigned_object_type": "dcim.device",
+        "assigned_object_id": device_id,
+        "kind": "info",
+        "comments": journal_comment,
+    }
+
+
+def repair_asset_update(device_id: int) -> dict:
+    """Изменения asset при установке в устройство"""
+    return {
+        "custom_fields": {
+            "Install_in": device_id
+        },
+        "storage_site": None,
+        "storage_location": None,
+        "status": "used",
+    }
+
+
+def modernization_date_update(modernization_date: str) -> dict:
+    return {"custom_fields": {"ModernizationDate": modernization_date}}
+
+
+def _ref(value):
+    """id вложенного объекта (Record или dict) для записи обратно в NetBox"""
+    if isinstance(value, dict):
+        return value.get("id")
+    return getattr(value, "id", value)
+
+
+def asset_restore_update(asset) -> dict:
+    """Состояние asset до установки в устройство — для отката repair"""
+    custom_fields = getattr(asset, "custom_fields", None) or {}
+    return {
+        "id": asset.id,
+        "status": choice_value(asset.status),
+        "storage_site": _ref(getattr(asset, "storage_site", None)),
+        "storage_location": _ref(getattr(asset, "storage_location", None)),
+        "custom_fields": {"Install_in": _ref(custom_fields.get("Install_in"))},
+    }
+
+
+# поля asset, которые NetBox вычисляет сам — при создании не передаются
+ASSET_READ_ONLY_FIELDS = frozenset({
+    "id", "url", "display", "display_url", "created", "last_updated", "kind", "hardware_type", "hardware",
+})
+
+
+def asset_create_payload(asset) -> dict:
+    """
+    Данные для повторного создания удалённого asset (откат modernization, id будет новым).
+    Все записываемые поля, как их пишет pynetbox: вложенные объекты и теги — id, choice — value.
+    """
+    return {k: v for k, v in asset.serialize().items() if k not in ASSET_READ_ONLY_FIELDS}
+
+
+def device_date_step(client, device, device_id: int, modernization_date: str) -> WorkflowStep:
+    old_date = (getattr(device, "custom_fields", None) or {}).get("ModernizationDate")
+    return WorkflowStep(
+        "device",
+        action=lambda: client.devices.update_device(device, modernization_date_update(modernization_date)),
+        compensate=lambda _: client.devices.patch_device(device_id, modernization_date_update(old_date)),
+    )
+
+
+def journal_step(client, device_id: int, journal_comment: str) -> WorkflowStep:
+    return WorkflowStep(
+        "journal",
+        action=lambda: client.general.create_journal_entry(journal_entry_payload(device_id, journal_comment)),
+        compensate=client.general.delete_journal_entry,
+    )
+
+
+def repair_steps(client, device, device_id: int, assets: list, journal_comment: str, modernization_date: str):
+    """Независимые шаги ремонта: assets, device, journal"""
+    by_id = {asset.id: asset for asset in assets}
+
+    def restore_assets(asset_ids):
+        if asset_ids:
+            ensure_bulk_ok(
+                client.assets.bulk_update_assets([asset_restore_update(by_id[i]) for i in asset_ids]),
+                "Не удалось вернуть комплектующие",
+            )
+
+    def update_assets():
+        result = client.assets.bulk_update_assets(
+            [{"id": asset.id, **repair_asset_update(device_id)} for asset in assets]
+        )
+        if not result.ok:
+            restore_assets(result.succeeded)
+            raise AssetsBulkError("Не удалось обновить комплектующие", result.errors)
+        return result.succeeded
+
+    return [
+        WorkflowStep("assets", update_assets, restore_assets),
+        device_date_step(client, device, device_id, modernization_date),
+        journal_step(client, device_id, journal_comment),
+    ]
+
+
+def modernization_steps(client, device, device_id: int, assets: list, journal_comment: str, modernization_date: str):
+    """
+    Шаги модернизации: device и journal параллельно, удаление assets — последним
+    (final): удаление не откатить без потери id, поэтому только после успеха остальных.
+    """
+    by_id = {asset.id: asset for asset in assets}
+
+    def recreate_assets(asset_ids) -> dict:
+        """{старый id: новый id}"""
+        if not asset_ids:
+            return {}
+        created = client.assets.create_assets([asset_create_payload(by_id[i]) for i in asset_ids])
+        return {old_id: new.id for old_id, new in zip(asset_ids, created)}
+
+    def delete_assets():
+        result = client.assets.bulk_delete_assets([asset.id for asset in assets])
+        if not result.ok:
+            recreated = recreate_assets(result.succeeded)
+            raise AssetsBulkError("Не удалось удалить комплектующие", result.errors, recreated)
+        return result.succeeded
+
+    return [
+        device_date_step(client, device, device_id, modernization_date),
+        journal_step(client, device_id, journal_comment),
+        WorkflowStep("assets", delete_assets, final=True),
+    ]
+
+
+def run_operation_steps(steps: list[WorkflowStep]) -> dict:
+    try:
+        return WorkflowExecutor().run(steps)
+    except WorkflowError as e:
+        raise AssetsWorkflowError(e) from e.cause
+
+
 class BaseService:
     """Инициализация и общие методы"""
 
     def __init__(self):
-        self.client = NetBoxClient()
+        self.client = get_netbox_client()
         
     def get_site_location_map(self):
         """
         Формирует карту: {site_name: {site_id, locations: {loc_name: loc_id}}}
+        Результат кэшируется (reference_cache).
         """
-        site_location_map = {}
-        sites = self.client.general.get_sites()
-        for site in sites:
-            site_location_map[site.name] = {
-                "site_id": site.id,
-                "locations": {}
-            }
-
-        locations = self.client.general.get_locations()
-        for loc in locations:
-            site_name = loc.site.name
-            if site_name in site_location_map:
-                site_location_map[site_name]["locations"][loc.name] = loc.id
-
-        return site_location_map
+        return self.get_site_location_map_entry().value
+
+    def get_site_location_map_entry(self) -> CacheEntry:
+        """Карта сайтов вместе с tag записи кэша (версия для ETag)"""
+        return reference_cache.get_entry(
+            "site_location_map",
+            lambda: build_site_location_map(
+                self.client.general.get_sites(),
+                self.client.general.get_locations(),
+            ),
+        )
 
 
 class AssetsService(BaseService):
@@ -41,95 +455,89 @@ class AssetsService(BaseService):
 
     def _simplify_asset(self, asset):
         """Преобразует объект NetBox в простой словарь для frontend"""
-        it = getattr(asset, "inventoryitem_type", None)
-        model_info = {"id": it.id, "model": it.model} if it else {"id": None, "model": "N/A"}
-
-        loc = getattr(asset, "storage_location", None)
-        location_info = {"id": loc.id, "name": loc.name} if loc else {"id": None, "name": "N/A"}
-
-        return {
-            "id": asset.id,
-            "display": getattr(asset, "display", None),
-            "serial": getattr(asset, "serial", None),
-            "status": getattr(asset, "status", None),
-            "model": model_info,
-            "storage_location": location_info,
-            "custom_fields": getattr(asset, "custom_fields", {}),
-        }
+        return simplify_asset(asset)
 
     def get_assets(self, **filters):
         """Возвращает список упрощённых активов с применением фильтров"""
-        raw_assets = self.client.assets.get_assets(**filters)
-        return [self._simplify_asset(a) for a in raw_assets]
+        raw_assets = list(self.client.assets.get_assets_data(**filters))
+        with timed("simplify"):
+            return [simplify_asset_data(a) for a in raw_assets]
+
+    def get_assets_page(self, limit: int, offset: int = 0, **filters) -> dict:
+        """Одна страница активов: limit/offset уходят в NetBox"""
+        raw_assets, count = self.client.assets.get_assets_page_data(limit, offset, **filters)
+        with timed("simplify"):
+            return page_payload([simplify_asset_data(a) for a in raw_assets], count, offset)
+
+    def iter_assets(self, page_size: int = None, **filters):
+        """
+        Генератор упрощённых активов: NetBox читается страницами,
+        в памяти одновременно только одна страница.
+        """
+        page_size = page_size or settings.ASSETS_STREAM_PAGE_SIZE
+        offset = 0
+        while True:
+            raw_assets, count = self.client.assets.get_assets_page_data(page_size, offset, **filters)
+            for asset in raw_assets:
+                yield simplify_asset_data(asset)
+            offset += len(raw_assets)
+            if not raw_assets or offset >= count:
+                break
 
     def get_asset_by_id(self, asset_id):
         """Возвращает один актив по id"""
-        asset = self.client.assets.get_asset_by_id(asset_id)
+        asset = self.client.assets.get_asset_data_by_id(asset_id)
         if not asset:
             raise AssetsServiceError(f"Asset with id={asset_id} not found")
-        return self._simplify_asset(asset)
+        return simplify_asset_data(asset)
 
     def get_asset_types(self):
-        return {at.model: at.id for at in self.client.assets.get_asset_types()}
+        return self.get_asset_types_entry().value
+
+    def get_asset_types_entry(self) -> CacheEntry:
+        return reference_cache.get_entry(
+            "asset_types",
+            lambda: {at.model: at.id for at in self.client.assets.get_asset_types()},
+        )
+
+    def get_assets_version(self, **filters):
+        """
+        Версия списка активов в NetBox (для ETag) или None, если NetBox её не отдал.
+        Имена типов и локаций вложены в asset, а last_updated asset при их
+        переименовании не меняется — к версии добавляются tag записей
+        reference_cache (как ETag asset_types / site_location), без запросов в NetBox.
+        """
+        try:
+            version = self.client.assets.get_assets_version(**filters)
+        except RequestError:
+            # например, ordering/фильтр не поддерживается — отвечаем без ETag
+            return None
+        if version is None:
+            return None
+        return "/".join((version, self.get_asset_types_entry().tag, self.get_site_location_map_entry().tag))
     
     def create_assets(
         self,
         items: list[dict],
         storage_location_id: int,
         delivery_task: str
-    ) -> list[dict]:
-
-        if not items:
-            raise AssetsServiceError("items не переданы")
-
-        assets_to_create = []
-
-        for item in items:
-            inventoryitem_type_id = item.get("inventoryitem_type_id")
-            count = item.get("count")
-            serials = item.get("serials", [])
-
-            if not inventoryitem_type_id or not count:
-                raise AssetsServiceError(f"Некорректный item: {item}")
-
-            # Случай 1 — с серийниками
-            if serials:
-                if len(serials) != count:
-                    raise AssetsServiceError(
-                        f"Количество серийников ({len(serials)}) "
-                        f"не совпадает с count ({count})"
-                    )
-
-                for sn in serials:
-                    assets_to_create.append({
-                        "inventoryitem_type": inventoryitem_type_id,
-                        "serial": sn.strip() or None,
-                        "status": "stored",
-                        "storage_location": storage_location_id,
-                        "custom_fields": {
-                            "DeliveryTask": delivery_task
-                        }
-                    })
-
-            # Случай 2 — без серийников
-            else:
-                for _ in range(count):
-                    assets_to_create.append({
-                        "inventoryitem_type": inventoryitem_type_id,
-                        "status": "stored",
-                        "storage_location": storage_location_id,
-                        "custom_fields": {
-                            "DeliveryTask": delivery_task
-                        }
-                    })
-
-        try:
-            created_assets = self.client.assets.create_assets(assets_to_create)
-            return [self._simplify_asset(a) for a in created_assets]
-
-        except RequestError as e:
-            raise AssetsServiceError(f"Ошибка NetBox: {e}")
+    ) -> dict:
+        """
+        Создание assets чанками (NETBOX_CREATE_CHUNK_SIZE, до NETBOX_CREATE_MAX_WORKERS
+        параллельных POST). Упавшие чанки не отменяют остальные:
+            {"created": [...], "failed": [{"index", "item", "error"}]}
+        """
+        assets_to_create = build_assets_payload(items, storage_location_id, delivery_task)
+        result = self.client.assets.bulk_create_assets(assets_to_create)
+        with timed("simplify"):
+            created = [self._simplify_asset(a) for a in result.succeeded]
+        return create_result(
+            created,
+            assets_to_create,
+            result.errors,
+        )
         
+    @high_priority
     def assets_repair(
         self,
         asset_ids: list[int],
@@ -141,14 +549,9 @@ class AssetsService(BaseService):
         if not device:
             raise AssetsServiceError(f"Устройства device_id-{device_id} не найдено")
 
-        assets = []
-        for asset_id in asset_ids:
-            asset = self.client.assets.get_asset_by_id(asset_id)
-            if not asset:
-                raise AssetsServiceError(f"Комплектующая asset_id-{asset_id} не найдена")
-            if asset.status == "used":
-                raise AssetsServiceError(f"Комплектующая asset_id = {asset_id} уже используется")
-            assets.append(asset)
+        assets = validate_operation_assets(
+            asset_ids, self.client.assets.get_assets_by_ids(asset_ids)
+        )
 
         # ---- формируем journal ----
         journal_comment = build_assets_repair_journal(
@@ -159,66 +562,19 @@ class AssetsService(BaseService):
             jira_url=self.client.jira_url,
         )
 
-        # ---- обновляем assets ----
-
-        for asset in assets:
-            self.client.assets.update_asset(
-                asset,
-                {
-                    "custom_fields": {
-                        "Install_in": device_id
-                    },
-                    "storage_site": None,
-                    "storage_location": None,
-                    "status": "used",
-                },
-            )
-
-        # ---- обновляем device ----
+        # ---- assets, device и journal не зависят друг от друга: параллельно ----
 
         modernization_date = date.today().isoformat()
 
-        self.client.devices.update_device(
-            device,
-            {
-                "custom_fields": {
-                    "ModernizationDate": modernization_date
-                }
-            },
-        )
-
-        # ---- journal ----
-
-        self.client.general.create_journal_entry(
-            {
-                "assigned_object_type": "dcim.device",
-                "assigned_object_id": device_id,
-                "kind": "info",
-                "comments": journal_comment,
-            }
-        )
+        run_operation_steps(repair_steps(
+            self.client, device, device_id, assets, journal_comment, modernization_date
+        ))
 
         # ---- ответ API (упрощённый) ----
 
-        return {
-            "status": "success",
-            "device": {
-                "id": device.id,
-                "name": device.name,
-                "asset_tag": device.asset_tag,
-                "ModernizationDate": modernization_date,
-            },
-            "installed_assets": [
-                {
-                    "id": a.id,
-                    "model": a.inventoryitem_type["model"],
-                    "serial": a.serial,
-                }
-                for a in assets
-            ],
-            "total": len(assets),
-        }
+        return operation_result(device, assets, modernization_date, "installed_assets")
     
+    @high_priority
     def assets_modernization(
         self,
         asset_ids: list[int],
@@ -230,14 +586,9 @@ class AssetsService(BaseService):
         if not device:
             raise AssetsServiceError(f"Устройства device_id = {device_id} не найдено")
     
-        assets = []
-        for asset_id in asset_ids:
-            asset = self.client.assets.get_asset_by_id(asset_id)
-            if not asset:
-                raise AssetsServiceError(f"Комплектующая asset_id = {asset_id} не найдена")
-            if asset.status == "used":
-                raise AssetsServiceError(f"Комплектующая asset_id = {asset_id} уже используется")
-            assets.append(asset)
+        assets = validate_operation_assets(
+            asset_ids, self.client.assets.get_assets_by_ids(asset_ids)
+        )
 
         # ---- формируем journal ----
         journal_comment = build_assets_modernization_journal(
@@ -248,43 +599,11 @@ class AssetsService(BaseService):
             jira_url=self.client.jira_url,
         )
 
-        # ---- удаляем активы из NetBox ----
-        for asset in assets:
-            self.client.assets.delete_asset(asset)
-
-        # ---- обновляем device ----
+        # ---- device и journal параллельно, удаление assets — последним; с откатом ----
         modernization_date = date.today().isoformat()
-        self.client.devices.update_device(
-            device,
-            {"custom_fields": {"ModernizationDate": modernization_date}},
-        )
-
-        # ---- создаём journal entry ----
-        self.client.general.create_journal_entry(
-            {
-                "assigned_object_type": "dcim.device",
-                "assigned_object_id": device_id,
-                "kind": "info",
-                "comments": journal_comment,
-            }
-        )
+        run_operation_steps(modernization_steps(
+            self.client, device, device_id, assets, journal_comment, modernization_date
+        ))
 
         # ---- упрощённый ответ ----
-        return {
-            "status": "success",
-            "device": {
-                "id": device.id,
-                "name": device.name,
-                "asset_tag": device.asset_tag,
-                "ModernizationDate": modernization_date,
-            },
-            "removed_assets": [
-                {
-                    "id": a.id,
-                    "model": a.inventoryitem_type["model"],
-                    "serial": a.serial,
-                }
-                for a in assets
-            ],
-            "total": len(assets),
-        }
\ No newline at end of file
+        return operation_result(device, assets, modernization_date, "removed_assets")
@@ -0,0 +1,131 @@
+import asyncio
+from datetime import date
+
+from apps.netbox_api.async_netbox_client import AsyncNetBoxClient, run_in_netbox_executor
+from apps.netbox_api.resilience import high_priority
+from apps.netbox_api.services.assets import (
+    AssetsService,
+    AssetsServiceError,
+    BaseService,
+    build_assets_payload,
+    create_result,
+    modernization_steps,
+    operation_result,
+    repair_steps,
+    run_operation_steps,
+    simplify_asset,
+    simplify_asset_data,
+    validate_operation_assets,
+)
+from apps.netbox_api.services.journal import build_assets_repair_journal, build_assets_modernization_journal
+from apps.netbox_api.timing import timed
+
+
+class AsyncBaseService:
+    """Async-версия BaseService"""
+
+    def __init__(self):
+        self.client = AsyncNetBoxClient()
+
+    async def get_site_location_map(self):
+        """
+        Формирует карту: {site_name: {site_id, locations: {loc_name: loc_id}}}
+        Идёт через тот же reference_cache, что и sync-версия.
+        """
+        return await run_in_netbox_executor(BaseService().get_site_location_map)
+
+
+class AsyncAssetsService(AsyncBaseService):
+    """Async-версия AssetsService: те же операции, запросы к NetBox идут параллельно"""
+
+    async def get_assets(self, **filters):
+        raw_assets = await self.client.assets.get_assets_data(**filters)
+        with timed("simplify"):
+            return [simplify_asset_data(a) for a in raw_assets]
+
+    async def get_asset_by_id(self, asset_id):
+        asset = await self.client.assets.get_asset_data_by_id(asset_id)
+        if not asset:
+            raise AssetsServiceError(f"Asset with id={asset_id} not found")
+        return simplify_asset_data(asset)
+
+    async def get_asset_types(self):
+        return await run_in_netbox_executor(AssetsService().get_asset_types)
+
+    async def create_assets(
+        self,
+        items: list[dict],
+        storage_location_id: int,
+        delivery_task: str
+    ) -> dict:
+
+        assets_to_create = build_assets_payload(items, storage_location_id, delivery_task)
+        result = await self.client.assets.bulk_create_assets(assets_to_create)
+        with timed("simplify"):
+            created = [simplify_asset(a) for a in result.succeeded]
+        return create_result(
+            created,
+            assets_to_create,
+            result.errors,
+        )
+
+    async def _load_device_and_assets(self, device_id: int, asset_ids: list[int]):
+        """device и пакет assets запрашиваются одновременно"""
+        device, found = await asyncio.gather(
+            self.client.devices.get_device(device_id),
+            self.client.assets.get_assets_by_ids(asset_ids),
+        )
+        if not device:
+            raise AssetsServiceError(f"Устройства device_id = {device_id} не найдено")
+        return device, validate_operation_assets(asset_ids, found)
+
+    @high_priority
+    async def assets_repair(
+        self,
+        asset_ids: list[int],
+        device_id: int,
+        jira_task: str,
+    ) -> dict:
+
+        device, assets = await self._load_device_and_assets(device_id, asset_ids)
+
+        journal_comment = build_assets_repair_journal(
+            device=device,
+            assets=assets,
+            jira_task=jira_task,
+            netbox_url=self.client.netbox_url,
+            jira_url=self.client.jira_url,
+        )
+
+        # шаги те же, что в sync-версии: параллельно и с откатом
+        modernization_date = date.today().isoformat()
+        await run_in_netbox_executor(run_operation_steps, repair_steps(
+            self.client.sync_client, device, device_id, assets, journal_comment, modernization_date
+        ))
+
+        return operation_result(device, assets, modernization_date, "installed_assets")
+
+    @high_priority
+    async def assets_modernization(
+        self,
+        asset_ids: list[int],
+        device_id: int,
+        jira_task: str,
+    ) -> dict:
+
+        device, assets = await self._load_device_and_assets(device_id, asset_ids)
+
+        journal_comment = build_assets_modernization_journal(
+            device=device,
+            assets=assets,
+            jira_task=jira_task,
+            netbox_url=self.client.netbox_url,
+            jira_url=self.client.jira_url,
+        )
+
+        modernization_date = date.today().isoformat()
+        await run_in_netbox_executor(run_operation_steps, modernization_steps(
+            self.client.sync_client, device, device_id, assets, journal_comment, modernization_date
+        ))
+
+        return operation_result(device, assets, modernization_date, "removed_assets")
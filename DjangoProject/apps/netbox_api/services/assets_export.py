@@ -0,0 +1,99 @@
+"""
+Выгрузка активов в CSV/XLSX без загрузки всего списка в память.
+
+assets — генератор упрощённых активов (AssetsService.iter_assets или
+MirrorReader.iter_assets), NetBox читается страницами по мере записи.
+
+    - CSV: строки отдаются клиенту сразу, пачками по ~64 KB;
+    - XLSX: openpyxl write-only пишет строки во временный файл на диске,
+      файл отдаётся после последней страницы (zip собирается только в save).
+"""
+import csv
+import tempfile
+
+from openpyxl import Workbook
+
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+EXPORT_COLUMNS = (
+    ("ID", lambda a: a["id"]),
+    ("Название", lambda a: a.get("display")),
+    ("Серийный номер", lambda a: a.get("serial")),
+    ("Статус", lambda a: a.get("status")),
+    ("Модель", lambda a: (a.get("model") or {}).get("model")),
+    ("Локация хранения", lambda a: (a.get("storage_location") or {}).get("name")),
+    ("Поставка", lambda a: (a.get("custom_fields") or {}).get("DeliveryTask")),
+    ("Установлен в", lambda a: (a.get("custom_fields") or {}).get("Install_in")),
+    ("Дата модернизации", lambda a: (a.get("custom_fields") or {}).get("ModernizationDate")),
+)
+
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def _cell(value):
+    """Значение ячейки: вложенные объекты NetBox -> display/name/id, choice {"value", "label"} -> label"""
+    if isinstance(value, dict):
+        return value.get("display") or value.get("name") or value.get("label") or value.get("value") or value.get("id")
+    if isinstance(value, list):
+        return ", ".join(str(_cell(v)) for v in value)
+    return value
+
+
+def export_row(asset: dict) -> list:
+    return [_cell(getter(asset)) for _, getter in EXPORT_COLUMNS]
+
+
+class _LineBuffer:
+    """file-like для csv.writer: копит строки до EXPORT_CHUNK_SIZE"""
+
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def write(self, value: str):
+        self.parts.append(value)
+        self.size += len(value)
+
+    def pop(self) -> bytes:
+        data = "".join(self.parts).encode()
+        self.parts, self.size = [], 0
+        return data
+
+
+def iter_csv(assets):
+    """CSV для Excel: BOM + разделитель ';'"""
+    buffer = _LineBuffer()
+    writer = csv.writer(buffer, delimiter=";")
+    buffer.write("\ufeff")
+    writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for asset in assets:
+        writer.writerow(export_row(asset))
+        if buffer.size >= EXPORT_CHUNK_SIZE:
+            yield buffer.pop()
+    yield buffer.pop()
+
+
+def write_xlsx(assets, file):
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Assets")
+    sheet.append([name for name, _ in EXPORT_COLUMNS])
+    for asset in assets:
+        sheet.append(export_row(asset))
+    workbook.save(file)
+
+
+def iter_xlsx(assets):
+    with tempfile.TemporaryFile() as file:
+        write_xlsx(assets, file)
+        file.seek(0)
+        while chunk := file.read(EXPORT_CHUNK_SIZE):
+            yield chunk
+
+
+EXPORT_WRITERS = {
+    "csv": iter_csv,
+    "xlsx": iter_xlsx,
+}
@@ -0,0 +1,228 @@
+"""
+Приёмка поставки из Excel (.xlsx) или CSV.
+
+Файл читается построчно (openpyxl read-only / csv.reader), модель
+превращается в inventoryitem_type id по кэшированной карте типов,
+assets создаются через AssetsService.create_assets пачками по
+DELIVERY_IMPORT_BATCH_SIZE. В памяти держится только текущая пачка.
+
+Формат: первая строка — заголовки. Обязательна колонка модели и
+одна из колонок serial / count:
+    model | serial | count
+"""
+import csv
+import io
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+from openpyxl import load_workbook
+
+from apps.netbox_api.services.assets import AssetsService, AssetsServiceError
+
+# заголовок колонки (в нижнем регистре) -> поле строки
+HEADER_ALIASES = {
+    "model": "model",
+    "модель": "model",
+    "inventoryitem_type": "model",
+    "serial": "serial",
+    "serial number": "serial",
+    "серийный номер": "serial",
+    "серийник": "serial",
+    "count": "count",
+    "qty": "count",
+    "количество": "count",
+    "кол-во": "count",
+}
+
+
+class DeliveryImportError(AssetsServiceError):
+    """Файл целиком не подходит для импорта (формат, заголовки)"""
+
+
+@dataclass
+class DeliveryRow:
+    row: int
+    model: str
+    serial: str = None
+    count: int = 1
+
+
+@dataclass
+class DeliveryImportResult:
+    rows: int = 0
+    created_count: int = 0
+    created_ids: list[int] = field(default_factory=list)
+    # [{"row": N, "error": "..."}]
+    errors: list[dict] = field(default_factory=list)
+
+    def add_error(self, row: int, error: str):
+        self.errors.append({"row": row, "error": error})
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _iter_xlsx(file):
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        for values in workbook.active.iter_rows(values_only=True):
+            yield [_cell(v) for v in values]
+    finally:
+        workbook.close()
+
+
+def _iter_csv(file):
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        sample = text.read(4096)
+        text.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=";,\t")
+        except csv.Error:
+            dialect = csv.excel
+        for values in csv.reader(text, dialect):
+            yield [_cell(v) for v in values]
+    finally:
+        # не закрываем загруженный файл вместе с обёрткой
+        text.detach()
+
+
+def iter_sheet_rows(file, filename: str):
+    """Строки файла списками строк; формат по расширению"""
+    suffix = Path(filename or "").suffix.lower()
+    if suffix in (".xlsx", ".xlsm"):
+        return _iter_xlsx(file)
+    if suffix in (".csv", ".txt"):
+        return _iter_csv(file)
+    raise DeliveryImportError(f"Неподдерживаемый формат файла: {filename}. Нужен .xlsx или .csv")
+
+
+def parse_header(values: list[str]) -> dict[str, int]:
+    """{поле: индекс колонки}"""
+    columns = {}
+    for index, name in enumerate(values):
+        key = HEADER_ALIASES.get(name.lower())
+        if key and key not in columns:
+            columns[key] = index
+    if "model" not in columns:
+        raise DeliveryImportError("В файле нет колонки model")
+    if "serial" not in columns and "count" not in columns:
+        raise DeliveryImportError("В файле нет колонки serial или count")
+    return columns
+
+
+def parse_row(row: int, values: list[str], columns: dict[str, int]) -> DeliveryRow:
+    """DeliveryRow или None для пустой строки; ValueError с текстом ошибки"""
+    def get(key):
+        index = columns.get(key)
+        return values[index] if index is not None and index < len(values) else ""
+
+    model, serial, count = get("model"), get("serial"), get("count")
+    if not any((model, serial, count)):
+        return None
+    if not model:
+        raise ValueError("не указана модель")
+
+    if count:
+        try:
+            count = int(float(count))
+        except ValueError:
+            raise ValueError(f"некорректное количество: {count}")
+        if count < 1:
+            raise ValueError(f"некорректное количество: {count}")
+    else:
+        count = 1
+
+    if serial and count != 1:
+        raise ValueError("для строки с серийным номером количество должно быть 1")
+    return DeliveryRow(row=row, model=model, serial=serial or None, count=count)
+
+
+class DeliveryImportService:
+    def __init__(self, assets_service: AssetsService = None):
+        self.assets_service = assets_service or AssetsService()
+
+    def import_file(
+        self,
+        file,
+        filename: str,
+        storage_location_id: int,
+        delivery_task: str,
+        batch_size: int = None,
+    ) -> DeliveryImportResult:
+        batch_size = batch_size or settings.DELIVERY_IMPORT_BATCH_SIZE
+        # регистр и пробелы в названии модели в файлах не совпадают с NetBox
+        type_map = {
+            model.strip().lower(): type_id
+            for model, type_id in self.assets_service.get_asset_types().items()
+        }
+
+        result = DeliveryImportResult()
+        batch: list[DeliveryRow] = []
+        batch_assets = 0
+        columns = None
+
+        for row, values in enumerate(iter_sheet_rows(file, filename), start=1):
+            if columns is None:
+                if any(values):
+                    columns = parse_header(values)
+                continue
+
+            try:
+                delivery_row = parse_row(row, values, columns)
+            except ValueError as e:
+                result.rows += 1
+                result.add_error(row, str(e))
+                continue
+            if delivery_row is None:
+                continue
+
+            result.rows += 1
+            if delivery_row.model.lower() not in type_map:
+                result.add_error(row, f"неизвестная модель: {delivery_row.model}")
+                continue
+
+            batch.append(delivery_row)
+            batch_assets += delivery_row.count
+            if batch_assets >= batch_size:
+                self._flush(batch, type_map, storage_location_id, delivery_task, result)
+                batch, batch_assets = [], 0
+
+        if columns is None:
+            raise DeliveryImportError("Файл пустой")
+        if batch:
+            self._flush(batch, type_map, storage_location_id, delivery_task, result)
+        return result
+
+    def _flush(self, batch, type_map, storage_location_id, delivery_task, result):
+        items = [
+            {
+                "inventoryitem_type_id": type_map[r.model.lower()],
+                "count": r.count,
+                "serials": [r.serial] if r.serial else [],
+            }
+            for r in batch
+        ]
+        # индекс asset в payload -> строка файла (count разворачивается в несколько assets)
+        rows_by_index = [r.row for r in batch for _ in range(r.count)]
+        try:
+            created = self.assets_service.create_assets(items, storage_location_id, delivery_task)
+        except AssetsServiceError as e:
+            for row in dict.fromkeys(rows_by_index):
+                result.add_error(row, str(e))
+            return
+
+        result.created_count += len(created["created"])
+        result.created_ids.extend(a["id"] for a in created["created"])
+        reported = set()
+        for failed in created["failed"]:
+            row = rows_by_index[failed["index"]]
+            if row not in reported:
+                reported.add(row)
+                result.add_error(row, failed["error"])
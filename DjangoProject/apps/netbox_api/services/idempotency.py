@@ -0,0 +1,142 @@
+"""
+Idempotency-Key для операций, меняющих данные в NetBox.
+
+    - первый запрос с ключом создаёт запись IdempotencyKey (in_progress),
+      выполняет операцию и сохраняет ответ: статус, тело и заголовки
+      вроде Location/ETag;
+    - повтор с тем же ключом в пределах IDEMPOTENCY_KEY_TTL получает
+      сохранённый ответ (один SELECT по уникальному индексу, без NetBox);
+    - параллельный дубль ждёт завершения исходного запроса: в том же
+      процессе — на Event, из другого процесса — опросом БД;
+    - тот же ключ с другим телом запроса — IdempotencyConflict.
+
+Ответы 5xx и исключения не сохраняются: запись удаляется, повтор
+выполнит операцию заново.
+"""
+import hashlib
+import json
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from apps.netbox_api.models import IdempotencyKey
+
+POLL_INTERVAL = 0.05
+
+
+class IdempotencyError(Exception):
+    pass
+
+
+class IdempotencyConflict(IdempotencyError):
+    """Ключ уже использован с другим телом запроса"""
+
+
+class IdempotencyInProgress(IdempotencyError):
+    """Исходный запрос не завершился за IDEMPOTENCY_WAIT_TIMEOUT"""
+
+
+def request_fingerprint(data) -> str:
+    body = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+class IdempotencyService:
+    # (scope, key) -> Event выполняющегося в этом процессе запроса
+    _inflight: dict = {}
+    _inflight_lock = threading.Lock()
+
+    def run(self, scope: str, key: str, request_hash: str, execute):
+        """
+        execute() -> (status, body, headers). Возвращает (status, body, headers, replayed).
+        """
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+        while True:
+            record = self._claim(scope, key, request_hash)
+            if record is None:
+                return (*self._execute(scope, key, execute), False)
+
+            if record.request_hash != request_hash:
+                raise IdempotencyConflict(
+                    f"Idempotency-Key {key} уже использован с другими параметрами запроса"
+                )
+            if record.state == IdempotencyKey.COMPLETED:
+                return record.response_status, record.response_body, record.response_headers or {}, True
+
+            if time.monotonic() >= deadline:
+                raise IdempotencyInProgress(f"Запрос с Idempotency-Key {key} ещё выполняется")
+            self._wait(scope, key, deadline)
+
+    def _claim(self, scope: str, key: str, request_hash: str):
+        """None — ключ наш, выполняем; иначе существующая запись"""
+        now = timezone.now()
+        record = IdempotencyKey.objects.filter(scope=scope, key=key).first()
+        if record is not None:
+            if record.expires_at > now and not self._abandoned(record, now):
+                return record
+            # истёк срок хранения или исполнитель умер, не дописав ответ
+            IdempotencyKey.objects.filter(pk=record.pk, state=record.state).delete()
+
+        IdempotencyKey.objects.filter(expires_at__lte=now).delete()
+        try:
+            with transaction.atomic():
+                IdempotencyKey.objects.create(
+                    scope=scope,
+                    key=key,
+                    request_hash=request_hash,
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+                )
+        except IntegrityError:
+            # параллельный запрос успел раньше
+            return IdempotencyKey.objects.filter(scope=scope, key=key).first() or self._claim(
+                scope, key, request_hash
+            )
+        return None
+
+    @staticmethod
+    def _abandoned(record, now) -> bool:
+        return (
+            record.state == IdempotencyKey.IN_PROGRESS
+            and now - record.created_at > timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+        )
+
+    def _execute(self, scope: str, key: str, execute):
+        event = threading.Event()
+        with self._inflight_lock:
+            self._inflight[(scope, key)] = event
+        try:
+            try:
+                status, body, headers = execute()
+            except BaseException:
+                IdempotencyKey.objects.filter(scope=scope, key=key).delete()
+                raise
+
+            if status >= 500:
+                IdempotencyKey.objects.filter(scope=scope, key=key).delete()
+            else:
+                IdempotencyKey.objects.filter(scope=scope, key=key).update(
+                    state=IdempotencyKey.COMPLETED,
+                    response_status=status,
+                    response_body=body,
+                    response_headers=headers,
+                )
+            return status, body, headers
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop((scope, key), None)
+            event.set()
+
+    def _wait(self, scope: str, key: str, deadline: float):
+        with self._inflight_lock:
+            event = self._inflight.get((scope, key))
+        timeout = max(0.0, deadline - time.monotonic())
+        if event is not None:
+            event.wait(timeout)
+        else:
+            time.sleep(min(POLL_INTERVAL, timeout))
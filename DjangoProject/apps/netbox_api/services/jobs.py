@@ -0,0 +1,237 @@
+"""
+Очередь фоновых задач в БД (модель Job).
+
+    - enqueue(kind, params) — из view, ответ 202 с id задачи;
+    - JobWorker (manage.py run_jobs) забирает задачи из очереди,
+      выполняет обработчик из JOB_HANDLERS и пишет прогресс/результат/ошибку;
+    - состояние задачи отдаёт /inventory/jobs/<id>/.
+
+Забор задачи — условный UPDATE state=queued -> running, поэтому
+несколько воркеров (процессов или потоков) не возьмут одну задачу дважды.
+
+Пока задача выполняется, воркер обновляет heartbeat_at. Задачу, у которой
+heartbeat_at старше JOBS_STALE_TIMEOUT (процесс убит, OOM, перезапуск),
+любой воркер помечает failed. Обратно в очередь не ставим: create и
+repair/modernization не идемпотентны, часть изменений уже могла попасть в NetBox.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.netbox_api.identity_map import identity_scope
+from apps.netbox_api.models import Job
+from apps.netbox_api.progress import progress_scope
+from apps.netbox_api.services.assets import AssetsService, AssetsServiceError, service_error_payload
+
+logger = logging.getLogger(__name__)
+
+
+def asset_count(items: list[dict]) -> int:
+    """Сколько assets создаст create_assets по items"""
+    return sum(int(item.get("count") or 0) for item in items or [])
+
+
+def _legacy_dcim():
+    # импорт здесь: legacy-клиент создаёт собственную сессию NetBox
+    from apps.netbox_api.old_netbox_client import NetBoxClient
+    return NetBoxClient().dcim
+
+
+def _legacy_result(result):
+    """legacy-методы возвращают {"error": ...} вместо исключения"""
+    if isinstance(result, dict) and "error" in result and not result.get("created"):
+        raise AssetsServiceError(result["error"])
+    return result
+
+
+# kind -> (обработчик(params) -> результат, total(params) -> кол-во объектов)
+JOB_HANDLERS = {
+    "assets_create": (
+        lambda p: AssetsService().create_assets(p["items"], int(p["storage_location_id"]), p["delivery_task"]),
+        lambda p: asset_count(p.get("items")),
+    ),
+    "assets_repair": (
+        lambda p: AssetsService().assets_repair(p["asset_ids"], p["device_id"], p["jira_task"]),
+        lambda p: len(p.get("asset_ids") or []),
+    ),
+    "assets_modernization": (
+        lambda p: AssetsService().assets_modernization(p["asset_ids"], p["device_id"], p["jira_task"]),
+        lambda p: len(p.get("asset_ids") or []),
+    ),
+    "devices_create": (
+        lambda p: _legacy_result(_legacy_dcim().create_devices(p["devices"])),
+        lambda p: len(p.get("devices") or []),
+    ),
+    "cables_create": (
+        lambda p: _legacy_result(_legacy_dcim().create_cables(p["cables"])),
+        lambda p: len(p.get("cables") or []),
+    ),
+}
+
+
+def enqueue(kind: str, params: dict) -> Job:
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Неизвестный тип задачи: {kind}")
+    _, total = JOB_HANDLERS[kind]
+    return Job.objects.create(kind=kind, params=params, total=total(params))
+
+
+def run_in_background(asset_count: int, force: bool = False) -> bool:
+    """Уводить ли операцию в очередь: по размеру или по явному запросу клиента"""
+    return force or asset_count > settings.JOBS_INLINE_MAX_OBJECTS
+
+
+def job_payload(job: Job) -> dict:
+    return {
+        "id": str(job.id),
+        "kind": job.kind,
+        "state": job.state,
+        "progress": job.progress,
+        "total": job.total,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "heartbeat_at": job.heartbeat_at,
+        "finished_at": job.finished_at,
+    }
+
+
+class ProgressReporter:
+    """Копит advance() и пишет прогресс в БД не чаще раза в interval секунд"""
+
+    def __init__(self, job: Job, interval: float = 0.5):
+        self.job = job
+        self.interval = interval
+        self.done = 0
+        self._saved_at = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, count: int):
+        with self._lock:
+            self.done += count
+            now = time.monotonic()
+            if now - self._saved_at < self.interval:
+                return
+            self._saved_at = now
+        Job.objects.filter(pk=self.job.pk).update(progress=self.progress)
+
+    @property
+    def progress(self) -> int:
+        # откат операции тоже вызывает advance — не показываем больше total
+        return min(self.done, self.job.total) if self.job.total else self.done
+
+
+class Heartbeat:
+    """Фоновый поток: раз в interval секунд обновляет heartbeat_at задачи"""
+
+    def __init__(self, job: Job, interval: float = None):
+        self.job = job
+        self.interval = settings.JOBS_HEARTBEAT_INTERVAL if interval is None else interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"job-heartbeat-{job.pk}", daemon=True)
+
+    def beat(self):
+        Job.objects.filter(pk=self.job.pk, state=Job.RUNNING).update(heartbeat_at=timezone.now())
+
+    def _run(self):
+        try:
+            while not self._stop.wait(self.interval):
+                self.beat()
+        finally:
+            connection.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+class JobWorker:
+    def __init__(self, name: str = None):
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+    def claim(self):
+        """Следующая задача из очереди или None"""
+        for job in Job.objects.filter(state=Job.QUEUED).order_by("created_at")[:10]:
+            now = timezone.now()
+            claimed = Job.objects.filter(pk=job.pk, state=Job.QUEUED).update(
+                state=Job.RUNNING, worker=self.name, started_at=now, heartbeat_at=now
+            )
+            if claimed:
+                job.refresh_from_db()
+                return job
+        return None
+
+    def fail_stale(self) -> int:
+        """RUNNING-задачи, чей воркер перестал отмечаться, -> failed; сколько таких"""
+        deadline = timezone.now() - timedelta(seconds=settings.JOBS_STALE_TIMEOUT)
+        stale = Job.objects.filter(state=Job.RUNNING).filter(
+            Q(heartbeat_at__lt=deadline) | Q(heartbeat_at__isnull=True, started_at__lt=deadline)
+        )
+        failed = 0
+        for job in stale[:100]:
+            # условие на heartbeat_at: не трогаем, если воркер успел отметиться
+            updated = Job.objects.filter(pk=job.pk, state=Job.RUNNING, heartbeat_at=job.heartbeat_at).update(
+                state=Job.FAILED,
+                finished_at=timezone.now(),
+                error={"detail": f"Воркер {job.worker} перестал отвечать, задача не завершена. "
+                                 f"Часть изменений могла попасть в NetBox"},
+            )
+            if updated:
+                logger.warning("job %s (%s): worker %s is gone, marked failed", job.id, job.kind, job.worker)
+                failed += 1
+        return failed
+
+    def run_job(self, job: Job):
+        handler, _ = JOB_HANDLERS[job.kind]
+        reporter = ProgressReporter(job)
+        fields = {}
+        try:
+            with Heartbeat(job), identity_scope(), progress_scope(reporter):
+                result = handler(job.params)
+        except AssetsServiceError as e:
+            fields.update(state=Job.FAILED, error=service_error_payload(e))
+        except Exception:
+            # traceback — только в лог: error отдаётся клиенту в /inventory/jobs/<id>/
+            logger.exception("job %s (%s) failed", job.id, job.kind)
+            fields.update(state=Job.FAILED, error={"detail": "Внутренняя ошибка задачи, подробности в логе воркера"})
+        else:
+            fields.update(state=Job.SUCCEEDED, result=result)
+
+        succeeded = fields["state"] == Job.SUCCEEDED
+        fields["progress"] = job.total if succeeded and job.total else reporter.progress
+        fields["finished_at"] = timezone.now()
+        Job.objects.filter(pk=job.pk).update(**fields)
+        return fields["state"]
+
+    def run(self, once: bool = False, poll_interval: float = None, stop: threading.Event = None):
+        """Обрабатывает очередь; once — выйти, когда очередь пуста"""
+        poll_interval = settings.JOBS_POLL_INTERVAL if poll_interval is None else poll_interval
+        stop = stop or threading.Event()
+        processed = 0
+        while not stop.is_set():
+            close_old_connections()
+            self.fail_stale()
+            job = self.claim()
+            if job is None:
+                if once:
+                    break
+                stop.wait(poll_interval)
+                continue
+            logger.info("job %s (%s) started by %s", job.id, job.kind, self.name)
+            state = self.run_job(job)
+            logger.info("job %s (%s) %s", job.id, job.kind, state)
+            processed += 1
+        return processed
@@ -1,3 +1,7 @@
+from apps.netbox_api.timing import timed
+
+
+@timed("journal")
 def build_assets_repair_journal(
     *,
     device,
@@ -28,6 +32,7 @@ def build_assets_repair_journal(
         + "\n".join(lines)
     )
 
+@timed("journal")
 def build_assets_modernization_journal(
     *,
     device,
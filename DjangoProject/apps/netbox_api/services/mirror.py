@@ -0,0 +1,391 @@
+"""
+Локальное зеркало inventory-данных NetBox (sites, locations, item types, assets).
+
+Синхронизация:
+    - delta: забираем только объекты с last_updated >= курсора;
+    - full (reconcile): забираем всё и удаляем из зеркала то, чего в NetBox уже нет.
+
+Чтение: MirrorReader отдаёт данные в том же формате, что и AssetsService,
+если зеркало достаточно свежее (NETBOX_MIRROR_MAX_AGE).
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.netbox_api.models import (
+    MirrorAsset,
+    MirrorAssetType,
+    MirrorLocation,
+    MirrorSite,
+    MirrorSyncState,
+)
+from apps.netbox_api.netbox_client import get_netbox_client
+from apps.netbox_api.services.assets import choice_data
+
+
+def _last_updated(record):
+    value = getattr(record, "last_updated", None)
+    return parse_datetime(value) if isinstance(value, str) else value
+
+
+def _nested(record, attr, field):
+    nested = getattr(record, attr, None)
+    return getattr(nested, field, None) if nested else None
+
+
+def site_fields(site) -> dict:
+    return {"name": site.name}
+
+
+def location_fields(loc) -> dict:
+    return {
+        "name": loc.name,
+        "site_id": _nested(loc, "site", "id"),
+        "site_name": _nested(loc, "site", "name") or "",
+    }
+
+
+def asset_type_fields(at) -> dict:
+    return {"model": at.model}
+
+
+def asset_fields(asset) -> dict:
+    # status в NetBox — choice: фильтруем по value, отдаём {"value", "label"}
+    status = choice_data(getattr(asset, "status", None)) or {}
+    return {
+        "display": getattr(asset, "display", None),
+        "serial": getattr(asset, "serial", None),
+        "status": status.get("value"),
+        "status_label": status.get("label"),
+        "inventoryitem_type_id": _nested(asset, "inventoryitem_type", "id"),
+        "inventoryitem_type_model": _nested(asset, "inventoryitem_type", "model"),
+        "storage_location_id": _nested(asset, "storage_location", "id"),
+        "storage_location_name": _nested(asset, "storage_location", "name"),
+        "custom_fields": getattr(asset, "custom_fields", None) or {},
+    }
+
+
+@dataclass(frozen=True)
+class MirrorSpec:
+    """Как забрать объекты из NetBox и разложить их по полям модели"""
+    model: type
+    fetch: Callable  # (client, **filters) -> iterable Records
+    to_fields: Callable  # Record -> dict полей модели (без id/last_updated)
+
+
+MIRROR_SPECS = {
+    "site": MirrorSpec(MirrorSite, lambda c, **f: c.general.get_sites(**f), site_fields),
+    "location": MirrorSpec(MirrorLocation, lambda c, **f: c.general.get_locations(**f), location_fields),
+    "asset_type": MirrorSpec(MirrorAssetType, lambda c, **f: c.assets.get_asset_types(**f), asset_type_fields),
+    "asset": MirrorSpec(MirrorAsset, lambda c, **f: c.assets.get_assets(**f), asset_fields),
+}
+
+
+# денормализованные копии имён: при переименовании объекта типа object_type
+# обновить model.<name_field> у строк, где model.<id_field> == id объекта
+MIRROR_DENORMALIZED = {
+    "site": [(MirrorLocation, "site_id", "site_name", "name")],
+    "location": [(MirrorAsset, "storage_location_id", "storage_location_name", "name")],
+    "asset_type": [(MirrorAsset, "inventoryitem_type_id", "inventoryitem_type_model", "model")],
+}
+
+
+def refresh_denormalized(object_type: str, renamed: dict):
+    """Копии имён в зависимых строках для переименованных объектов: renamed — {id: поля модели}"""
+    for model, id_field, name_field, source_field in MIRROR_DENORMALIZED.get(object_type, ()):
+        for object_id, fields in renamed.items():
+            model.objects.filter(**{id_field: object_id}).update(**{name_field: fields[source_field]})
+
+
+def apply_mirror_change(object_type: str, record, deleted: bool = False) -> str:
+    """
+    Изменение одного объекта (вебхук NetBox) в зеркале.
+    Зеркало, которое ещё ни разу не синхронизировалось, не трогаем.
+    Возвращает upserted / deleted / skipped.
+    """
+    if not MirrorSyncState.objects.filter(object_type=object_type, synced_at__isnull=False).exists():
+        return "skipped"
+    spec = MIRROR_SPECS[object_type]
+    if deleted:
+        spec.model.objects.filter(id=record.id).delete()
+        return "deleted"
+
+    last_updated = _last_updated(record)
+    current = spec.model.objects.filter(id=record.id).values_list("last_updated", flat=True).first()
+    if current and last_updated and current > last_updated:
+        # событие пришло позже более нового изменения
+        return "skipped"
+
+    fields = spec.to_fields(record)
+    with transaction.atomic():
+        spec.model.objects.update_or_create(id=record.id, defaults={**fields, "last_updated": last_updated})
+        refresh_denormalized(object_type, {record.id: fields})
+    return "upserted"
+
+
+class MirrorSyncService:
+    """Синхронизация зеркала с NetBox"""
+
+    batch_size = 500
+
+    def __init__(self):
+        self.client = get_netbox_client()
+
+    def sync(self, full: bool = False, object_types=None) -> dict:
+        """Синхронизирует указанные типы (по умолчанию все). Возвращает статистику."""
+        stats = {}
+        for object_type in object_types or MIRROR_SPECS:
+            if full:
+                stats[object_type] = self.full_sync(object_type)
+            else:
+                stats[object_type] = self.delta_sync(object_type)
+        return stats
+
+    def delta_sync(self, object_type: str) -> dict:
+        """Забирает объекты, изменённые с момента последней синхронизации"""
+        state, _ = MirrorSyncState.objects.get_or_create(object_type=object_type)
+        if state.cursor is None:
+            # ещё ни разу не синхронизировались — сразу полный проход
+            return self.full_sync(object_type)
+
+        spec = MIRROR_SPECS[object_type]
+        started_at = timezone.now()
+        records = spec.fetch(self.client, last_updated__gte=state.cursor.isoformat())
+        upserted, cursor = self._upsert(object_type, records)
+
+        state.cursor = max(filter(None, [state.cursor, cursor]))
+        state.synced_at = started_at
+        state.save()
+        return {"mode": "delta", "upserted": upserted, "deleted": 0}
+
+    def full_sync(self, object_type: str) -> dict:
+        """Полный проход: upsert всего + удаление пропавших в NetBox объектов"""
+        spec = MIRROR_SPECS[object_type]
+        started_at = timezone.now()
+        records = spec.fetch(self.client)
+        seen_ids = set()
+        upserted, cursor = self._upsert(object_type, records, seen_ids=seen_ids)
+
+        with transaction.atomic():
+            stale = spec.model.objects.exclude(id__in=seen_ids) if seen_ids else spec.model.objects.all()
+            deleted, _ = stale.delete()
+
+            state, _ = MirrorSyncState.objects.get_or_create(object_type=object_type)
+            state.cursor = cursor or state.cursor
+            state.synced_at = started_at
+            state.full_synced_at = started_at
+            state.save()
+        return {"mode": "full", "upserted": upserted, "deleted": deleted}
+
+    def _upsert(self, object_type: str, records, seen_ids: set = None):
+        """Пакетный upsert записей; возвращает (кол-во, max last_updated)"""
+        spec = MIRROR_SPECS[object_type]
+        update_fields = None
+        upserted = 0
+        cursor = None
+        batch = []
+
+        for record in records:
+            last_updated = _last_updated(record)
+            fields = spec.to_fields(record)
+            update_fields = update_fields or [*fields, "last_updated"]
+            batch.append(spec.model(id=record.id, last_updated=last_updated, **fields))
+            if seen_ids is not None:
+                seen_ids.add(record.id)
+            if last_updated and (cursor is None or last_updated > cursor):
+                cursor = last_updated
+            if len(batch) >= self.batch_size:
+                upserted += self._flush(object_type, batch, update_fields)
+                batch = []
+
+        if batch:
+            upserted += self._flush(object_type, batch, update_fields)
+        return upserted, cursor
+
+    def _flush(self, object_type: str, batch: list, update_fields: list) -> int:
+        spec = MIRROR_SPECS[object_type]
+        renamed = self._renamed(object_type, batch)
+        with transaction.atomic():
+            spec.model.objects.bulk_create(
+                batch,
+                update_conflicts=True,
+                unique_fields=["id"],
+                update_fields=update_fields,
+            )
+            # как в apply_mirror_change: имена, скопированные в assets/локации
+            refresh_denormalized(object_type, renamed)
+        return len(batch)
+
+    @staticmethod
+    def _renamed(object_type: str, batch: list) -> dict:
+        """{id: поля} объектов batch, у которых имя отличается от уже лежащего в зеркале"""
+        sources = {source_field for *_, source_field in MIRROR_DENORMALIZED.get(object_type, ())}
+        if not sources:
+            return {}
+        model = MIRROR_SPECS[object_type].model
+        current = {row["id"]: row for row in model.objects.filter(id__in=[obj.id for obj in batch]).values("id", *sources)}
+        return {
+            obj.id: {field: getattr(obj, field) for field in sources}
+            for obj in batch
+            if obj.id in current and any(current[obj.id][field] != getattr(obj, field) for field in sources)
+        }
+
+
+# фильтры assets_list, которые умеет зеркало: query param -> поле модели
+MIRROR_ASSET_FILTERS = {
+    "id": "id",
+    "status": "status",
+    "serial": "serial",
+    "inventoryitem_type_id": "inventoryitem_type_id",
+    "storage_location_id": "storage_location_id",
+}
+
+
+def mirror_asset_to_dict(asset: MirrorAsset) -> dict:
+    """Тот же формат, что simplify_asset"""
+    if asset.inventoryitem_type_id is not None:
+        model_info = {"id": asset.inventoryitem_type_id, "model": asset.inventoryitem_type_model}
+    else:
+        model_info = {"id": None, "model": "N/A"}
+
+    if asset.storage_location_id is not None:
+        location_info = {"id": asset.storage_location_id, "name": asset.storage_location_name}
+    else:
+        location_info = {"id": None, "name": "N/A"}
+
+    return {
+        "id": asset.id,
+        "display": asset.display,
+        "serial": asset.serial,
+        "status": {"value": asset.status, "label": asset.status_label} if asset.status is not None else None,
+        "model": model_info,
+        "storage_location": location_info,
+        "custom_fields": asset.custom_fields,
+    }
+
+
+@dataclass
+class MirrorResult:
+    data: object
+    synced_at: datetime
+
+
+class MirrorReader:
+    """
+    Чтение из зеркала. Каждый метод возвращает MirrorResult или None,
+    если зеркало выключено/устарело/не умеет такой запрос —
+    тогда вызывающий код идёт в NetBox напрямую.
+    """
+
+    def _synced_at(self, *object_types):
+        if not settings.NETBOX_MIRROR_READS:
+            return None
+        states = {
+            s.object_type: s.synced_at
+            for s in MirrorSyncState.objects.filter(object_type__in=object_types)
+        }
+        if len(states) < len(object_types) or not all(states.values()):
+            return None
+        synced_at = min(states.values())
+        max_age = settings.NETBOX_MIRROR_MAX_AGE
+        if max_age and timezone.now() - synced_at > timedelta(seconds=max_age):
+            return None
+        return synced_at
+
+    @staticmethod
+    def _version(queryset) -> str:
+        """count + max(last_updated) — версия для ETag, в формате get_assets_version"""
+        agg = queryset.aggregate(count=Count("id"), latest=Max("last_updated"))
+        latest = agg["latest"].isoformat() if agg["latest"] else ""
+        return f"{agg['count']}:{latest}"
+
+    def assets_version(self, **filters):
+        """Версия списка активов (с учётом типов и локаций — их имена вложены) или None"""
+        queryset = self._assets_queryset(filters)
+        if queryset is None or self._synced_at("asset") is None:
+            return None
+        return "/".join((
+            self._version(queryset),
+            self._version(MirrorAssetType.objects.all()),
+            self._version(MirrorLocation.objects.all()),
+        ))
+
+    def asset_types_version(self):
+        if self._synced_at("asset_type") is None:
+            return None
+        return self._version(MirrorAssetType.objects.all())
+
+    def site_location_version(self):
+        if self._synced_at("site", "location") is None:
+            return None
+        return f"{self._version(MirrorSite.objects.all())}/{self._version(MirrorLocation.objects.all())}"
+
+    def get_assets(self, **filters):
+        queryset = self._assets_queryset(filters)
+        synced_at = self._synced_at("asset") if queryset is not None else None
+        if synced_at is None:
+            return None
+        return MirrorResult([mirror_asset_to_dict(a) for a in queryset], synced_at)
+
+    def _assets_queryset(self, filters: dict):
+        if any(key not in MIRROR_ASSET_FILTERS for key in filters):
+            return None
+        lookup = {MIRROR_ASSET_FILTERS[key]: value for key, value in filters.items()}
+        try:
+            return MirrorAsset.objects.filter(**lookup).order_by("id")
+        except (TypeError, ValueError):
+            # некорректное значение фильтра — пусть ответит NetBox
+            return None
+
+    def get_assets_page(self, limit: int, offset: int = 0, **filters):
+        """MirrorResult с (список, общее кол-во)"""
+        queryset = self._assets_queryset(filters)
+        synced_at = self._synced_at("asset") if queryset is not None else None
+        if synced_at is None:
+            return None
+        page = [mirror_asset_to_dict(a) for a in queryset[offset:offset + limit]]
+        return MirrorResult((page, queryset.count()), synced_at)
+
+    def iter_assets(self, **filters):
+        """MirrorResult с генератором активов (чтение из БД курсором)"""
+        queryset = self._assets_queryset(filters)
+        synced_at = self._synced_at("asset") if queryset is not None else None
+        if synced_at is None:
+            return None
+        return MirrorResult(
+            (mirror_asset_to_dict(a) for a in queryset.iterator(chunk_size=2000)),
+            synced_at,
+        )
+
+    def get_asset_by_id(self, asset_id: int):
+        synced_at = self._synced_at("asset")
+        if synced_at is None:
+            return None
+        asset = MirrorAsset.objects.filter(id=asset_id).first()
+        return MirrorResult(mirror_asset_to_dict(asset) if asset else None, synced_at)
+
+    def get_asset_types(self):
+        synced_at = self._synced_at("asset_type")
+        if synced_at is None:
+            return None
+        types = dict(MirrorAssetType.objects.order_by("id").values_list("model", "id"))
+        return MirrorResult(types, synced_at)
+
+    def get_site_location_map(self):
+        synced_at = self._synced_at("site", "location")
+        if synced_at is None:
+            return None
+        site_location_map = {
+            site.name: {"site_id": site.id, "locations": {}}
+            for site in MirrorSite.objects.order_by("id")
+        }
+        for loc in MirrorLocation.objects.order_by("id"):
+            if loc.site_name in site_location_map:
+                site_location_map[loc.site_name]["locations"][loc.name] = loc.id
+        return MirrorResult(site_location_map, synced_at)
@@ -0,0 +1,186 @@
+"""
+Кэш справочных данных NetBox (сайты/локации, типы assets, роли/типы устройств,
+производители) в памяти процесса.
+
+    - TTL: пока запись свежая, NetBox не запрашивается;
+    - stale-while-revalidate: после TTL ещё NETBOX_REFERENCE_CACHE_STALE секунд
+      отдаём старое значение и обновляем его в фоне;
+    - single-flight: одновременные промахи по одному ключу ждут один запрос в NetBox;
+    - update(): вебхук NetBox правит значение на месте, не дожидаясь TTL.
+      Загрузка, начатая до update/invalidate, своё (уже старое) значение
+      в кэш не кладёт;
+    - у каждой записи tag — хэш значения, посчитанный один раз при записи
+      (версия для ETag, см. get_entry).
+"""
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, replace
+
+from django.conf import settings
+
+
+def content_tag(value) -> str:
+    """Версия значения: одинакова в любом процессе для одинаковых данных"""
+    data = json.dumps(value, sort_keys=True, default=str, ensure_ascii=False).encode()
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    value: object
+    fresh_until: float
+    stale_until: float
+    tag: str = ""
+
+
+class ReferenceCache:
+    def __init__(self):
+        self._entries: dict[str, CacheEntry] = {}
+        self._inflight: dict[str, Future] = {}
+        # версии ключей: растут при update/invalidate
+        self._versions: dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0, "stale_hits": 0, "misses": 0, "loads": 0, "coalesced": 0, "errors": 0, "updates": 0,
+        }
+
+    def get(self, key: str, loader, ttl: int = None):
+        """Значение по ключу; loader() вызывается только при промахе/устаревании"""
+        return self.get_entry(key, loader, ttl).value
+
+    def get_entry(self, key: str, loader, ttl: int = None) -> CacheEntry:
+        """То же, что get, но вместе с tag значения"""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+
+        if entry and now < entry.fresh_until:
+            self._count("hits")
+            return entry
+
+        if entry and now < entry.stale_until:
+            self._count("stale_hits")
+            self._refresh_in_background(key, loader, ttl)
+            return entry
+
+        self._count("misses")
+        return self._load(key, loader, ttl)
+
+    def set(self, key: str, value, ttl: int = None):
+        self._entries[key] = self._new_entry(value, ttl)
+
+    @staticmethod
+    def _new_entry(value, ttl: int = None) -> CacheEntry:
+        ttl = settings.NETBOX_REFERENCE_CACHE_TTL if ttl is None else ttl
+        now = time.monotonic()
+        return CacheEntry(
+            value=value,
+            fresh_until=now + ttl,
+            stale_until=now + ttl + settings.NETBOX_REFERENCE_CACHE_STALE,
+            tag=content_tag(value),
+        )
+
+    def update(self, key: str, updater) -> bool:
+        """
+        Правка закэшированного значения: updater(старое) -> новое, срок жизни
+        записи не меняется. updater не должен менять старое значение (его могут
+        сейчас сериализовать) и возвращает None, если правку на месте сделать
+        нельзя, — тогда ключ сбрасывается. False — ключа в кэше не было.
+        """
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            value = updater(entry.value)
+            if value is None:
+                self._entries.pop(key, None)
+                return False
+            # новый объект: читатель не увидит новое value со старым tag
+            self._entries[key] = replace(entry, value=value, tag=content_tag(value))
+            self._stats["updates"] += 1
+            return True
+
+    def invalidate(self, key: str = None):
+        """Сбросить один ключ или весь кэш"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._epoch += 1
+            else:
+                self._entries.pop(key, None)
+                self._versions[key] = self._versions.get(key, 0) + 1
+
+    def _version(self, key: str) -> tuple:
+        return self._epoch, self._versions.get(key, 0)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            **self._stats,
+            "keys": {
+                key: {
+                    "fresh": now < entry.fresh_until,
+                    "expires_in": round(entry.fresh_until - now, 1),
+                }
+                for key, entry in list(self._entries.items())
+            },
+        }
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _load(self, key: str, loader, ttl):
+        """Single-flight: первый поток грузит, остальные ждут его результат"""
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                version = self._version(key)
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            self._count("errors")
+            future.set_exception(e)
+            raise
+        else:
+            entry = self._new_entry(value, ttl)
+            with self._lock:
+                # пока грузили, пришёл вебхук — загруженное уже устарело
+                if self._version(key) == version:
+                    self._entries[key] = entry
+            self._count("loads")
+            future.set_result(entry)
+            return entry
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _refresh_in_background(self, key: str, loader, ttl):
+        if key in self._inflight:
+            return
+
+        def refresh():
+            try:
+                self._load(key, loader, ttl)
+            except Exception:
+                # старое значение остаётся до stale_until, ошибка учтена в stats
+                pass
+
+        threading.Thread(target=refresh, name=f"refcache-{key}", daemon=True).start()
+
+
+# общий для процесса кэш справочников
+reference_cache = ReferenceCache()
@@ -0,0 +1,140 @@
+"""
+Кэш готовых ответов read-эндпоинтов (site_location, asset_types, assets_list)
+в памяти процесса: тело уже отрендерено и сжато, повторный запрос той же
+версии данных не рендерит и не сжимает ничего.
+
+    - ключ — ETag ответа: путь, параметры запроса, формат и версия данных
+      (см. views/conditional.py), т.е. новая версия — новый ключ;
+    - варианты тела: identity, gzip и br (если установлен brotli). Сжатый
+      вариант хранится, только если он меньше исходного;
+    - LRU по суммарному размеру всех вариантов, не больше RESPONSE_CACHE_MAX_BYTES.
+"""
+import gzip
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from apps.netbox_api.metrics import response_cache_bytes, response_cache_requests
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - зависит от окружения
+    brotli = None
+
+IDENTITY = "identity"
+# при одинаковом q выбирается первая
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# сжимаем один раз на версию данных — можно и посильнее
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+# меньше этого сжатие не окупает заголовков
+MIN_COMPRESS_SIZE = 512
+
+
+def compress(body: bytes) -> dict[str, bytes]:
+    """{кодировка: тело}; identity есть всегда"""
+    variants = {IDENTITY: body}
+    if len(body) < MIN_COMPRESS_SIZE:
+        return variants
+    compressed = {"gzip": gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        compressed["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+    variants.update((encoding, data) for encoding, data in compressed.items() if len(data) < len(body))
+    return variants
+
+
+def negotiate_encoding(accept_encoding: str, available) -> str:
+    """
+    Кодировка из available по Accept-Encoding (q-значения, *), иначе identity.
+    identity;q=0 не учитывается: несжатый ответ лучше 406.
+    """
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        param, _, value = params.strip().partition("=")
+        if param.strip() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    best, best_q = IDENTITY, 0.0
+    for encoding in ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if encoding in available and q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    content_type: str
+    variants: dict  # кодировка -> тело
+    headers: tuple = ()  # (имя, значение), которые не зависят от момента запроса
+
+    @property
+    def size(self) -> int:
+        return sum(len(body) for body in self.variants.values())
+
+
+class ResponseCache:
+    def __init__(self):
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def get(self, key: str, route: str = ""):
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                self._stats["misses"] += 1
+            else:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+        response_cache_requests.inc(route, "miss" if cached is None else "hit")
+        return cached
+
+    def put(self, key: str, cached: CachedResponse):
+        max_bytes = settings.RESPONSE_CACHE_MAX_BYTES
+        if cached.size > max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = cached
+            self._bytes += cached.size
+            self._stats["stores"] += 1
+            while self._bytes > max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._stats["evictions"] += 1
+            response_cache_bytes.set(self._bytes)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            response_cache_bytes.set(0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": settings.RESPONSE_CACHE_MAX_BYTES,
+                "encodings": [IDENTITY, *ENCODINGS],
+            }
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,166 @@
+"""
+Вебхуки NetBox: изменения объектов сразу применяются к локальным кэшам.
+
+NetBox подписывает тело HMAC-SHA512 секретом вебхука (заголовок
+X-Hook-Signature), секрет тот же — NETBOX_WEBHOOK_SECRET.
+
+Что обновляется:
+    - dcim.site, dcim.location -> site_location_map в reference_cache
+      (правка на месте) и зеркало;
+    - inventory item type -> asset_types в reference_cache и зеркало;
+    - asset -> зеркало;
+    - dcim.device — принимается, но кэша устройств между запросами нет.
+
+reference_cache живёт в памяти процесса: правится кэш того воркера,
+который принял вебхук, у остальных — по TTL. Зеркало (БД) общее.
+"""
+import copy
+import hashlib
+import hmac
+from dataclasses import dataclass
+from typing import Callable
+
+from pynetbox.core.response import Record
+
+from apps.netbox_api.netbox_client import get_netbox_client
+from apps.netbox_api.services.mirror import apply_mirror_change
+from apps.netbox_api.services.reference_cache import reference_cache
+
+SIGNATURE_HEADER = "X-Hook-Signature"
+
+# тег сайтов, попадающих в site_location_map (как в NetBoxGeneral.get_sites)
+SITE_TAG = "dc"
+
+
+class WebhookError(ValueError):
+    pass
+
+
+def sign(body: bytes, secret: str) -> str:
+    return hmac.new(secret.encode(), body, hashlib.sha512).hexdigest()
+
+
+def verify_signature(body: bytes, signature: str, secret: str) -> bool:
+    return bool(secret and signature) and hmac.compare_digest(sign(body, secret), signature)
+
+
+@dataclass
+class WebhookEvent:
+    object_type: str  # app_label.model, например dcim.site
+    action: str  # created / updated / deleted
+    data: dict
+
+    @property
+    def deleted(self) -> bool:
+        return self.action == "deleted"
+
+
+# старые версии NetBox присылают только model (без app_label)
+MODEL_OBJECT_TYPES = {
+    "site": "dcim.site",
+    "location": "dcim.location",
+    "device": "dcim.device",
+    "asset": "netbox_inventory.asset",
+    "inventoryitemtype": "netbox_inventory.inventoryitemtype",
+}
+
+ACTIONS = ("created", "updated", "deleted")
+
+
+def parse_event(payload) -> WebhookEvent:
+    """Тело стандартного вебхука NetBox -> WebhookEvent"""
+    if not isinstance(payload, dict):
+        raise WebhookError("Ожидается JSON-объект")
+    object_type = payload.get("object_type") or MODEL_OBJECT_TYPES.get(payload.get("model"))
+    # event_rules NetBox 4 называют события object_created / ...
+    action = str(payload.get("event", "")).removeprefix("object_")
+    data = payload.get("data")
+    if not object_type or action not in ACTIONS or not isinstance(data, dict) or "id" not in data:
+        raise WebhookError("Нужны object_type (или model), event и data с id")
+    return WebhookEvent(object_type, action, data)
+
+
+# ---- правки reference_cache на месте: возвращают новое значение или None (сбросить ключ) ----
+
+def _has_site_tag(data: dict) -> bool:
+    return any(tag.get("slug") == SITE_TAG for tag in data.get("tags") or ())
+
+
+def _site_name_by_id(site_location_map: dict, site_id: int):
+    return next((name for name, site in site_location_map.items() if site["site_id"] == site_id), None)
+
+
+def apply_site(site_location_map: dict, event: WebhookEvent):
+    data = event.data
+    new_map = copy.deepcopy(site_location_map)
+    old_name = _site_name_by_id(new_map, data["id"])
+    site = new_map.pop(old_name, None) if old_name else None
+
+    if event.deleted or not _has_site_tag(data):
+        return new_map
+    if site is None:
+        if event.action == "updated":
+            # сайт получил тег dc: его локаций в кэше нет
+            return None
+        site = {"site_id": data["id"], "locations": {}}
+    new_map[data["name"]] = site
+    return new_map
+
+
+def apply_location(site_location_map: dict, event: WebhookEvent):
+    data = event.data
+    new_map = copy.deepcopy(site_location_map)
+    for site in new_map.values():
+        site["locations"] = {name: loc_id for name, loc_id in site["locations"].items() if loc_id != data["id"]}
+
+    site_id = (data.get("site") or {}).get("id")
+    site_name = _site_name_by_id(new_map, site_id)
+    if not event.deleted and site_name is not None:
+        new_map[site_name]["locations"][data["name"]] = data["id"]
+    return new_map
+
+
+def apply_asset_type(asset_types: dict, event: WebhookEvent):
+    data = event.data
+    new_types = {model: type_id for model, type_id in asset_types.items() if type_id != data["id"]}
+    if not event.deleted:
+        new_types[data["model"]] = data["id"]
+    return new_types
+
+
+@dataclass(frozen=True)
+class WebhookHandler:
+    cache_key: str = None  # ключ reference_cache
+    apply_cache: Callable = None  # (значение, event) -> новое значение / None
+    mirror_type: str = None  # тип в MIRROR_SPECS
+
+
+WEBHOOK_HANDLERS = {
+    "dcim.site": WebhookHandler("site_location_map", apply_site, "site"),
+    "dcim.location": WebhookHandler("site_location_map", apply_location, "location"),
+    "dcim.device": WebhookHandler(),
+    "netbox_inventory.asset": WebhookHandler(mirror_type="asset"),
+    "netbox_inventory.inventoryitemtype": WebhookHandler("asset_types", apply_asset_type, "asset_type"),
+}
+
+
+class NetBoxWebhookService:
+    def apply(self, event: WebhookEvent) -> dict:
+        """Применяет событие ко всем кэшам; что сделано — в ответе"""
+        result = {"object_type": event.object_type, "action": event.action, "id": event.data["id"]}
+        handler = WEBHOOK_HANDLERS.get(event.object_type)
+        if handler is None:
+            return {**result, "status": "ignored"}
+
+        if handler.cache_key:
+            updated = reference_cache.update(handler.cache_key, lambda value: handler.apply_cache(value, event))
+            # reload — значения в кэше нет или правка невозможна: следующее чтение пойдёт в NetBox
+            result["reference_cache"] = {handler.cache_key: "updated" if updated else "reload"}
+
+        if handler.mirror_type:
+            # site без тега dc в зеркале не хранится
+            deleted = event.deleted or (handler.mirror_type == "site" and not _has_site_tag(event.data))
+            record = Record(event.data, get_netbox_client().api, None)
+            result["mirror"] = apply_mirror_change(handler.mirror_type, record, deleted=deleted)
+
+        return {**result, "status": "applied"}
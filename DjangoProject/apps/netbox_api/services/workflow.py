@@ -0,0 +1,108 @@
+"""
+Выполнение независимых шагов операции параллельно с откатом (saga).
+
+Шаги запускаются одновременно в общем ограниченном пуле потоков.
+Если хотя бы один шаг упал — для всех успешно завершённых шагов
+вызываются compensate(result) в обратном порядке, и поднимается WorkflowError.
+Время операции = время самого медленного шага, а не сумма.
+
+Необратимые шаги (final=True, например удаление assets) запускаются
+только после того, как все остальные прошли; если упал final-шаг —
+откатываются остальные.
+"""
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WorkflowStep:
+    name: str
+    action: Callable[[], Any]
+    # откат успешно выполненного шага; получает результат action
+    compensate: Optional[Callable[[Any], None]] = None
+    # необратимый шаг: выполняется последним, после успеха всех остальных
+    final: bool = False
+
+
+class WorkflowError(Exception):
+    def __init__(self, step: str, cause: Exception, compensation_errors: dict):
+        self.step = step
+        self.cause = cause
+        self.compensation_errors = compensation_errors
+        super().__init__(f"Шаг '{step}' завершился ошибкой: {cause}")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_workflow_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=settings.NETBOX_WORKFLOW_MAX_WORKERS,
+                    thread_name_prefix="netbox-workflow",
+                )
+    return _pool
+
+
+class WorkflowExecutor:
+    def __init__(self, pool: ThreadPoolExecutor = None):
+        self.pool = pool or get_workflow_pool()
+
+    def run(self, steps: list[WorkflowStep]) -> dict:
+        """Выполняет шаги параллельно, затем final-шаги по очереди; возвращает {name: result}"""
+        futures = {
+            self.pool.submit(contextvars.copy_context().run, step.action): step
+            for step in steps if not step.final
+        }
+        wait(futures)
+
+        results = {}
+        failed = None
+        for future, step in futures.items():
+            try:
+                results[step.name] = future.result()
+            except Exception as e:
+                logger.warning("workflow step %s failed: %s", step.name, e)
+                failed = failed or (step, e)
+
+        for step in steps:
+            if failed is not None or not step.final:
+                continue
+            try:
+                results[step.name] = step.action()
+            except Exception as e:
+                logger.warning("workflow step %s failed: %s", step.name, e)
+                failed = (step, e)
+
+        if failed is None:
+            return results
+
+        step, cause = failed
+        compensation_errors = self._compensate(
+            [s for s in steps if s.name in results], results
+        )
+        raise WorkflowError(step.name, cause, compensation_errors) from cause
+
+    def _compensate(self, completed: list[WorkflowStep], results: dict) -> dict:
+        errors = {}
+        for step in reversed(completed):
+            if step.compensate is None:
+                continue
+            try:
+                step.compensate(results[step.name])
+            except Exception as e:
+                logger.error("workflow compensation %s failed: %s", step.name, e)
+                errors[step.name] = str(e)
+        return errors
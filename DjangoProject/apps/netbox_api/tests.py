@@ -1,3 +1,1977 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock, skipIf
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+import brotli
+import requests
+from openpyxl import Workbook, load_workbook
+from pynetbox.core.query import RequestError
+from pynetbox.core.response import Record
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+
+from config import fastjson
+from config.fastjson import FastJSONParser, FastJSONRenderer
+from apps.netbox_api import benchmarks, metrics
+from apps.netbox_api.fake_netbox import FakeNetBox, FakeNetBoxDataset
+from apps.netbox_api.loadtest import LoadContext, LoadRunner, ServiceServer, percentile
+from apps.netbox_api.resilience import Bulkhead, CircuitBreaker, NetBoxBusy, NetBoxUnavailable, high_priority
+from apps.netbox_api.identity_map import identity_map_stats, identity_scope, reset_identity_map_stats
+from apps.netbox_api.netbox_client import (
+    BulkResult,
+    NetBoxHTTPAdapter,
+    get_netbox_client,
+    reset_netbox_clients,
+)
+from apps.netbox_api.services.assets import (
+    AssetsService,
+    AssetsServiceError,
+    AssetsValidationError,
+    AssetsWorkflowError,
+    asset_create_payload,
+    decode_cursor,
+    encode_cursor,
+    simplify_asset,
+    modernization_steps,
+    run_operation_steps,
+    service_error_payload,
+    simplify_asset_data,
+    validate_operation_assets,
+)
+from apps.netbox_api.services.assets_export import export_row
+from apps.netbox_api.services.delivery_import import DeliveryImportError, DeliveryImportService
+from apps.netbox_api.services.journal import build_assets_repair_journal
+from apps.netbox_api.services.workflow import WorkflowError, WorkflowExecutor, WorkflowStep
+from apps.netbox_api.timing import timing_scope
+from apps.netbox_api.services.assets_async import AsyncAssetsService, AsyncBaseService
+from apps.netbox_api.views.assets_async import AsyncAssetsRepairView
+from apps.netbox_api.models import IdempotencyKey, Job, MirrorAsset, MirrorSyncState
+from apps.netbox_api.progress import advance
+from apps.netbox_api.services.jobs import Heartbeat, JobWorker, enqueue
+from apps.netbox_api.services.mirror import MirrorReader, MirrorSyncService
+from apps.netbox_api.services.reference_cache import ReferenceCache, reference_cache
+from apps.netbox_api.services.response_cache import CachedResponse, ResponseCache, negotiate_encoding, response_cache
+from apps.netbox_api.services.webhooks import sign
+
+
+@override_settings(NETBOX_URL="http://netbox.test", NETBOX_TOKEN="token", JIRA_URL="http://jira.test")
+class NetBoxTestCase(SimpleTestCase):
+    """Общая база: фиктивный NetBox и чистый реестр клиентов."""
+
+    def setUp(self):
+        reset_netbox_clients()
+        reference_cache.invalidate()
+        response_cache.invalidate()
+        self.addCleanup(reset_netbox_clients)
+
+
+class NetBoxClientRegistryTests(NetBoxTestCase):
+    def test_client_is_shared(self):
+        self.assertIs(get_netbox_client(), get_netbox_client())
+
+    def test_sub_clients_share_session(self):
+        client = get_netbox_client()
+        self.assertIs(client.general.api, client.api)
+        self.assertIs(client.assets.api, client.api)
+        self.assertIs(client.devices.api, client.api)
+        self.assertIs(client.api.http_session, client.session)
+
+    @override_settings(NETBOX_POOL_MAXSIZE=7, NETBOX_READ_TIMEOUT=11)
+    def test_adapter_uses_settings(self):
+        adapter = get_netbox_client().session.get_adapter("http://netbox.test/api/")
+        self.assertIsInstance(adapter, NetBoxHTTPAdapter)
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertEqual(adapter.timeout[1], 11)
+
+    def test_new_client_after_settings_change(self):
+        client = get_netbox_client()
+        with override_settings(NETBOX_URL="http://other.test"):
+            self.assertIsNot(get_netbox_client(), client)
+
+    def test_pool_stats_empty_before_requests(self):
+        self.assertEqual(get_netbox_client().pool_stats(), [])
+
+
+class FakeRecord(SimpleNamespace):
+    """Минимальная замена pynetbox Record: доступ и через атрибут, и через []."""
+
+    def __getitem__(self, item):
+        return getattr(self, item)
+
+
+def make_asset_data(asset_id, status="stored", model="SSD 1TB", type_id=1, delivery="DEL-1") -> dict:
+    """asset в виде JSON NetBox: choice-поле status — {"value", "label"}"""
+    return {
+        "id": asset_id,
+        "display": f"asset-{asset_id}",
+        "serial": f"SN{asset_id}",
+        "status": {"value": status, "label": status.capitalize()},
+        "inventoryitem_type": {"id": type_id, "model": model},
+        "storage_location": {"id": 5, "name": "ЗИП"},
+        "custom_fields": {"DeliveryTask": delivery},
+    }
+
+
+def make_asset(asset_id, **kwargs) -> Record:
+    """Тот же asset как pynetbox Record — как его отдаёт клиент NetBox (status — choice Record)"""
+    return Record(make_asset_data(asset_id, **kwargs), None, None)
+
+
+def make_device(device_id=10):
+    return FakeRecord(id=device_id, name=f"srv-{device_id}", asset_tag=f"TAG{device_id}")
+
+
+class IdentityMapTests(NetBoxTestCase):
+    def setUp(self):
+        super().setUp()
+        self.netbox = get_netbox_client()
+        self.netbox.api = mock.MagicMock()
+        self.netbox.assets.api = self.netbox.devices.api = self.netbox.api
+        self.netbox.api.dcim.devices.get.side_effect = lambda id: make_device(id)
+        self.netbox.api.plugins.inventory.assets.filter.side_effect = lambda id: [make_asset(i) for i in id]
+        reset_identity_map_stats()
+
+    def test_records_are_reused_within_scope(self):
+        with identity_scope() as identity_map:
+            first = self.netbox.devices.get_device(10)
+            self.assertIs(self.netbox.devices.get_device(10), first)
+            self.netbox.assets.get_assets_by_ids([1, 2])
+            found = self.netbox.assets.get_assets_by_ids([2, 3, 3])
+
+        self.assertEqual(sorted(found), [2, 3])
+        self.netbox.api.dcim.devices.get.assert_called_once_with(id=10)
+        self.assertEqual(
+            [c.kwargs["id"] for c in self.netbox.api.plugins.inventory.assets.filter.call_args_list],
+            [[1, 2], [3]],
+        )
+        self.assertEqual(identity_map.hits, 2)
+        self.assertEqual(identity_map_stats()["hits"], 2)
+
+    def test_writes_invalidate_endpoint(self):
+        with identity_scope():
+            self.netbox.devices.get_device(10)
+            self.netbox.devices.patch_device(10, {"custom_fields": {}})
+            self.netbox.devices.get_device(10)
+        self.assertEqual(self.netbox.api.dcim.devices.get.call_count, 2)
+
+    def test_no_memo_outside_scope(self):
+        self.netbox.devices.get_device(10)
+        self.netbox.devices.get_device(10)
+        self.assertEqual(self.netbox.api.dcim.devices.get.call_count, 2)
+
+    def test_stats_endpoint(self):
+        response = self.client.get(reverse("netbox_identity_map"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["hits"], 0)
+
+
+def make_http_response(status_code=200, data=None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(data or {}).encode()
+    response.headers["Content-Length"] = str(len(response._content))
+    response.raw = BytesIO(response._content)
+    return response
+
+
+def fake_netbox_send(*responses):
+    """Подменяет сеть: HTTPAdapter.send отдаёт responses по очереди"""
+    responses = list(responses)
+
+    def send(request, **kwargs):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        response.request = request
+        return response
+
+    return mock.patch("requests.adapters.HTTPAdapter.send", side_effect=send)
+
+
+class MetricsTests(NetBoxTestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.reset_metrics()
+        self.addCleanup(metrics.reset_metrics)
+        self.netbox = get_netbox_client()
+
+    def test_http_requests_are_labelled_with_operation(self):
+        page = make_http_response(data={"count": 1, "results": [make_asset_data(1)]})
+        with fake_netbox_send(page):
+            self.netbox.assets.get_assets_page_data(limit=10)
+
+        operation = "assets.get_assets_page_data"
+        self.assertEqual(metrics.netbox_requests.value(operation, "GET", "200"), 1)
+        self.assertEqual(metrics.netbox_pages.value(operation), 1)
+        self.assertEqual(metrics.netbox_response_bytes.value(operation), len(page.content))
+        self.assertEqual(metrics.netbox_request_duration.count(operation, "GET"), 1)
+        self.assertEqual(metrics.netbox_operation_duration.count(operation), 1)
+
+    def test_lazy_results_are_measured_while_iterating(self):
+        first = make_http_response(data={"results": [make_asset_data(1)], "next": "http://netbox.test/api/next/"})
+        second = make_http_response(data={"results": [make_asset_data(2)], "next": None})
+        with fake_netbox_send(first, second):
+            assets = self.netbox.assets.get_assets_data()
+            self.assertEqual(metrics.netbox_operation_duration.count("assets.get_assets_data"), 0)
+            self.assertEqual([a["id"] for a in assets], [1, 2])
+
+        self.assertEqual(metrics.netbox_pages.value("assets.get_assets_data"), 2)
+        self.assertEqual(metrics.netbox_operation_duration.count("assets.get_assets_data"), 1)
+
+    @override_settings(NETBOX_RETRY_ATTEMPTS=0)
+    def test_errors_are_counted_by_status(self):
+        with fake_netbox_send(make_http_response(500, {"detail": "boom"})):
+            with self.assertRaises(RequestError):
+                self.netbox.assets.get_assets_page_data(limit=10)
+        with fake_netbox_send(requests.ConnectTimeout("timeout")):
+            with self.assertRaises(requests.ConnectTimeout):
+                self.netbox.assets.get_assets_page_data(limit=10)
+
+        operation = "assets.get_assets_page_data"
+        self.assertEqual(metrics.netbox_operation_errors.value(operation, "500"), 1)
+        self.assertEqual(metrics.netbox_operation_errors.value(operation, "ConnectTimeout"), 1)
+        self.assertEqual(metrics.netbox_requests.value(operation, "GET", "ConnectTimeout"), 1)
+        self.assertEqual(metrics.netbox_pages.value(operation), 0)
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse("netbox_identity_map"))
+        response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = response.content.decode()
+        self.assertIn("# TYPE inventory_http_request_duration_seconds histogram", body)
+        self.assertIn(
+            'inventory_http_request_duration_seconds_count{route="netbox_identity_map",method="GET",status="200"} 1',
+            body,
+        )
+
+
+@override_settings(NETBOX_RETRY_BACKOFF=0, NETBOX_BREAKER_MIN_REQUESTS=4, NETBOX_BREAKER_ERROR_RATE=0.5)
+class ResilienceTests(NetBoxTestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.reset_metrics()
+        self.addCleanup(metrics.reset_metrics)
+        self.netbox = get_netbox_client()
+
+    def page(self):
+        return make_http_response(data={"count": 0, "results": [], "next": None})
+
+    @override_settings(NETBOX_OPERATION_TIMEOUTS={"assets.get_assets_page_data": 7, "general": 3})
+    def test_timeout_per_operation(self):
+        with fake_netbox_send(self.page(), self.page(), self.page()) as send:
+            self.netbox.assets.get_assets_page_data(limit=10)
+            list(self.netbox.general.get_sites())
+            self.netbox.assets._get_json("http://netbox.test/api/status/")
+
+        timeouts = [call.kwargs["timeout"] for call in send.call_args_list]
+        self.assertTrue(6 < timeouts[0][1] <= 7)
+        self.assertTrue(2 < timeouts[1][1] <= 3)
+        self.assertTrue(59 < timeouts[2][1] <= 60)
+
+    def test_get_is_retried(self):
+        with fake_netbox_send(make_http_response(503), requests.ConnectionError("reset"), self.page()) as send:
+            self.netbox.assets.get_assets_page_data(limit=10)
+
+        self.assertEqual(send.call_count, 3)
+        self.assertEqual(metrics.netbox_retries.value("assets.get_assets_page_data", "GET"), 2)
+
+    def test_post_is_not_retried(self):
+        with fake_netbox_send(requests.ConnectionError("reset")) as send:
+            with self.assertRaises(requests.ConnectionError):
+                self.netbox.general.create_journal_entry({"comments": "x"})
+        self.assertEqual(send.call_count, 1)
+
+    def test_client_errors_are_not_retried(self):
+        with fake_netbox_send(make_http_response(404)) as send:
+            self.assertIsNone(self.netbox.assets.get_asset_data_by_id(1))
+        self.assertEqual(send.call_count, 1)
+        self.assertEqual(self.netbox.breaker_stats()["window_failures"], 0)
+
+    @override_settings(NETBOX_RETRY_ATTEMPTS=0)
+    def test_breaker_opens_and_view_returns_503(self):
+        failures = [make_http_response(500) for _ in range(4)]
+        with fake_netbox_send(*failures):
+            for _ in failures:
+                with self.assertRaises(RequestError):
+                    self.netbox.assets.get_assets_page_data(limit=10)
+
+        with fake_netbox_send() as send:
+            with self.assertRaises(NetBoxUnavailable):
+                self.netbox.assets.get_assets_page_data(limit=10)
+            response = self.client.get(reverse("asset_detail", kwargs={"asset_id": 1}))
+            health = self.client.get(reverse("netbox_health"))
+        send.assert_not_called()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertGreater(int(response["Retry-After"]), 0)
+        self.assertEqual(health.status_code, 503)
+        self.assertEqual(health.json()["state"], "open")
+        self.assertIn('netbox_circuit_breaker_state{netbox="http://netbox.test"} 2', metrics.render_metrics())
+
+    def test_breaker_half_open_lets_one_probe_through(self):
+        now = [0.0]
+        breaker = CircuitBreaker("nb", window=10, min_requests=2, error_rate=0.5, cooldown=5, clock=lambda: now[0])
+        breaker.record(True)
+        breaker.record(True)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(NetBoxUnavailable):
+            breaker.before_request("op")
+
+        now[0] = 6
+        breaker.before_request("op")
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        with self.assertRaises(NetBoxUnavailable):
+            breaker.before_request("op")
+        breaker.record(False)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_old_outcomes_leave_the_window(self):
+        now = [0.0]
+        breaker = CircuitBreaker("nb", window=10, min_requests=2, error_rate=0.5, cooldown=5, clock=lambda: now[0])
+        breaker.record(True)
+        now[0] = 20
+        breaker.record(False)
+        breaker.record(False)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(breaker.stats()["window_failures"], 0)
+
+
+class BulkheadTests(NetBoxTestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.reset_metrics()
+        self.addCleanup(metrics.reset_metrics)
+
+    def test_reads_and_writes_have_separate_limits(self):
+        bulkhead = Bulkhead(reads=1, writes=1, queue_size=5, timeout=0.05)
+        with bulkhead.slot("GET", "op"):
+            with bulkhead.slot("POST", "op"):
+                with self.assertRaises(NetBoxBusy):
+                    with bulkhead.slot("GET", "op"):
+                        pass
+        self.assertEqual(bulkhead.stats()["read"]["rejected"], 1)
+        self.assertEqual(bulkhead.stats()["read"]["in_flight"], 0)
+
+    def test_queue_is_bounded(self):
+        bulkhead = Bulkhead(reads=1, writes=1, queue_size=0, timeout=5)
+        with bulkhead.slot("GET", "op"):
+            started = time.monotonic()
+            with self.assertRaises(NetBoxBusy):
+                with bulkhead.slot("GET", "op"):
+                    pass
+            self.assertLess(time.monotonic() - started, 1)
+
+    def test_high_priority_waiters_go_first(self):
+        bulkhead = Bulkhead(reads=1, writes=1, queue_size=5, timeout=5)
+        order = []
+
+        def request(name):
+            with bulkhead.slot("GET", name):
+                order.append(name)
+
+        def wait_for_waiters(count):
+            while bulkhead.stats()["read"]["waiting"] < count:
+                time.sleep(0.001)
+
+        with bulkhead.slot("GET", "holder"):
+            bulk = threading.Thread(target=request, args=("bulk",))
+            bulk.start()
+            wait_for_waiters(1)
+            repair = threading.Thread(target=high_priority(request), args=("repair",))
+            repair.start()
+            wait_for_waiters(2)
+        bulk.join()
+        repair.join()
+
+        self.assertEqual(order, ["repair", "bulk"])
+
+    @override_settings(NETBOX_MAX_CONCURRENT_READS=1, NETBOX_BULKHEAD_TIMEOUT=0.01)
+    def test_busy_netbox_returns_503_without_tripping_breaker(self):
+        client = get_netbox_client()
+        with client.bulkhead.slot("GET", "holder"):
+            with fake_netbox_send() as send:
+                response = self.client.get(reverse("asset_detail", kwargs={"asset_id": 1}))
+        send.assert_not_called()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertEqual(client.breaker_stats()["window_requests"], 0)
+        self.assertEqual(metrics.netbox_bulkhead_rejected.value("read", "assets.get_asset_data_by_id"), 1)
+
+
+class ServerTimingTests(NetBoxTestCase):
+    def test_netbox_calls_and_journal_are_recorded(self):
+        page = make_http_response(data={"count": 1, "results": [make_asset_data(1)]})
+        with timing_scope() as timings, fake_netbox_send(page):
+            AssetsService().get_assets_page(limit=10)
+            build_assets_repair_journal(
+                device=make_device(), assets=[make_asset(1)], jira_task="DC-1", netbox_url="n", jira_url="j"
+            )
+
+        recorded = timings.as_dict()
+        self.assertEqual(recorded["netbox.assets.get_assets_page_data"]["count"], 1)
+        self.assertEqual(recorded["simplify"]["count"], 1)
+        self.assertEqual(recorded["journal"]["count"], 1)
+
+    def test_header(self):
+        response = self.client.get(reverse("netbox_identity_map"))
+        header = response["Server-Timing"]
+        self.assertIn("render;dur=", header)
+        self.assertTrue(header.split(", ")[-1].startswith("total;dur="))
+
+    @override_settings(SLOW_REQUEST_THRESHOLD_MS=0)
+    def test_slow_request_log(self):
+        with self.assertLogs("apps.netbox_api.timing", "WARNING") as logs:
+            self.client.get(reverse("netbox_identity_map"))
+
+        entry = json.loads(logs.records[0].getMessage().removeprefix("slow request "))
+        self.assertEqual(entry["route"], "netbox_identity_map")
+        self.assertEqual(entry["status"], 200)
+        self.assertIn("render", entry["timings"])
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_header_disabled(self):
+        self.assertNotIn("Server-Timing", self.client.get(reverse("netbox_identity_map")))
+
+
+class AsyncAssetsServiceTests(NetBoxTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client_mock = mock.MagicMock()
+        self.client_mock.netbox_url = "http://netbox.test"
+        self.client_mock.jira_url = "http://jira.test"
+        for target in (
+            "apps.netbox_api.async_netbox_client.get_netbox_client",
+            "apps.netbox_api.services.assets.get_netbox_client",
+        ):
+            patcher = mock.patch(target, return_value=self.client_mock)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_create_view_serialises_records(self):
+        # bulk_create отдаёт pynetbox Records, как настоящий NetBox
+        self.client_mock.assets.bulk_create_assets.return_value = BulkResult(succeeded=[make_asset(7)])
+
+        response = self.client.post(
+            reverse("async_assets_create"),
+            {"items": [{"inventoryitem_type_id": 1, "count": 1}], "storage_location_id": 5, "delivery_task": "DEL-1"},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["assets"], [simplify_asset_data(make_asset_data(7))])
+
+    def test_post_without_csrf_cookie_like_drf(self):
+        # токен-клиенты без CSRF-cookie: как у sync APIView — обычная валидация, не 403
+        client = Client(enforce_csrf_checks=True)
+        for name in ("async_assets_repair", "assets_repair"):
+            response = client.post(reverse(name), {}, content_type="application/json")
+            self.assertEqual(response.status_code, 400, name)
+
+    def test_drf_permissions_are_applied(self):
+        with mock.patch.object(AsyncAssetsRepairView, "permission_classes", [IsAuthenticated]):
+            response = self.client.post(reverse("async_assets_repair"), {}, content_type="application/json")
+
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("Bearer", response["WWW-Authenticate"])
+        self.client_mock.assets.get_assets_by_ids.assert_not_called()
+
+    def test_site_location_map(self):
+        site = FakeRecord(id=1, name="DC1")
+        self.client_mock.general.get_sites.return_value = iter([site])
+        self.client_mock.general.get_locations.return_value = iter([
+            FakeRecord(id=2, name="Room", site=site),
+            FakeRecord(id=3, name="Other", site=FakeRecord(id=9, name="NotDC")),
+        ])
+        result = asyncio.run(AsyncBaseService().get_site_location_map())
+        self.assertEqual(result, {"DC1": {"site_id": 1, "locations": {"Room": 2}}})
+
+    def test_repair_updates_every_asset(self):
+        self.client_mock.devices.get_device.return_value = make_device()
+        self.client_mock.assets.get_assets_by_ids.return_value = {1: make_asset(1), 2: make_asset(2)}
+
+        result = asyncio.run(AsyncAssetsService().assets_repair(
+            asset_ids=[1, 2], device_id=10, jira_task="DC-1",
+        ))
+
+        self.assertEqual(result["total"], 2)
+        updates = self.client_mock.assets.bulk_update_assets.call_args.args[0]
+        self.assertEqual([u["id"] for u in updates], [1, 2])
+        self.client_mock.general.create_journal_entry.assert_called_once()
+
+    def test_repair_rejects_used_asset(self):
+        self.client_mock.devices.get_device.return_value = make_device()
+        self.client_mock.assets.get_assets_by_ids.return_value = {1: make_asset(1, status="used")}
+
+        with self.assertRaises(AssetsServiceError):
+            asyncio.run(AsyncAssetsService().assets_repair(
+                asset_ids=[1], device_id=10, jira_task="DC-1",
+            ))
+        self.client_mock.assets.bulk_update_assets.assert_not_called()
+
+
+class BatchAssetLookupTests(NetBoxTestCase):
+    @override_settings(NETBOX_ID_BATCH_SIZE=2)
+    def test_ids_are_chunked_and_deduplicated(self):
+        assets = get_netbox_client().assets
+        assets.api = mock.MagicMock()
+        endpoint = assets.api.plugins.inventory.assets
+        endpoint.filter.side_effect = lambda id: [make_asset(i) for i in id]
+
+        found = assets.get_assets_by_ids([1, 2, 2, 3])
+
+        self.assertEqual(sorted(found), [1, 2, 3])
+        self.assertEqual([c.kwargs["id"] for c in endpoint.filter.call_args_list], [[1, 2], [3]])
+
+    def test_string_ids_hit_identity_map(self):
+        assets = get_netbox_client().assets
+        assets.api = mock.MagicMock()
+        endpoint = assets.api.plugins.inventory.assets
+        endpoint.filter.side_effect = lambda id: [make_asset(i) for i in id]
+
+        with identity_scope():
+            first = assets.get_assets_by_ids(["1", 2, "2"])
+            second = assets.get_assets_by_ids([1, "2"])
+
+        self.assertEqual(sorted(first), [1, 2])
+        self.assertEqual(second, first)
+        endpoint.filter.assert_called_once_with(id=[1, 2])
+
+    def test_operation_reports_all_problem_assets(self):
+        client_mock = mock.MagicMock()
+        client_mock.devices.get_device.return_value = make_device()
+        client_mock.assets.get_assets_by_ids.return_value = {
+            1: make_asset(1), 2: make_asset(2, status="used"), 4: make_asset(4, status="used"),
+        }
+        with mock.patch("apps.netbox_api.services.assets.get_netbox_client", return_value=client_mock):
+            with self.assertRaises(AssetsValidationError) as ctx:
+                AssetsService().assets_modernization(asset_ids=[1, 2, 3, 4, 5], device_id=10, jira_task="DC-1")
+
+        self.assertEqual(ctx.exception.missing_ids, [3, 5])
+        self.assertEqual(ctx.exception.used_ids, [2, 4])
+        client_mock.assets.get_asset_by_id.assert_not_called()
+        client_mock.assets.delete_asset.assert_not_called()
+
+    def test_used_status_from_netbox_choice(self):
+        # pynetbox отдаёт status как choice Record: == "used" для него всегда False
+        with self.assertRaises(AssetsValidationError) as ctx:
+            validate_operation_assets([1, 2], {1: make_asset(1), 2: make_asset(2, status="used")})
+        self.assertEqual(ctx.exception.used_ids, [2])
+
+
+def make_request_error(status_code=400, body=None):
+    response = mock.Mock(status_code=status_code, reason="Bad Request", url="http://netbox.test/api/")
+    response.json.return_value = body or {"detail": "error"}
+    return RequestError(response)
+
+
+class BulkOperationTests(NetBoxTestCase):
+    def setUp(self):
+        super().setUp()
+        self.assets = get_netbox_client().assets
+        self.assets.api = mock.MagicMock()
+        self.endpoint = self.assets.api.plugins.inventory.assets
+
+    @override_settings(NETBOX_BULK_CHUNK_SIZE=2)
+    def test_bulk_delete_is_chunked(self):
+        result = self.assets.bulk_delete_assets([1, 2, 3])
+
+        self.assertTrue(result.ok)
+        self.assertEqual(result.succeeded, [1, 2, 3])
+        self.assertEqual([c.args[0] for c in self.endpoint.delete.call_args_list], [[1, 2], [3]])
+
+    def test_failed_chunk_is_mapped_per_item(self):
+        def update(chunk):
+            if any(item["id"] == 2 for item in chunk):
+                raise make_request_error(body={"status": "invalid"})
+            return chunk
+
+        self.endpoint.update.side_effect = update
+        result = self.assets.bulk_update_assets([{"id": i, "status": "used"} for i in (1, 2, 3)])
+
+        self.assertEqual(result.succeeded, [1, 3])
+        self.assertEqual(list(result.errors), [2])
+        self.assertIn("invalid", result.errors[2])
+
+    @override_settings(NETBOX_CREATE_CHUNK_SIZE=2, NETBOX_CREATE_MAX_WORKERS=3)
+    def test_bulk_create_reports_failed_items(self):
+        def create(chunk):
+            if any(data["serial"] == "BAD" for data in chunk):
+                raise make_request_error(body={"serial": ["duplicate"]})
+            return [FakeRecord(id=100 + int(data["serial"][2:])) for data in chunk]
+
+        self.endpoint.create.side_effect = create
+        serials = ["SN1", "SN2", "SN3", "BAD", "SN5"]
+        result = self.assets.bulk_create_assets([{"serial": sn} for sn in serials])
+
+        self.assertEqual([r.id for r in result.succeeded], [101, 102, 103, 105])
+        self.assertEqual(list(result.errors), [3])
+        self.assertIn("duplicate", result.errors[3])
+        # 3 чанка + поштучный повтор упавшего
+        self.assertEqual(self.endpoint.create.call_count, 5)
+
+    def test_bulk_create_timeout_is_not_retried(self):
+        self.endpoint.create.side_effect = requests.Timeout("read timeout")
+
+        result = self.assets.bulk_create_assets([{"serial": "SN1"}, {"serial": "SN2"}])
+
+        self.assertEqual(result.errors, {0: "read timeout", 1: "read timeout"})
+        self.endpoint.create.assert_called_once()
+
+    def test_unavailable_netbox_is_not_an_item_error(self):
+        for error in (NetBoxUnavailable(5), NetBoxBusy("writes", "очередь заполнена")):
+            self.endpoint.create.side_effect = error
+            with self.assertRaises(type(error)):
+                self.assets.bulk_create_assets([{"serial": "SN1"}, {"serial": "SN2"}])
+
+    def test_unavailable_during_per_item_retry(self):
+        self.endpoint.update.side_effect = [make_request_error(body={"status": "invalid"}), [{"id": 1}], NetBoxUnavailable(5)]
+
+        with self.assertRaises(NetBoxUnavailable):
+            self.assets.bulk_update_assets([{"id": 1, "status": "used"}, {"id": 2, "status": "used"}])
+
+    def test_create_view_returns_failed_items(self):
+        client_mock = mock.MagicMock()
+        client_mock.assets.bulk_create_assets.return_value = BulkResult(
+            succeeded=[make_asset(1)], errors={1: "duplicate serial"}
+        )
+        body = {
+            "items": [{"inventoryitem_type_id": 1, "count": 2, "serials": ["SN1", "SN2"]}],
+            "storage_location_id": 5,
+            "delivery_task": "DEL-1",
+        }
+
+        with mock.patch("apps.netbox_api.services.assets.get_netbox_client", return_value=client_mock):
+            response = self.client.post(reverse("assets_create"), body, content_type="application/json")
+
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(data["status"], "partial")
+        self.assertEqual(data["created_count"], 1)
+        self.assertEqual(data["failed"], [{"index": 1, "item": mock.ANY, "error": "duplicate serial"}])
+        self.assertEqual(data["failed"][0]["item"]["serial"], "SN2")
+
+    def test_repair_rolls_back_on_bulk_errors(self):
+        client_mock = mock.MagicMock()
+        client_mock.devices.get_device.return_value = make_device()
+        client_mock.assets.get_assets_by_ids.return_value = {1: make_asset(1), 2: make_asset(2)}
+        client_mock.assets.bulk_update_assets.side_effect = [
+            BulkResult(succeeded=[1], errors={2: "boom"}),
+            BulkResult(succeeded=[1]),
+        ]
+
+        with mock.patch("apps.netbox_api.services.assets.get_netbox_client", return_value=client_mock):
+            with self.assertRaises(AssetsWorkflowError) as ctx:
+                AssetsService().assets_repair(asset_ids=[1, 2], device_id=10, jira_task="DC-1")
+
+        self.assertEqual(ctx.exception.step, "assets")
+        restored = client_mock.assets.bulk_update_assets.call_args_list[1].args[0]
+        self.assertEqual(restored, [{
+            "id": 1, "status": "stored", "storage_site": None, "storage_location": 5,
+            "custom_fields": {"Install_in": None},
+        }])
+        client_mock.devices.patch_device.assert_called_once_with(10, {"custom_fields": {"ModernizationDate": None}})
+        client_mock.general.delete_journal_entry.assert_called_once()
+
+
+class WorkflowExecutorTests(SimpleTestCase):
+    def test_steps_run_in_parallel(self):
+        barrier = threading.Barrier(3, timeout=2)
+        steps = [WorkflowStep(name, lambda n=name: (barrier.wait(), n)[1]) for name in ("a", "b", "c")]
+        self.assertEqual(WorkflowExecutor().run(steps), {"a": "a", "b": "b", "c": "c"})
+
+    def test_completed_steps_are_compensated(self):
+        compensated = []
+
+        def fail():
+            raise RuntimeError("netbox down")
+
+        steps = [
+            WorkflowStep("ok", lambda: 1, compensate=lambda result: compensated.append(("ok", result))),
+            WorkflowStep("fail", fail, compensate=lambda result: compensated.append(("fail", result))),
+        ]
+        with self.assertRaises(WorkflowError) as ctx:
+            WorkflowExecutor().run(steps)
+
+        self.assertEqual(ctx.exception.step, "fail")
+        self.assertEqual(compensated, [("ok", 1)])
+
+    def test_compensation_errors_are_reported(self):
+        def fail(*args):
+            raise RuntimeError("boom")
+
+        steps = [WorkflowStep("ok", lambda: 1, compensate=fail), WorkflowStep("fail", fail)]
+        with self.assertRaises(WorkflowError) as ctx:
+            WorkflowExecutor().run(steps)
+        self.assertEqual(ctx.exception.compensation_errors, {"ok": "boom"})
+
+    def test_final_step_runs_after_others(self):
+        order = []
+        steps = [
+            WorkflowStep("delete", lambda: order.append("delete"), final=True),
+            WorkflowStep("a", lambda: (time.sleep(0.05), order.append("a"))),
+        ]
+        WorkflowExecutor().run(steps)
+        self.assertEqual(order, ["a", "delete"])
+
+    def test_final_step_skipped_when_other_fails(self):
+        final = mock.Mock()
+
+        def fail():
+            raise RuntimeError("netbox down")
+
+        with self.assertRaises(WorkflowError):
+            WorkflowExecutor().run([WorkflowStep("fail", fail), WorkflowStep("delete", final, final=True)])
+        final.assert_not_called()
+
+    def test_failed_final_step_compensates_others(self):
+        compensated = []
+
+        def fail():
+            raise RuntimeError("netbox down")
+
+        steps = [
+            WorkflowStep("ok", lambda: 1, compensate=compensated.append),
+            WorkflowStep("delete", fail, final=True),
+        ]
+        with self.assertRaises(WorkflowError) as ctx:
+            WorkflowExecutor().run(steps)
+        self.assertEqual(ctx.exception.step, "delete")
+        self.assertEqual(compensated, [1])
+
+
+class ModernizationStepsTests(SimpleTestCase):
+    def test_create_payload_keeps_writable_fields(self):
+        data = make_asset_data(1)
+        data.update(tags=[{"id": 3, "name": "zip"}], storage_site={"id": 2, "name": "DC"}, last_updated="2026-01-01")
+        payload = asset_create_payload(Record(data, None, None))
+
+        self.assertEqual(payload["tags"], [3])
+        self.assertEqual(payload["storage_site"], 2)
+        self.assertEqual(payload["status"], "stored")
+        self.assertEqual(payload["inventoryitem_type"], 1)
+        self.assertNotIn("id", payload)
+        self.assertNotIn("last_updated", payload)
+
+    def test_partial_delete_reports_new_ids(self):
+        client = mock.MagicMock()
+        client.assets.bulk_delete_assets.return_value = BulkResult(succeeded=[1], errors={2: "locked"})
+        client.assets.create_assets.return_value = [make_asset(101)]
+        steps = modernization_steps(client, make_device(), 10, [make_asset(1), make_asset(2)], "comment", "2026-10-18")
+
+        with self.assertRaises(AssetsWorkflowError) as ctx:
+            run_operation_steps(steps)
+
+        payload = service_error_payload(ctx.exception)
+        self.assertEqual(payload["failed_step"], "assets")
+        self.assertEqual(payload["recreated_assets"], [{"old_id": 1, "new_id": 101}])
+        # удаление — последний шаг: device и journal уже прошли и откатаны
+        client.general.create_journal_entry.assert_called_once()
+        client.general.delete_journal_entry.assert_called_once()
+        client.devices.patch_device.assert_called_once()
+
+
+class AssetsListPaginationTests(NetBoxTestCase):
+    def setUp(self):
+        super().setUp()
+        self.assets = [make_asset_data(i) for i in range(1, 6)]
+        self.client_mock = mock.MagicMock()
+        self.client_mock.assets.get_assets_page_data.side_effect = (
+            lambda limit, offset, **filters: (self.assets[offset:offset + limit], len(self.assets))
+        )
+        # без ETag: версия списка неизвестна
+        self.client_mock.assets.get_assets_version.return_value = None
+        patcher = mock.patch("apps.netbox_api.services.assets.get_netbox_client", return_value=self.client_mock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cursor_roundtrip(self):
+        self.assertEqual(decode_cursor(encode_cursor(1500)), 1500)
+        self.assertEqual(decode_cursor(None), 0)
+        with self.assertRaises(AssetsServiceError):
+            decode_cursor("garbage")
+
+    def test_pages_follow_cursor(self):
+        first = self.client.get(reverse("assets_list"), {"limit": 2, "status": "stored"}).json()
+        self.assertEqual([a["id"] for a in first["results"]], [1, 2])
+        self.assertEqual(first["count"], 5)
+        self.client_mock.assets.get_assets_page_data.assert_called_with(2, 0, status="stored")
+
+        last = self.client.get(reverse("assets_list"), {"limit": 3, "cursor": first["next_cursor"]}).json()
+        self.assertEqual([a["id"] for a in last["results"]], [3, 4, 5])
+        self.assertIsNone(last["next_cursor"])
+
+    def test_invalid_limit(self):
+        response = self.client.get(reverse("assets_list"), {"limit": "abc"})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(ASSETS_STREAM_PAGE_SIZE=2)
+    def test_stream_returns_json_array(self):
+        response = self.client.get(reverse("assets_list"), {"stream": "1"})
+
+        self.assertTrue(response.streaming)
+        body = b"".join(response.streaming_content)
+        self.assertEqual(json.loads(body), [simplify_asset(make_asset(i)) for i in range(1, 6)])
+        self.assertEqual(self.client_mock.assets.get_assets_page_data.call_count, 3)
+
+
+class AssetsExportTests(NetBoxTestCase):
+    def setUp(self):
+        super().setUp()
+        self.assets = [make_asset_data(i) for i in range(1, 6)]
+        self.client_mock = mock.MagicMock()
+        self.client_mock.assets.get_assets_page_data.side_effect = (
+            lambda limit, offset, **filters: (self.assets[offset:offset + limit], len(self.assets))
+        )
+        patcher = mock.patch("apps.netbox_api.services.assets.get_netbox_client", return_value=self.client_mock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @override_settings(ASSETS_STREAM_PAGE_SIZE=2)
+    def test_csv_is_streamed_while_pages_are_fetched(self):
+        with mock.patch("apps.netbox_api.services.assets_export.EXPORT_CHUNK_SIZE", 1):
+            response = self.client.get(reverse("assets_export_csv"), {"status": "stored"})
+            content = iter(response.streaming_content)
+            first = next(content)
+            self.assertEqual(self.client_mock.assets.get_assets_page_data.call_count, 1)
+            body = first + b"".join(content)
+
+        self.assertIn("attachment", response["Content-Disposition"])
+        lines = body.decode("utf-8-sig").splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertTrue(lines[1].startswith("1;"))
+        self.client_mock.assets.get_assets_page_data.assert_called_with(2, 4, status="stored")
+
+    def test_xlsx_export(self):
+        response = self.client.get(reverse("assets_export_xlsx"))
+        workbook = load_workbook(BytesIO(b"".join(response.streaming_content)), read_only=True)
+
+        rows = list(workbook.active.iter_rows(values_only=True))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1][:5], (1, *export_row(simplify_asset(make_asset(1)))[1:5]))
+
+
+class ConditionalGetTests(NetBoxTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client_mock = mock.MagicMock()
+        self.client_mock.assets.get_asset_types.return_value = [FakeRecord(id=1, model="SSD 1TB")]
+        patcher = mock.patch("apps.netbox_api.services.assets.get_netbox_client", return_value=self.client_mock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_not_modified_without_reload(self):
+        etag = self.client.get(reverse("asset_types_list"))["ETag"]
+
+        response = self.client.get(reverse("asset_types_list"), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+        self.client_mock.assets.get_asset_types.assert_called_once()
+
+    def test_etag_changes_after_cache_update(self):
+        etag = self.client.get(reverse("asset_types_list"))["ETag"]
+        reference_cache.update("asset_types", lambda value: {**value, "HDD 4TB": 2})
+
+        response = self.client.get(reverse("asset_types_list"), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json(), {"SSD 1TB": 1, "HDD 4TB": 2})
+
+    @override_settings(ETAG_HEADERS=False)
+    def test_disabled(self):
+        response = self.client.get(reverse("asset_types_list"), HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+
+
+class ResponseCacheTests(NetBoxTestCase):
+    def setUp(self):
+        super().setUp()
+        self.types = [FakeRecord(id=i, model=f"SSD {i}TB") for i in range(1, 101)]
+        self.client_mock = mock.MagicMock()
+        self.client_mock.assets.get_asset_types.return_value = self.types
+        patcher = mock.patch("apps.netbox_api.services.assets.get_netbox_client", return_value=self.client_mock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_gzip_variant_served_by_accept_encoding(self):
+        response = self.client.get(reverse("asset_types_list"), HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertTrue(response["ETag"].endswith('-gzip"'))
+        self.assertEqual(json.loads(gzip.decompress(response.content)), {t.model: t.id for t in self.types})
+
+    def test_brotli_variant_preferred(self):
+        response = self.client.get(reverse("asset_types_list"), HTTP_ACCEPT_ENCODING="gzip, deflate, br")
+
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertTrue(response["ETag"].endswith('-br"'))
+        self.assertEqual(json.loads(brotli.decompress(response.content)), {t.model: t.id for t in self.types})
+
+        again = self.client.get(reverse("asset_types_list"), HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual((again.status_code, again["ETag"]), (304, response["ETag"]))
+
+    def test_hit_skips_render(self):
+        first = self.client.get(reverse("asset_types_list"))
+        with mock.patch("apps.netbox_api.views.conditional.compress") as compress, \
+                mock.patch("rest_framework.response.Response.render") as render:
+            second = self.client.get(reverse("asset_types_list"), HTTP_ACCEPT_ENCODING="gzip;q=0")
+
+        compress.assert_not_called()
+        render.assert_not_called()
+        self.assertNotIn("Content-Encoding", second)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["ETag"], first["ETag"])
+        self.assertEqual(response_cache.stats()["hits"], 1)
+
+    def test_any_variant_etag_answers_304(self):
+        etag = self.client.get(reverse("asset_types_list"), HTTP_ACCEPT_ENCODING="gzip")["ETag"]
+
+        response = self.client.get(reverse("asset_types_list"), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_new_version_new_entry(self):
+        self.client.get(reverse("asset_types_list"))
+        reference_cache.update("asset_types", lambda value: {**value, "HDD 4TB": 1000})
+
+        response = self.client.get(reverse("asset_types_list"))
+
+        self.assertEqual(response.json()["HDD 4TB"], 1000)
+        self.assertEqual(response_cache.stats()["entries"], 2)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_disabled(self):
+        response = self.client.get(reverse("asset_types_list"), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(response_cache.stats()["entries"], 0)
+
+    def test_negotiate_encoding(self):
+        self.assertEqual(negotiate_encoding("", {"identity", "gzip"}), "identity")
+        self.assertEqual(negotiate_encoding("br;q=1.0, gzip;q=0.5", {"identity", "gzip"}), "gzip")
+        self.assertEqual(negotiate_encoding("*", {"identity", "gzip"}), "gzip")
+        self.assertEqual(negotiate_encoding("*, gzip;q=0", {"identity", "gzip"}), "identity")
+        self.assertEqual(negotiate_encoding("gzip", {"identity"}), "identity")
+
+    @override_settings(RESPONSE_CACHE_MAX_BYTES=250)
+    def test_lru_evicts_by_size(self):
+        cache = ResponseCache()
+        for key in ("a", "b", "c"):
+            cache.put(key, CachedResponse("application/json", {"identity": b"x" * 100}))
+        cache.get("b")
+        cache.put("d", CachedResponse("application/json", {"identity": b"x" * 100}))
+
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNone(cache.get("c"))
+        self.assertIsNotNone(cache.get("b"))
+        self.assertEqual(cache.stats()["bytes"], 200)
+
+
+class AssetsListConditionalGetTests(NetBoxTestCase):
+    """Версия списка из NetBox: один запрос с limit=1 вместо всего списка + теги reference_cache"""
+
+    def setUp(self):
+        super().setUp()
+        reference_cache.set("asset_types", {"SSD 1TB": 1})
+        reference_cache.set("site_location_map", {"DC-1": {"site_id": 1, "locations": {"ЗИП": 1}}})
+
+    def version_pages(self):
+        latest = {"id": 1, "last_updated": "2026-01-01T00:00:00Z"}
+        return [make_http_response(data={"count": 1, "results": [latest]})]
+
+    def test_not_modified_skips_list_download(self):
+        page = make_http_response(data={"count": 1, "next": None, "results": [make_asset_data(1)]})
+        with fake_netbox_send(*self.version_pages(), page):
+            first = self.client.get(reverse("assets_list"), {"status": "stored"})
+        self.assertEqual(first.json()[0]["id"], 1)
+
+        with fake_netbox_send(*self.version_pages()) as send:
+            response = self.client.get(reverse("assets_list"), {"status": "stored"}, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(send.call_count, 1)
+        for call in send.call_args_list:
+            self.assertIn("limit=1", call.args[0].url)
+            self.assertIn("ordering=-last_updated", call.args[0].url)
+
+    def test_other_filters_other_etag(self):
+        page = make_http_response(data={"count": 1, "next": None, "results": [make_asset_data(1)]})
+        with fake_netbox_send(*self.version_pages(), page):
+            etag = self.client.get(reverse("assets_list"), {"status": "stored"})["ETag"]
+
+        with fake_netbox_send(*self.version_pages(), page):
+            response = self.client.get(reverse("assets_list"), {"status": "used"}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_renamed_type_changes_etag(self):
+        page = make_http_response(data={"count": 1, "next": None, "results": [make_asset_data(1)]})
+        with fake_netbox_send(*self.version_pages(), page):
+            etag = self.client.get(reverse("assets_list"))["ETag"]
+        reference_cache.set("asset_types", {"SSD 1TB (PM9A3)": 1})
+
+        with fake_netbox_send(*self.version_pages(), page):
+            response = self.client.get(reverse("assets_list"), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_stream_skips_version_probe(self):
+        page = make_http_response(data={"count": 1, "next": None, "results": [make_asset_data(1)]})
+        with fake_netbox_send(page) as send:
+            response = self.client.get(reverse("assets_list"), {"stream": "1"})
+            body = b"".join(response.streaming_content)
+
+        self.assertEqual(json.loads(body)[0]["id"], 1)
+        self.assertNotIn("ETag", response)
+        self.assertEqual(send.call_count, 1)
+        self.assertNotIn("ordering=-last_updated", send.call_args.args[0].url)
+
+    def test_no_etag_when_version_unavailable(self):
+        page = make_http_response(data={"count": 1, "next": None, "results": [make_asset_data(1)]})
+        with fake_netbox_send(make_http_response(400, {"ordering": ["invalid"]}), page):
+            response = self.client.get(reverse("assets_list"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+
+    def test_choice_status_exported_as_label(self):
+        # status, как его отдаёт NetBox (?fields=... / simplify_asset_data)
+        self.assertEqual(export_row(simplify_asset_data(make_asset_data(1)))[3], "Stored")
+        self.assertEqual(export_row(simplify_asset(make_asset(1)))[3], "Stored")
+
+
+class AssetFieldProjectionTests(NetBoxTestCase):
+    def setUp(self):
+        super().setUp()
+        self.session = mock.MagicMock()
+        get_netbox_client().api.http_session = self.session
+
+    def _response(self, data, status_code=200):
+        return mock.Mock(ok=status_code < 400, status_code=status_code, json=mock.Mock(return_value=data))
+
+    def test_list_requests_only_needed_fields_and_follows_next(self):
+        self.session.get.side_effect = [
+            self._response({"count": 2, "next": "http://netbox.test/api/plugins/inventory/assets/?page=2",
+                            "results": [make_asset_data(1)]}),
+            self._response({"count": 2, "next": None, "results": [make_asset_data(2)]}),
+        ]
+
+        assets = list(get_netbox_client().assets.get_assets_data(status="stored"))
+
+        self.assertEqual([a["id"] for a in assets], [1, 2])
+        first_params = self.session.get.call_args_list[0].kwargs["params"]
+        self.assertEqual(first_params["status"], "stored")
+        self.assertIn("custom_fields", first_params["fields"].split(","))
+        self.assertIsNone(self.session.get.call_args_list[1].kwargs["params"])
+
+    @override_settings(NETBOX_ASSET_FIELD_PROJECTION=False)
+    def test_projection_can_be_disabled(self):
+        self.session.get.return_value = self._response({"count": 0, "next": None, "results": []})
+        list(get_netbox_client().assets.get_assets_data())
+        self.assertNotIn("fields", self.session.get.call_args.kwargs["params"])
+
+    def test_detail_not_found(self):
+        response = self._response({"detail": "Not found."}, status_code=404)
+        response.url = "http://netbox.test/api/plugins/inventory/assets/9/"
+        self.session.get.return_value = response
+        self.assertIsNone(get_netbox_client().assets.get_asset_data_by_id(9))
+
+    def test_data_simplification_matches_record_path(self):
+        self.assertEqual(simplify_asset_data(make_asset_data(3)), simplify_asset(make_asset(3)))
+        self.assertEqual(
+            simplify_asset_data({"id": 4, "inventoryitem_type": None, "storage_location": None}),
+            simplify_asset(FakeRecord(id=4, inventoryitem_type=None, storage_location=None)),
+        )
+
+
+@override_settings(NETBOX_REFERENCE_CACHE_TTL=60, NETBOX_REFERENCE_CACHE_STALE=60)
+class ReferenceCacheTests(SimpleTestCase):
+    def test_hit_within_ttl(self):
+        cache = ReferenceCache()
+        loader = mock.Mock(return_value={"a": 1})
+        self.assertEqual(cache.get("k", loader), {"a": 1})
+        self.assertEqual(cache.get("k", loader), {"a": 1})
+        loader.assert_called_once()
+
+    def test_stale_value_served_and_refreshed(self):
+        cache = ReferenceCache()
+        cache.get("k", lambda: "old", ttl=0)
+        refreshed = threading.Event()
+
+        def loader():
+            refreshed.set()
+            return "new"
+
+        self.assertEqual(cache.get("k", loader, ttl=0), "old")
+        self.assertTrue(refreshed.wait(2))
+        for _ in range(100):
+            if cache.stats()["loads"] == 2:
+                break
+            time.sleep(0.01)
+        self.assertEqual(cache.get("k", lambda: "newer"), "new")
+
+    def test_concurrent_misses_coalesce(self):
+        cache = ReferenceCache()
+        release = threading.Event()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            release.wait(2)
+            return "value"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get("k", loader))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 5)
+
+    def test_errors_not_cached(self):
+        cache = ReferenceCache()
+        with self.assertRaises(RuntimeError):
+            cache.get("k", mock.Mock(side_effect=RuntimeError("netbox down")))
+        self.assertEqual(cache.get("k", lambda: "ok"), "ok")
+
+    def test_update_in_place(self):
+        cache = ReferenceCache()
+        cache.get("k", lambda: {"a": 1})
+        self.assertTrue(cache.update("k", lambda value: {**value, "b": 2}))
+        self.assertEqual(cache.get("k", mock.Mock()), {"a": 1, "b": 2})
+        self.assertFalse(cache.update("missing", lambda value: value))
+        self.assertFalse(cache.update("k", lambda value: None))
+        self.assertEqual(cache.get("k", lambda: "reloaded"), "reloaded")
+
+    def test_load_started_before_update_is_not_cached(self):
+        cache = ReferenceCache()
+        loading = threading.Event()
+        release = threading.Event()
+
+        def loader():
+            loading.set()
+            release.wait(2)
+            return "old"
+
+        thread = threading.Thread(target=cache.get, args=("k", loader))
+        thread.start()
+        self.assertTrue(loading.wait(2))
+        cache.invalidate("k")
+        release.set()
+        thread.join()
+
+        self.assertEqual(cache.get("k", lambda: "new"), "new")
+
+
+@override_settings(NETBOX_URL="http://netbox.test", NETBOX_TOKEN="token", NETBOX_MIRROR_READS=True)
+class MirrorTests(TestCase):
+    def setUp(self):
+        response_cache.invalidate()
+        self.client_mock = mock.MagicMock()
+        patcher = mock.patch("apps.netbox_api.services.mirror.get_netbox_client", return_value=self.client_mock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _asset(self, asset_id, updated="2026-01-01T00:00:00Z", **kwargs):
+        asset = make_asset(asset_id, **kwargs)
+        asset.last_updated = updated
+        return asset
+
+    def test_full_sync_upserts_and_deletes(self):
+        MirrorAsset.objects.create(id=99, status="stored")
+        self.client_mock.assets.get_assets.return_value = iter([self._asset(1), self._asset(2)])
+
+        stats = MirrorSyncService().full_sync("asset")
+
+        self.assertEqual(stats, {"mode": "full", "upserted": 2, "deleted": 1})
+        self.assertEqual(sorted(MirrorAsset.objects.values_list("id", flat=True)), [1, 2])
+        self.assertIsNotNone(MirrorSyncState.objects.get(object_type="asset").cursor)
+
+    def test_delta_sync_uses_cursor(self):
+        self.client_mock.assets.get_assets.return_value = iter([self._asset(1)])
+        MirrorSyncService().full_sync("asset")
+
+        self.client_mock.assets.get_assets.return_value = iter(
+            [self._asset(1, updated="2026-02-01T00:00:00Z", status="used")]
+        )
+        stats = MirrorSyncService().delta_sync("asset")
+
+        self.assertEqual(stats["upserted"], 1)
+        self.client_mock.assets.get_assets.assert_called_with(last_updated__gte="2026-01-01T00:00:00+00:00")
+        self.assertEqual(MirrorAsset.objects.get(id=1).status, "used")
+
+    def test_delta_sync_renames_copied_names(self):
+        self.client_mock.assets.get_assets.return_value = [self._asset(1)]
+        self.client_mock.assets.get_asset_types.return_value = [
+            Record({"id": 1, "model": "SSD 1TB", "last_updated": "2026-01-01T00:00:00Z"}, None, None)
+        ]
+        MirrorSyncService().full_sync("asset_type")
+        MirrorSyncService().full_sync("asset")
+        self.client_mock.assets.get_asset_types.return_value = [
+            Record({"id": 1, "model": "SSD 1TB PM9A3", "last_updated": "2026-01-02T00:00:00Z"}, None, None)
+        ]
+
+        MirrorSyncService().delta_sync("asset_type")
+
+        self.assertEqual(MirrorAsset.objects.get(id=1).inventoryitem_type_model, "SSD 1TB PM9A3")
+
+    def test_reader_matches_simplify_format(self):
+        self.client_mock.assets.get_assets.return_value = iter([self._asset(1)])
+        MirrorSyncService().full_sync("asset")
+
+        result = MirrorReader().get_assets(status="stored")
+
+        self.assertEqual(result.data, [simplify_asset(make_asset(1))])
+
+    def test_status_is_stored_as_choice_value(self):
+        # как приходит из NetBox: status — choice Record, str() которого — label
+        self.client_mock.assets.get_assets.return_value = iter([self._asset(1, status="used")])
+        MirrorSyncService().full_sync("asset")
+
+        self.assertEqual(len(MirrorReader().get_assets(status="used").data), 1)
+        self.assertEqual(MirrorReader().get_assets(status="Used").data, [])
+        response = self.client.get(reverse("assets_list"), {"status": "used"})
+        self.assertEqual(response["X-Data-Source"], "mirror")
+        self.assertEqual(response.json()[0]["status"], {"value": "used", "label": "Used"})
+
+    def test_reader_skips_unsupported_filters(self):
+        self.client_mock.assets.get_assets.return_value = iter([])
+        MirrorSyncService().full_sync("asset")
+        self.assertIsNone(MirrorReader().get_assets(q="ssd"))
+
+    @override_settings(NETBOX_MIRROR_READS=False)
+    def test_reader_disabled(self):
+        self.client_mock.assets.get_assets.return_value = iter([])
+        MirrorSyncService().full_sync("asset")
+        self.assertIsNone(MirrorReader().get_assets())
+
+    def test_list_view_served_from_mirror(self):
+        self.client_mock.assets.get_assets.return_value = iter([self._asset(1)])
+        MirrorSyncService().full_sync("asset")
+
+        response = self.client.get(reverse("assets_list"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Data-Source"], "mirror")
+        self.assertIn("X-Mirror-Age", response)
+        self.assertEqual(response.json()[0]["id"], 1)
+
+    def test_list_view_etag_follows_mirror(self):
+        self.client_mock.assets.get_assets.return_value = iter([self._asset(1)])
+        MirrorSyncService().full_sync("asset")
+        etag = self.client.get(reverse("assets_list"))["ETag"]
+
+        self.assertEqual(self.client.get(reverse("assets_list"), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.client_mock.assets.get_assets.return_value = iter([self._asset(2, updated="2026-02-01T00:00:00Z")])
+        MirrorSyncService().delta_sync("asset")
+        response = self.client.get(reverse("assets_list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+
+
+WEBHOOK_SECRET = "webhook-secret"
+
+
+@override_settings(NETBOX_URL="http://netbox.test", NETBOX_TOKEN="token", NETBOX_WEBHOOK_SECRET=WEBHOOK_SECRET)
+class WebhookTests(TestCase):
+    def setUp(self):
+        reset_netbox_clients()
+        reference_cache.invalidate()
+        response_cache.invalidate()
+        self.addCleanup(reset_netbox_clients)
+        reference_cache.get("site_location_map", lambda: {
+            "DC-1": {"site_id": 1, "locations": {"ЗИП-1": 11, "ЗИП-2": 12}},
+            "DC-2": {"site_id": 2, "locations": {}},
+        })
+        reference_cache.get("asset_types", lambda: {"SSD 1TB": 1, "HDD 4TB": 2})
+
+    def post(self, payload, secret=WEBHOOK_SECRET):
+        body = json.dumps(payload).encode()
+        return self.client.post(
+            reverse("netbox_webhook"),
+            body,
+            content_type="application/json",
+            HTTP_X_HOOK_SIGNATURE=sign(body, secret),
+        )
+
+    def cached(self, key):
+        return reference_cache.get(key, mock.Mock(side_effect=AssertionError("NetBox не должен запрашиваться")))
+
+    def test_signature_is_required(self):
+        payload = {"event": "deleted", "model": "site", "data": {"id": 1}}
+        self.assertEqual(self.post(payload, secret="wrong").status_code, 403)
+        with override_settings(NETBOX_WEBHOOK_SECRET=""):
+            self.assertEqual(self.post(payload, secret="").status_code, 403)
+        self.assertIn("DC-1", self.cached("site_location_map"))
+
+    def test_invalid_payload(self):
+        self.assertEqual(self.post({"event": "updated", "model": "site"}).status_code, 400)
+
+    def test_location_moves_between_sites(self):
+        response = self.post({
+            "event": "updated",
+            "object_type": "dcim.location",
+            "data": {"id": 12, "name": "ЗИП-2a", "site": {"id": 2, "name": "DC-2"}},
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["reference_cache"], {"site_location_map": "updated"})
+        self.assertEqual(self.cached("site_location_map"), {
+            "DC-1": {"site_id": 1, "locations": {"ЗИП-1": 11}},
+            "DC-2": {"site_id": 2, "locations": {"ЗИП-2a": 12}},
+        })
+
+    def test_site_rename_and_untag(self):
+        self.post({"event": "updated", "model": "site", "data": {"id": 1, "name": "DC-1 new", "tags": [{"slug": "dc"}]}})
+        self.post({"event": "object_updated", "model": "site", "data": {"id": 2, "name": "DC-2", "tags": []}})
+
+        self.assertEqual(self.cached("site_location_map"), {
+            "DC-1 new": {"site_id": 1, "locations": {"ЗИП-1": 11, "ЗИП-2": 12}},
+        })
+
+    def test_site_tagged_later_is_reloaded(self):
+        response = self.post({"event": "updated", "model": "site", "data": {"id": 3, "name": "DC-3", "tags": [{"slug": "dc"}]}})
+        self.assertEqual(response.json()["reference_cache"], {"site_location_map": "reload"})
+        self.assertEqual(reference_cache.get("site_location_map", lambda: "reloaded"), "reloaded")
+
+    def test_asset_types(self):
+        self.post({"event": "created", "model": "inventoryitemtype", "data": {"id": 3, "model": "NVMe 2TB"}})
+        self.post({"event": "deleted", "model": "inventoryitemtype", "data": {"id": 2, "model": "HDD 4TB"}})
+        self.assertEqual(self.cached("asset_types"), {"SSD 1TB": 1, "NVMe 2TB": 3})
+
+    def test_mirror_is_updated(self):
+        now = datetime.now(dt_timezone.utc)
+        for object_type in ("location", "asset"):
+            MirrorSyncState.objects.create(object_type=object_type, synced_at=now)
+        MirrorAsset.objects.create(
+            id=5, status="stored", status_label="Stored", storage_location_id=12, storage_location_name="ЗИП-2",
+        )
+
+        self.post({
+            "event": "updated",
+            "model": "location",
+            "data": {"id": 12, "name": "ЗИП-2a", "site": {"id": 1, "name": "DC-1"}, "last_updated": now.isoformat()},
+        })
+        self.assertEqual(MirrorAsset.objects.get(id=5).storage_location_name, "ЗИП-2a")
+
+        asset = make_asset_data(6)
+        asset["last_updated"] = now.isoformat()
+        response = self.post({"event": "created", "model": "asset", "data": asset})
+        self.assertEqual(response.json()["mirror"], "upserted")
+        self.assertEqual(MirrorAsset.objects.get(id=6).serial, asset["serial"])
+
+        stale = {**asset, "serial": "OLD", "last_updated": "2020-01-01T00:00:00Z"}
+        self.assertEqual(self.post({"event": "updated", "model": "asset", "data": stale}).json()["mirror"], "skipped")
+        self.post({"event": "deleted", "model": "asset", "data": {"id": 5}})
+        self.assertEqual(list(MirrorAsset.objects.values_list("id", flat=True)), [6])
+
+    @override_settings(NETBOX_MIRROR_READS=True)
+    def test_asset_status_keeps_choice_value(self):
+        MirrorSyncState.objects.create(object_type="asset", synced_at=datetime.now(dt_timezone.utc))
+        MirrorAsset.objects.create(id=6, status="stored", status_label="Stored")
+
+        # тело вебхука NetBox: status — {"value", "label"}
+        asset = {**make_asset_data(6, status="used"), "last_updated": datetime.now(dt_timezone.utc).isoformat()}
+        self.assertEqual(self.post({"event": "updated", "model": "asset", "data": asset}).json()["mirror"], "upserted")
+
+        mirrored = MirrorAsset.objects.get(id=6)
+        self.assertEqual((mirrored.status, mirrored.status_label), ("used", "Used"))
+        self.assertEqual([a["id"] for a in MirrorReader().get_assets(status="used").data], [6])
+
+    def test_device_and_unknown_objects(self):
+        self.assertEqual(self.post({"event": "updated", "model": "device", "data": {"id": 1}}).json()["status"], "applied")
+        response = self.post({"event": "updated", "object_type": "dcim.rack", "data": {"id": 1}})
+        self.assertEqual(response.json()["status"], "ignored")
+
+
+class FastJSONTests(SimpleTestCase):
+    payload = {
+        "assets": [make_asset_data(i) for i in range(1, 4)],
+        "text": "ЗИП \u2028 \u2029 \U0001f680 \x00\t\"",
+        "numbers": [0, -1, 2 ** 63 - 1, 0.1, 1.5e300, 1e16, 1e-05, 123.456, -0.0],
+        "big": 2 ** 70,
+        "keys": {1: "a", 2.5: "b", False: "c", None: "d"},
+        "date": datetime(2025, 8, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        "decimal": Decimal("10.50"),
+        "empty": [{}, [], ""],
+    }
+
+    def test_render_is_byte_identical(self):
+        self.assertEqual(FastJSONRenderer().render(self.payload), JSONRenderer().render(self.payload))
+        self.assertEqual(FastJSONRenderer().render([1, "a"]), JSONRenderer().render([1, "a"]))
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    @skipIf(fastjson.orjson is None, "нужен orjson")
+    def test_non_finite_floats_are_null(self):
+        # задокументированное отличие: DRF (STRICT_JSON) бросает ValueError, orjson пишет null
+        for value in (float("nan"), float("inf"), -float("inf")):
+            with self.assertRaises(ValueError, msg=value):
+                JSONRenderer().render({"x": value})
+            self.assertEqual(FastJSONRenderer().render({"x": value}), b'{"x":null}')
+
+    def test_indent_falls_back_to_stdlib(self):
+        media_type = "application/json; indent=4"
+        self.assertEqual(
+            FastJSONRenderer().render(self.payload, media_type),
+            JSONRenderer().render(self.payload, media_type),
+        )
+
+    def test_parse_matches_stdlib(self):
+        body = JSONRenderer().render({"assets": [make_asset_data(1)], "text": "ЗИП", "big": 2 ** 70})
+        self.assertEqual(FastJSONParser().parse(BytesIO(body)), JSONParser().parse(BytesIO(body)))
+
+    def test_parse_errors(self):
+        for body in (b"{", b"[NaN]", b""):
+            with self.assertRaises(ParseError):
+                FastJSONParser().parse(BytesIO(body))
+
+
+def make_xlsx(rows) -> BytesIO:
+    workbook = Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    buffer = BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+class DeliveryImportTests(SimpleTestCase):
+    def setUp(self):
+        self.assets_service = mock.MagicMock()
+        self.assets_service.get_asset_types.return_value = {"SSD 1TB": 1, "RAM 32GB": 2}
+        self.next_id = iter(range(1, 100000))
+        self.assets_service.create_assets.side_effect = lambda items, location, task: {
+            "created": [{"id": next(self.next_id)} for item in items for _ in range(item["count"])],
+            "failed": [],
+        }
+        self.service = DeliveryImportService(self.assets_service)
+
+    def test_csv_rows_with_errors(self):
+        body = (
+            "Модель;Серийный номер;Количество\n"
+            "ssd 1tb;SN1;\n"
+            "RAM 32GB;;4\n"
+            "\n"
+            "HDD 4TB;SN2;\n"
+            "SSD 1TB;;abc\n"
+        ).encode()
+
+        result = self.service.import_file(BytesIO(body), "delivery.csv", 5, "DEL-1")
+
+        self.assertEqual(result.rows, 4)
+        self.assertEqual(result.created_count, 5)
+        self.assertEqual([e["row"] for e in result.errors], [5, 6])
+        self.assertIn("HDD 4TB", result.errors[0]["error"])
+        self.assets_service.create_assets.assert_called_once_with(
+            [
+                {"inventoryitem_type_id": 1, "count": 1, "serials": ["SN1"]},
+                {"inventoryitem_type_id": 2, "count": 4, "serials": []},
+            ],
+            5,
+            "DEL-1",
+        )
+
+    def test_xlsx_is_created_in_batches(self):
+        rows = [("model", "serial")] + [("SSD 1TB", f"SN{i}") for i in range(25)]
+
+        result = self.service.import_file(make_xlsx(rows), "delivery.xlsx", 5, "DEL-1", batch_size=10)
+
+        self.assertEqual(result.created_count, 25)
+        self.assertEqual(result.errors, [])
+        self.assertEqual(
+            [len(call.args[0]) for call in self.assets_service.create_assets.call_args_list], [10, 10, 5]
+        )
+
+    def test_failed_batch_marks_its_rows(self):
+        self.assets_service.create_assets.side_effect = [
+            {"created": [{"id": 1}], "failed": [{"index": 1, "item": {}, "error": "duplicate serial"}]},
+            AssetsServiceError("NetBox недоступен"),
+        ]
+        rows = [("model", "serial")] + [("SSD 1TB", f"SN{i}") for i in range(4)]
+
+        result = self.service.import_file(make_xlsx(rows), "delivery.xlsx", 5, "DEL-1", batch_size=2)
+
+        self.assertEqual(result.created_ids, [1])
+        self.assertEqual(
+            result.errors,
+            [
+                {"row": 3, "error": "duplicate serial"},
+                {"row": 4, "error": "NetBox недоступен"},
+                {"row": 5, "error": "NetBox недоступен"},
+            ],
+        )
+
+    def test_bad_file(self):
+        with self.assertRaises(DeliveryImportError):
+            self.service.import_file(BytesIO(b"serial\nSN1\n"), "delivery.csv", 5, "DEL-1")
+        with self.assertRaises(DeliveryImportError):
+            self.service.import_file(BytesIO(b""), "delivery.xls", 5, "DEL-1")
+
+    def test_import_view(self):
+        upload = SimpleUploadedFile("delivery.csv", b"model,count\nSSD 1TB,3\n", content_type="text/csv")
+        with mock.patch("apps.netbox_api.services.delivery_import.AssetsService", return_value=self.assets_service):
+            response = self.client.post(
+                reverse("assets_import"),
+                {"file": upload, "storage_location_id": "5", "delivery_task": "DEL-1"},
+            )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["created_count"], 3)
+        self.assertEqual(response.json()["status"], "success")
+
+
+class IdempotencyMixin:
+    repair_body = {"device_id": 10, "asset_ids": [1, 2], "jira_task": "DC-1"}
+
+    def setUp(self):
+        self.service = mock.MagicMock()
+        self.service.assets_repair.return_value = {"status": "success", "total": 2}
+        patcher = mock.patch("apps.netbox_api.views.assets.AssetsService", return_value=self.service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def repair(self, key="key-1", body=None):
+        return self.client.post(
+            reverse("assets_repair"),
+            body or self.repair_body,
+            content_type="application/json",
+            headers={"Idempotency-Key": key},
+        )
+
+
+class IdempotencyTests(IdempotencyMixin, TestCase):
+    def test_replay_returns_stored_response(self):
+        first = self.repair()
+        second = self.repair()
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.service.assets_repair.assert_called_once()
+
+    @override_settings(JOBS_INLINE_MAX_OBJECTS=1)
+    def test_replay_keeps_location_header(self):
+        first = self.repair()
+        second = self.repair()
+
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual((second.status_code, second.json()), (202, first.json()))
+        self.assertEqual(second["Location"], first["Location"])
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_same_key_with_other_body(self):
+        self.repair()
+        response = self.repair(body={**self.repair_body, "asset_ids": [3]})
+        self.assertEqual(response.status_code, 422)
+
+    def test_failed_execution_is_not_stored(self):
+        self.service.assets_repair.side_effect = [RuntimeError("netbox down"), {"status": "success"}]
+        with self.assertRaises(RuntimeError):
+            self.repair()
+
+        self.assertEqual(self.repair().status_code, 200)
+        self.assertEqual(self.service.assets_repair.call_count, 2)
+
+    def test_service_errors_are_replayed(self):
+        self.service.assets_repair.side_effect = AssetsServiceError("Устройства нет")
+        self.assertEqual(self.repair().status_code, 404)
+        self.assertEqual(self.repair().status_code, 404)
+        self.service.assets_repair.assert_called_once()
+
+    def test_without_header(self):
+        self.client.post(reverse("assets_repair"), self.repair_body, content_type="application/json")
+        self.client.post(reverse("assets_repair"), self.repair_body, content_type="application/json")
+        self.assertEqual(self.service.assets_repair.call_count, 2)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+class AsyncIdempotencyTests(TestCase):
+    repair_body = {"device_id": 10, "asset_ids": [1, 2], "jira_task": "DC-1"}
+
+    def setUp(self):
+        self.service = mock.MagicMock()
+        self.service.assets_repair = mock.AsyncMock(return_value={"status": "success", "total": 2})
+        patcher = mock.patch("apps.netbox_api.views.assets_async.AsyncAssetsService", return_value=self.service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def repair(self, body="", **kwargs):
+        return self.client.post(
+            reverse("async_assets_repair"),
+            body or self.repair_body,
+            content_type="application/json",
+            **kwargs,
+        )
+
+    def test_malformed_json_is_400(self):
+        response = self.repair(body="{device_id: 10")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("JSON parse error", response.json()["detail"])
+        self.service.assets_repair.assert_not_called()
+
+    def test_replay_returns_stored_response(self):
+        first = self.repair(headers={"Idempotency-Key": "key-1"})
+        second = self.repair(headers={"Idempotency-Key": "key-1"})
+
+        self.assertEqual((first.status_code, second.json()), (200, first.json()))
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.service.assets_repair.assert_awaited_once()
+
+    def test_same_key_with_other_body(self):
+        self.repair(headers={"Idempotency-Key": "key-1"})
+        response = self.repair(body={**self.repair_body, "asset_ids": [3]}, headers={"Idempotency-Key": "key-1"})
+        self.assertEqual(response.status_code, 422)
+
+    @override_settings(JOBS_INLINE_MAX_OBJECTS=1)
+    def test_large_operation_returns_202(self):
+        response = self.repair()
+
+        self.assertEqual(response.status_code, 202)
+        job = Job.objects.get()
+        self.assertEqual((job.kind, job.params), ("assets_repair", self.repair_body))
+        self.assertEqual(response["Location"], reverse("job_detail", args=[job.id]))
+        self.service.assets_repair.assert_not_called()
+
+    def test_background_query_param_on_create(self):
+        body = {"items": [{"inventoryitem_type_id": 1, "count": 1}], "storage_location_id": 5, "delivery_task": "DT-1"}
+        response = self.client.post(reverse("async_assets_create") + "?background=1", body, content_type="application/json")
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(Job.objects.get().kind, "assets_create")
+
+
+class IdempotencyConcurrencyTests(IdempotencyMixin, TransactionTestCase):
+    def test_concurrent_duplicate_waits_for_first(self):
+        started, release = threading.Event(), threading.Event()
+
+        def repair(**kwargs):
+            started.set()
+            release.wait(2)
+            return {"status": "success"}
+
+        self.service.assets_repair.side_effect = repair
+        responses = {}
+
+        def post(name):
+            try:
+                responses[name] = self.repair()
+            finally:
+                connection.close()
+
+        first = threading.Thread(target=post, args=("first",))
+        first.start()
+        self.assertTrue(started.wait(2))
+        second = threading.Thread(target=post, args=("second",))
+        second.start()
+        time.sleep(0.1)
+        release.set()
+        first.join(2)
+        second.join(2)
+
+        self.service.assets_repair.assert_called_once()
+        self.assertEqual(responses["second"].json(), {"status": "success"})
+        self.assertEqual(responses["second"]["Idempotent-Replayed"], "true")
+
+
+class JobTests(TestCase):
+    repair_body = {"device_id": 10, "asset_ids": [1, 2, 3], "jira_task": "DC-1"}
+
+    def setUp(self):
+        self.service = mock.MagicMock()
+        for target in ("apps.netbox_api.services.jobs.AssetsService", "apps.netbox_api.views.assets.AssetsService"):
+            patcher = mock.patch(target, return_value=self.service)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_worker_runs_job_with_progress(self):
+        def repair(asset_ids, device_id, jira_task):
+            advance(len(asset_ids))
+            return {"status": "success", "total": len(asset_ids)}
+
+        self.service.assets_repair.side_effect = repair
+        job = enqueue("assets_repair", self.repair_body)
+
+        self.assertEqual(JobWorker("test").run(once=True), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.state, Job.SUCCEEDED)
+        self.assertEqual((job.progress, job.total), (3, 3))
+        self.assertEqual(job.result, {"status": "success", "total": 3})
+        self.assertEqual(job.worker, "test")
+        self.service.assets_repair.assert_called_once_with([1, 2, 3], 10, "DC-1")
+
+    def test_failed_job_keeps_error(self):
+        self.service.assets_repair.side_effect = AssetsServiceError("Устройства нет")
+        job = enqueue("assets_repair", self.repair_body)
+
+        JobWorker().run(once=True)
+        job.refresh_from_db()
+        self.assertEqual(job.state, Job.FAILED)
+        self.assertEqual(job.error, {"detail": "Устройства нет"})
+        self.assertIsNotNone(job.finished_at)
+
+    def test_unexpected_error_hides_traceback(self):
+        self.service.assets_repair.side_effect = RuntimeError("/srv/app/secret.py line 1")
+        job = enqueue("assets_repair", self.repair_body)
+
+        with self.assertLogs("apps.netbox_api.services.jobs", "ERROR") as logs:
+            JobWorker().run(once=True)
+        job.refresh_from_db()
+        self.assertEqual(job.state, Job.FAILED)
+        self.assertEqual(list(job.error), ["detail"])
+        self.assertNotIn("secret", json.dumps(self.client.get(reverse("job_detail", args=[job.id])).json()))
+        self.assertIn("secret.py", logs.output[0])
+
+    def test_legacy_cables_job_via_jobs_endpoint(self):
+        dcim = mock.MagicMock()
+        dcim.create_cables.return_value = {"created": [Record({"id": 5, "label": "C-5"}, None, None)], "errors": []}
+        response = self.client.post(
+            reverse("job_create"), {"kind": "cables_create", "params": {"cables": [{"a": 1}]}}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 202)
+
+        with mock.patch("apps.netbox_api.services.jobs._legacy_dcim", return_value=dcim):
+            JobWorker().run(once=True)
+        job = Job.objects.get()
+        self.assertEqual((job.state, job.total), (Job.SUCCEEDED, 1))
+        self.assertEqual(job.result["created"], [{"id": 5, "label": "C-5"}])
+        dcim.create_cables.assert_called_once_with([{"a": 1}])
+
+    def test_claimed_job_is_not_taken_twice(self):
+        job = enqueue("assets_repair", self.repair_body)
+        self.assertEqual(JobWorker("a").claim().pk, job.pk)
+        self.assertIsNone(JobWorker("b").claim())
+
+    def test_job_with_dead_worker_is_failed(self):
+        job = enqueue("assets_repair", self.repair_body)
+        JobWorker("dead").claim()
+        alive = enqueue("assets_repair", self.repair_body)
+        JobWorker("alive").claim()
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=datetime.now(dt_timezone.utc) - timedelta(seconds=300))
+
+        with override_settings(JOBS_STALE_TIMEOUT=120):
+            self.assertEqual(JobWorker("b").fail_stale(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.state, Job.FAILED)
+        self.assertIn("dead", job.error["detail"])
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(Job.objects.get(pk=alive.pk).state, Job.RUNNING)
+
+    def test_heartbeat_keeps_running_job(self):
+        job = enqueue("assets_repair", self.repair_body)
+        JobWorker("a").claim()
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=datetime.now(dt_timezone.utc) - timedelta(seconds=300))
+
+        Heartbeat(job).beat()
+
+        with override_settings(JOBS_STALE_TIMEOUT=120):
+            self.assertEqual(JobWorker("b").fail_stale(), 0)
+        self.assertEqual(Job.objects.get(pk=job.pk).state, Job.RUNNING)
+
+    def test_result_records_keep_choice_value(self):
+        self.service.assets_repair.return_value = {"assets": [make_asset(1)]}
+        job = enqueue("assets_repair", self.repair_body)
+
+        JobWorker().run(once=True)
+        job.refresh_from_db()
+        self.assertEqual(job.result["assets"][0]["status"], {"value": "stored", "label": "Stored"})
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            enqueue("reboot", {})
+
+    @override_settings(JOBS_INLINE_MAX_OBJECTS=2)
+    def test_large_operation_returns_202(self):
+        response = self.client.post(reverse("assets_repair"), self.repair_body, content_type="application/json")
+
+        self.assertEqual(response.status_code, 202)
+        job = Job.objects.get()
+        self.assertEqual(job.kind, "assets_repair")
+        self.assertEqual(response["Location"], reverse("job_detail", args=[job.id]))
+        self.service.assets_repair.assert_not_called()
+
+    def test_background_query_param(self):
+        items = [{"inventoryitem_type_id": 1, "count": 1}]
+        response = self.client.post(
+            reverse("assets_create") + "?background=1",
+            {"items": items, "storage_location_id": 5, "delivery_task": "DT-1"},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(Job.objects.get().params["items"], items)
+        self.service.create_assets.assert_not_called()
+
+    def test_small_operation_runs_inline(self):
+        self.service.assets_repair.return_value = {"status": "success"}
+        response = self.client.post(reverse("assets_repair"), self.repair_body, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Job.objects.exists())
+
+    def test_status_endpoint(self):
+        job = enqueue("assets_repair", self.repair_body)
+        response = self.client.get(reverse("job_detail", args=[job.id]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["state"], Job.QUEUED)
+        self.assertEqual(response.json()["total"], 3)
+
+        url = reverse("job_detail", args=[job.id])
+        job.delete()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class FakeNetBoxTests(SimpleTestCase):
+    """Сервис целиком поверх фиктивного NetBox по HTTP"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.dataset = FakeNetBoxDataset.generate(sites=2, locations=2, devices=5, asset_types=3, assets=120)
+        cls.netbox = FakeNetBox(cls.dataset).start()
+        cls.addClassCleanup(cls.netbox.stop)
+
+    def setUp(self):
+        settings_override = override_settings(NETBOX_URL=self.netbox.url, NETBOX_TOKEN="token", JIRA_URL="http://jira")
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        reset_netbox_clients()
+        reference_cache.invalidate()
+        response_cache.invalidate()
+        self.addCleanup(reset_netbox_clients)
+
+    def test_reads(self):
+        service = AssetsService()
+        page = service.get_assets_page(limit=50)
+        self.assertEqual(page["count"], 120)
+        self.assertEqual(len(service.get_assets()), 120)
+        self.assertEqual(sorted(service.get_site_location_map()), ["DC-1", "DC-2"])
+        self.assertEqual(len(service.get_asset_types()), 3)
+
+    def test_repair_changes_netbox_state(self):
+        asset_ids = self.dataset.ids("plugins/inventory/assets", status="stored")[:2]
+        result = AssetsService().assets_repair(asset_ids, 1, "DC-1")
+
+        self.assertEqual(result["total"], 2)
+        for asset_id in asset_ids:
+            asset = self.dataset.objects["plugins/inventory/assets"][asset_id]
+            self.assertEqual(asset["status"], "used")
+            self.assertEqual(asset["custom_fields"]["Install_in"], 1)
+        journal = list(self.dataset.objects["extras/journal-entries"].values())
+        self.assertEqual(journal[-1]["assigned_object_id"], 1)
+
+    def test_repair_rejects_used_asset(self):
+        # status из NetBox — {"value", "label"}, а не строка
+        asset_id = self.dataset.ids("plugins/inventory/assets", status="used")[0]
+        journal = dict(self.dataset.objects["extras/journal-entries"])
+        response = self.client.post(
+            reverse("assets_repair"),
+            {"asset_ids": [asset_id], "device_id": 1, "jira_task": "DC-1"},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()["used_asset_ids"], [asset_id])
+        self.assertEqual(self.dataset.objects["extras/journal-entries"], journal)
+
+    def test_load_runner(self):
+        runner = LoadRunner(LoadContext(self.dataset), requests_per_route=6)
+        with ServiceServer(workers=2) as service:
+            result = runner.run_route(service.url, "asset_detail", workers=2, concurrency=3)
+
+        self.assertEqual((result.requests, result.errors), (6, 0))
+        summary = result.summary()
+        self.assertGreater(summary["rps"], 0)
+        self.assertLessEqual(summary["p50_ms"], summary["p99_ms"])
+
+    def test_load_runner_async_writes(self):
+        # свой NetBox: записи меняют датасет, общий для остальных тестов
+        dataset = FakeNetBoxDataset.generate(sites=1, locations=1, devices=2, asset_types=2, assets=20)
+        netbox = FakeNetBox(dataset).start()
+        self.addCleanup(netbox.stop)
+        runner = LoadRunner(LoadContext(dataset), requests_per_route=4)
+        with override_settings(NETBOX_URL=netbox.url), ServiceServer(workers=2) as service:
+            reset_netbox_clients()
+            for route in ("async_assets_create", "async_assets_repair"):
+                result = runner.run_route(service.url, route, workers=2, concurrency=2)
+                self.assertEqual((result.requests, result.errors), (4, 0), result.error_samples)
+
+    def test_percentile(self):
+        values = [i / 100 for i in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 0.5)
+        self.assertEqual(percentile(values, 99), 0.99)
+        self.assertEqual(percentile([], 95), 0.0)
+
+
+class BenchmarkTests(SimpleTestCase):
+    def test_run_small(self):
+        with mock.patch.object(benchmarks, "MIN_MEASURE_TIME", 0):
+            current = benchmarks.run_benchmarks(sizes=(10,), repeat=1)
+        self.assertEqual(
+            sorted(current["results"]),
+            sorted(f"{b.name}/10" for b in benchmarks.BENCHMARKS),
+        )
+        self.assertEqual(current["host"], benchmarks.host_id())
+        self.assertTrue(all(units > 0 for units in current["results"].values()))
+
+    def test_compare_in_calibration_units(self):
+        baseline = {"host": "h", "results": {"a/10": 10.0, "b/10": 10.0}}
+        current = {"host": "h", "seconds": {"a/10": 1, "b/10": 1, "c/10": 1}, "results": {"a/10": 11.0, "b/10": 15.0, "c/10": 1.0}}
+        rows = {r["benchmark"]: r for r in benchmarks.compare(current, baseline, threshold=0.25)}
+
+        self.assertFalse(rows["a/10"]["regression"])
+        self.assertTrue(rows["b/10"]["regression"])
+        self.assertAlmostEqual(rows["b/10"]["ratio"], 1.5)
+        self.assertIsNone(rows["c/10"]["ratio"])
+
+    def test_save_partial_baseline(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "baseline.json"
+            benchmarks.save_baseline({"host": "h", "results": {"a/10": 1.0, "b/10": 2.0}}, path)
+            benchmarks.save_baseline({"host": "h", "results": {"b/10": 3.0}}, path)
+            self.assertEqual(benchmarks.load_baseline(path), {"host": "h", "results": {"a/10": 1.0, "b/10": 3.0}})
+
+            # с другой машины старые единицы несравнимы — baseline пишется заново
+            benchmarks.save_baseline({"host": "other", "results": {"b/10": 4.0}}, path)
+            self.assertEqual(benchmarks.load_baseline(path), {"host": "other", "results": {"b/10": 4.0}})
+
+    def test_other_host_regression_does_not_fail(self):
+        baseline = {"host": "elsewhere", "results": {f"{b.name}/10": 1e-9 for b in benchmarks.BENCHMARKS}}
+        with mock.patch("apps.netbox_api.management.commands.bench_services.load_baseline", return_value=baseline), \
+                mock.patch.object(benchmarks, "MIN_MEASURE_TIME", 0):
+            call_command("bench_services", sizes=[10], repeat=1, stdout=StringIO())
+
+            baseline["host"] = benchmarks.host_id()
+            with self.assertRaises(CommandError):
+                call_command("bench_services", sizes=[10], repeat=1, stdout=StringIO())
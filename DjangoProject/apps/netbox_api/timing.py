@@ -0,0 +1,140 @@
+"""
+Разбивка времени запроса по частям: заголовок Server-Timing + лог медленных запросов.
+
+ServerTimingMiddleware открывает timing_scope() на запрос. Внутри
+    - каждый HTTP-запрос к NetBox пишется как netbox.<операция> (NetBoxHTTPAdapter);
+    - timed("journal") / timed("simplify") — куски сервисного слоя
+      (работает и как декоратор);
+    - render — рендер DRF Response; compress — сжатие ответа для response_cache.
+Потоки workflow и bulk копируют контекст, поэтому пишут в тот же объект.
+
+Запросы дольше SLOW_REQUEST_THRESHOLD_MS попадают в лог одной JSON-строкой.
+"""
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTimings:
+    def __init__(self):
+        # имя -> [суммарное время, сек; кол-во вызовов]
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, duration: float):
+        with self._lock:
+            entry = self._entries.setdefault(name, [0.0, 0])
+            entry[0] += duration
+            entry[1] += 1
+
+    def as_dict(self) -> dict:
+        """{имя: {"ms": ..., "count": ...}}"""
+        with self._lock:
+            entries = list(self._entries.items())
+        return {name: {"ms": round(total * 1000, 1), "count": count} for name, (total, count) in entries}
+
+    def header(self, total: float) -> str:
+        parts = []
+        for name, entry in self.as_dict().items():
+            part = f"{name};dur={entry['ms']}"
+            if entry["count"] > 1:
+                part += f';desc="{entry["count"]} calls"'
+            parts.append(part)
+        parts.append(f"total;dur={round(total * 1000, 1)}")
+        return ", ".join(parts)
+
+
+_current: ContextVar = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def timing_scope():
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+def record(name: str, duration: float):
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, duration)
+
+
+@contextmanager
+def timed(name: str):
+    """Время блока (или функции, если как декоратор) в разбивку текущего запроса"""
+    if _current.get() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+class ServerTimingMiddleware:
+    """Server-Timing для каждого ответа и лог медленных запросов (WSGI и ASGI)"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with timing_scope() as timings:
+            response = self.get_response(request)
+        return self._finish(request, response, timings, start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with timing_scope() as timings:
+            response = await self.get_response(request)
+        return self._finish(request, response, timings, start)
+
+    def process_template_response(self, request, response):
+        # DRF Response рендерится после view — оборачиваем render
+        render = response.render
+
+        def timed_render():
+            with timed("render"):
+                return render()
+
+        response.render = timed_render
+        return response
+
+    @staticmethod
+    def _finish(request, response, timings: RequestTimings, start: float):
+        total = time.perf_counter() - start
+        if settings.SERVER_TIMING_HEADER:
+            response["Server-Timing"] = timings.header(total)
+
+        if total * 1000 >= settings.SLOW_REQUEST_THRESHOLD_MS:
+            match = getattr(request, "resolver_match", None)
+            logger.warning("slow request %s", json.dumps({
+                "method": request.method,
+                "path": request.path,
+                "route": match.view_name if match else None,
+                "status": response.status_code,
+                "total_ms": round(total * 1000, 1),
+                "timings": timings.as_dict(),
+            }, ensure_ascii=False))
+        return response
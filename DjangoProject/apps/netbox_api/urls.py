@@ -1,23 +1,71 @@
 from django.urls import path
 from apps.netbox_api.views.assets import (
     AssetsListView,
+    AssetsExportView,
     AssetsTypeListView,
     AssetDetailView,
     AssetsCreateView,
+    AssetsImportView,
     AssetsRepairView,
     AssetsModernizationView,
     SitesLocationListView,
 )
+from apps.netbox_api.views.assets_async import (
+    AsyncAssetsListView,
+    AsyncAssetsTypeListView,
+    AsyncAssetDetailView,
+    AsyncAssetsCreateView,
+    AsyncAssetsRepairView,
+    AsyncAssetsModernizationView,
+    AsyncSitesLocationListView,
+)
+from apps.netbox_api.views.diagnostics import (
+    IdentityMapStatsView,
+    MetricsView,
+    NetBoxHealthView,
+    NetBoxPoolStatsView,
+    ReferenceCacheView,
+    ResponseCacheView,
+)
+from apps.netbox_api.views.jobs import JobCreateView, JobDetailView
+from apps.netbox_api.views.webhooks import NetBoxWebhookView
 
 urlpatterns = [
     ### ASSETS GET
     path('assets_list/', AssetsListView.as_view(), name='assets_list'),
+    path('assets_export/csv/', AssetsExportView.as_view(export_format='csv'), name='assets_export_csv'),
+    path('assets_export/xlsx/', AssetsExportView.as_view(export_format='xlsx'), name='assets_export_xlsx'),
     path('asset/<int:asset_id>/', AssetDetailView.as_view(), name='asset_detail'),
     path('asset_types/', AssetsTypeListView.as_view(), name='asset_types_list'),
     ### ASSETS POST
     path('create/', AssetsCreateView.as_view(), name='assets_create'),
+    path('import/', AssetsImportView.as_view(), name='assets_import'),
     path('repair/', AssetsRepairView.as_view(), name='assets_repair'),
     path('modernization/', AssetsModernizationView.as_view(), name='assets_modernization'),
 
     path('site_location/', SitesLocationListView.as_view(), name='site_location_list'),
-]
\ No newline at end of file
+
+    ### ASYNC (ASGI)
+    path('async/assets_list/', AsyncAssetsListView.as_view(), name='async_assets_list'),
+    path('async/asset/<int:asset_id>/', AsyncAssetDetailView.as_view(), name='async_asset_detail'),
+    path('async/asset_types/', AsyncAssetsTypeListView.as_view(), name='async_asset_types_list'),
+    path('async/create/', AsyncAssetsCreateView.as_view(), name='async_assets_create'),
+    path('async/repair/', AsyncAssetsRepairView.as_view(), name='async_assets_repair'),
+    path('async/modernization/', AsyncAssetsModernizationView.as_view(), name='async_assets_modernization'),
+    path('async/site_location/', AsyncSitesLocationListView.as_view(), name='async_site_location_list'),
+
+    ### JOBS
+    path('jobs/', JobCreateView.as_view(), name='job_create'),
+    path('jobs/<uuid:job_id>/', JobDetailView.as_view(), name='job_detail'),
+
+    ### WEBHOOKS
+    path('webhooks/netbox/', NetBoxWebhookView.as_view(), name='netbox_webhook'),
+
+    ### DIAGNOSTICS
+    path('netbox/pool_stats/', NetBoxPoolStatsView.as_view(), name='netbox_pool_stats'),
+    path('netbox/reference_cache/', ReferenceCacheView.as_view(), name='netbox_reference_cache'),
+    path('netbox/response_cache/', ResponseCacheView.as_view(), name='netbox_response_cache'),
+    path('netbox/identity_map/', IdentityMapStatsView.as_view(), name='netbox_identity_map'),
+    path('netbox/health/', NetBoxHealthView.as_view(), name='netbox_health'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+]
\ No newline at end of file
@@ -1,32 +1,202 @@
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.parsers import MultiPartParser
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
+from config import fastjson
 from apps.netbox_api.services.assets import (
     AssetsService, 
     BaseService,
     AssetsServiceError,
+    decode_cursor,
+    page_payload,
+    parse_limit,
+    service_error_payload,
 )
+from apps.netbox_api.services.assets_export import EXPORT_CONTENT_TYPES, EXPORT_WRITERS
+from apps.netbox_api.services.delivery_import import DeliveryImportService
+from apps.netbox_api.services.mirror import MirrorReader, MirrorResult
+from apps.netbox_api.services.jobs import asset_count
+from apps.netbox_api.views.conditional import conditional_get
+from apps.netbox_api.views.idempotency import IdempotentPostMixin
+from apps.netbox_api.views.jobs import background_job_response
+
+
+def add_mirror_headers(response, synced_at):
+    """Заголовки о свежести данных из локального зеркала"""
+    response["X-Data-Source"] = "mirror"
+    response["X-Mirror-Synced-At"] = synced_at.isoformat()
+    response["X-Mirror-Age"] = str(int((timezone.now() - synced_at).total_seconds()))
+    return response
+
+
+def mirror_response(result: MirrorResult, **kwargs) -> Response:
+    """Ответ из локального зеркала"""
+    return add_mirror_headers(Response(result.data, **kwargs), result.synced_at)
+
+
+def json_array_stream(items, buffer_size: int = 64 * 1024):
+    """Отдаёт элементы JSON-массивом по частям (формат как у DRF JSONRenderer)"""
+    buffer = bytearray(b"[")
+    first = True
+    for item in items:
+        if not first:
+            buffer += b","
+        buffer += fastjson.dumps(item)
+        first = False
+        if len(buffer) >= buffer_size:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b"]"
+    yield bytes(buffer)
+
+
+def creation_status(created_count: int, failed_count: int) -> tuple[str, int]:
+    """success / partial (часть items не создана) / error (не создано ничего)"""
+    if failed_count and not created_count:
+        return "error", status.HTTP_400_BAD_REQUEST
+    if failed_count:
+        return "partial", status.HTTP_201_CREATED
+    return "success", status.HTTP_201_CREATED
+
+
+def create_response_payload(result: dict) -> tuple[dict, int]:
+    """Тело ответа create_assets и HTTP-статус"""
+    created, failed = result["created"], result["failed"]
+    create_status, http_status = creation_status(len(created), len(failed))
+    payload = {
+        "status": create_status,
+        "created_count": len(created),
+        "assets": created,
+        "failed_count": len(failed),
+        "failed": failed,
+    }
+    return payload, http_status
+
+
+def is_stream(params) -> bool:
+    return params.get("stream", "").lower() in ("1", "true", "yes")
 
 
 class AssetsTypeListView(APIView):
+    """Типы assets; ETag по версии зеркала или записи кэша справочников"""
+
     def get(self, request):
-        service = AssetsService()
-        types = service.get_asset_types()
-        return Response(types)
+        reader = MirrorReader()
+        version = reader.asset_types_version()
+        if version is not None:
+            return conditional_get(request, lambda: ("mirror", version), lambda: self.from_mirror(reader))
+
+        entry = AssetsService().get_asset_types_entry()
+        return conditional_get(request, lambda: ("netbox", entry.tag), lambda: Response(entry.value))
+
+    @staticmethod
+    def from_mirror(reader: MirrorReader) -> Response:
+        mirrored = reader.get_asset_types()
+        if mirrored:
+            return mirror_response(mirrored)
+        return Response(AssetsService().get_asset_types())
 
 
 class AssetsListView(APIView):
+    """
+    Список активов. Дополнительно к фильтрам NetBox:
+        ?limit=N[&cursor=...] — страница + next_cursor;
+        ?stream=1 — весь список потоковым JSON-массивом.
+    ETag — по count + max(last_updated) (зеркало или лёгкий запрос в NetBox),
+    If-None-Match с той же версией отвечает 304 без загрузки списка.
+    У ?stream=1 ETag нет (ответ потоковый), версия не запрашивается.
+    """
+
+    control_params = ("limit", "cursor", "stream")
+
     def get(self, request):
-        service = AssetsService()
-        filters = {k: v for k, v in request.query_params.items() if v}
+        params = request.query_params
+        filters = {k: v for k, v in params.items() if v and k not in self.control_params}
         # filters = request.query_params.dict()  # пример: ?status=active
+        if is_stream(params):
+            return self.build(params, filters)
+        return conditional_get(request, lambda: self.version(filters), lambda: self.build(params, filters))
+
+    @staticmethod
+    def version(filters: dict):
+        """(источник, версия) списка для ETag или None"""
+        version = MirrorReader().assets_version(**filters)
+        if version is not None:
+            return "mirror", version
+        version = AssetsService().get_assets_version(**filters)
+        return ("netbox", version) if version is not None else None
+
+    def build(self, params, filters: dict):
+        try:
+            if is_stream(params):
+                return self.stream(filters)
+            if params.get("limit"):
+                return self.page(parse_limit(params["limit"]), decode_cursor(params.get("cursor")), filters)
+        except AssetsServiceError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        mirrored = MirrorReader().get_assets(**filters)
+        if mirrored:
+            return mirror_response(mirrored)
+
+        service = AssetsService()
         assets = service.get_assets(**filters)
         return Response(assets)
 
+    def page(self, limit: int, offset: int, filters: dict):
+        mirrored = MirrorReader().get_assets_page(limit, offset, **filters)
+        if mirrored:
+            results, count = mirrored.data
+            return add_mirror_headers(Response(page_payload(results, count, offset)), mirrored.synced_at)
+
+        service = AssetsService()
+        return Response(service.get_assets_page(limit, offset, **filters))
+
+    def stream(self, filters: dict):
+        mirrored = MirrorReader().iter_assets(**filters)
+        assets = mirrored.data if mirrored else AssetsService().iter_assets(**filters)
+        response = StreamingHttpResponse(json_array_stream(assets), content_type="application/json")
+        if mirrored:
+            add_mirror_headers(response, mirrored.synced_at)
+        return response
+
+
+class AssetsExportView(APIView):
+    """
+    Выгрузка списка активов в CSV/XLSX, фильтры те же, что у AssetsListView.
+    NetBox (или зеркало) читается страницами прямо во время отдачи ответа.
+    """
+
+    export_format: str = None  # "csv" или "xlsx"
+
+    def get(self, request):
+        filters = {
+            k: v for k, v in request.query_params.items()
+            if v and k not in AssetsListView.control_params
+        }
+        mirrored = MirrorReader().iter_assets(**filters)
+        assets = mirrored.data if mirrored else AssetsService().iter_assets(**filters)
+
+        response = StreamingHttpResponse(
+            EXPORT_WRITERS[self.export_format](assets),
+            content_type=EXPORT_CONTENT_TYPES[self.export_format],
+        )
+        filename = f"assets_{timezone.localdate():%Y%m%d}.{self.export_format}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        if mirrored:
+            add_mirror_headers(response, mirrored.synced_at)
+        return response
+
 
 class AssetDetailView(APIView):
     def get(self, request, asset_id):
+        mirrored = MirrorReader().get_asset_by_id(asset_id)
+        if mirrored and mirrored.data:
+            return mirror_response(mirrored)
+
         service = AssetsService()
         try:
             asset = service.get_asset_by_id(asset_id)
@@ -35,8 +205,8 @@ class AssetDetailView(APIView):
             return Response({"detail": str(e)}, status=404)
         
 
-class AssetsCreateView(APIView):
-    def post(self, request):
+class AssetsCreateView(IdempotentPostMixin, APIView):
+    def handle_post(self, request):
         items = request.data.get("items")
         storage_location_id = request.data.get("storage_location_id")
         delivery_task = request.data.get("delivery_task")
@@ -47,37 +217,77 @@ class AssetsCreateView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        params = {"items": items, "storage_location_id": storage_location_id, "delivery_task": delivery_task}
+        job_response = background_job_response(request, "assets_create", params, asset_count(items))
+        if job_response:
+            return job_response
+
         service = AssetsService()
 
         try:
-            assets = service.create_assets(
+            result = service.create_assets(
                 items=items,
                 storage_location_id=int(storage_location_id),
                 delivery_task=delivery_task
             )
 
+            payload, http_status = create_response_payload(result)
+            return Response(payload, status=http_status)
+        except AssetsServiceError as e:
+            return Response({"detail": str(e)}, status=404)
+
+
+class AssetsImportView(APIView):
+    """Приёмка поставки из .xlsx/.csv (multipart: file, storage_location_id, delivery_task)"""
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        storage_location_id = request.data.get("storage_location_id")
+        delivery_task = request.data.get("delivery_task")
+
+        if not all([upload, storage_location_id, delivery_task]):
             return Response(
-                {
-                    "status": "success",
-                    "created_count": len(assets),
-                    "assets": assets
-                },
-                status=status.HTTP_201_CREATED
+                {"error": "Не хватает параметров: file, storage_location_id, delivery_task"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            result = DeliveryImportService().import_file(
+                upload,
+                upload.name,
+                storage_location_id=int(storage_location_id),
+                delivery_task=delivery_task,
             )
+        except ValueError:
+            return Response({"error": "storage_location_id должен быть числом"}, status=status.HTTP_400_BAD_REQUEST)
         except AssetsServiceError as e:
-            return Response({"detail": str(e)}, status=404)
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        import_status, http_status = creation_status(result.created_count, len(result.errors))
+        return Response(
+            {
+                "status": import_status,
+                "rows": result.rows,
+                "created_count": result.created_count,
+                "created_ids": result.created_ids,
+                "errors": result.errors,
+            },
+            status=http_status
+        )
         
 
-class BaseAssetOperationView(APIView):
+class BaseAssetOperationView(IdempotentPostMixin, APIView):
     """
     Базовый класс для операций с активами.
     Наследники должны определить:
         - client_method_name: имя метода сервиса AssetsService
+    Повтор с тем же заголовком Idempotency-Key получает сохранённый ответ.
     """
 
     client_method_name: str = None  # "assets_repair" или "assets_modernization"
 
-    def post(self, request):
+    def handle_post(self, request):
         if not self.client_method_name:
             return Response(
                 {"detail": "client_method_name не задан"},
@@ -94,6 +304,11 @@ class BaseAssetOperationView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        params = {"asset_ids": asset_ids, "device_id": device_id, "jira_task": jira_task}
+        job_response = background_job_response(request, self.client_method_name, params, len(asset_ids))
+        if job_response:
+            return job_response
+
         service = AssetsService()
         client_method = getattr(service, self.client_method_name)
 
@@ -106,7 +321,7 @@ class BaseAssetOperationView(APIView):
             return Response(result, status=status.HTTP_200_OK)
 
         except AssetsServiceError as e:
-            return Response({"detail": str(e)}, status=404)
+            return Response(service_error_payload(e), status=404)
 
 
 class AssetsRepairView(BaseAssetOperationView):
@@ -118,7 +333,20 @@ class AssetsModernizationView(BaseAssetOperationView):
 
 
 class SitesLocationListView(APIView):
+    """Карта сайтов и локаций; ETag по версии зеркала или записи кэша справочников"""
+
     def get(self, request):
-        service = BaseService()
-        site_location = service.get_site_location_map()
-        return Response(site_location)
\ No newline at end of file
+        reader = MirrorReader()
+        version = reader.site_location_version()
+        if version is not None:
+            return conditional_get(request, lambda: ("mirror", version), lambda: self.from_mirror(reader))
+
+        entry = BaseService().get_site_location_map_entry()
+        return conditional_get(request, lambda: ("netbox", entry.tag), lambda: Response(entry.value))
+
+    @staticmethod
+    def from_mirror(reader: MirrorReader) -> Response:
+        mirrored = reader.get_site_location_map()
+        if mirrored:
+            return mirror_response(mirrored)
+        return Response(BaseService().get_site_location_map())
\ No newline at end of file
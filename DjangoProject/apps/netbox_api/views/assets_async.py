@@ -0,0 +1,239 @@
+"""
+Async-версии inventory-вьюх. Работают поверх AsyncAssetsService и
+рассчитаны на запуск через ASGI (config/asgi.py), где один воркер
+держит много запросов к NetBox одновременно.
+
+DRF APIView не поддерживает async-обработчики, поэтому здесь django View,
+но с тем же поведением, что у DRF (AsyncAPIView): аутентификация и права
+из REST_FRAMEWORK, без CSRF для токенов, ответ — тем же JSON-рендерером.
+
+POST-операции, как и sync-версии, поддерживают Idempotency-Key и уводят
+большие операции в очередь задач (JOBS_INLINE_MAX_OBJECTS, ?background=1).
+"""
+import json
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from config.fastjson import FastJSONRenderer
+from apps.netbox_api.services.assets import AssetsServiceError
+from apps.netbox_api.services.assets_async import AsyncAssetsService, AsyncBaseService
+from apps.netbox_api.services.jobs import asset_count
+from apps.netbox_api.views.assets import create_response_payload, service_error_payload
+from apps.netbox_api.views.idempotency import IDEMPOTENCY_HEADER, idempotent_response
+from apps.netbox_api.views.jobs import background_job_response
+
+renderer = FastJSONRenderer()
+
+
+def json_response(data, status=200):
+    """Ответ побайтно как у sync-вьюх (DRF renderer: Records, Decimal, datetime)"""
+    return HttpResponse(renderer.render(data), status=status, content_type=renderer.media_type)
+
+
+def render_response(response):
+    """DRF Response (общие helpers: задачи, идемпотентность) -> HttpResponse"""
+    if not isinstance(response, Response):
+        return response
+    rendered = json_response(response.data, status=response.status_code)
+    for name, value in response.items():
+        if name.lower() != "content-type":
+            rendered[name] = value
+    return rendered
+
+
+def parse_json_body(request) -> dict:
+    """Тело как JSON-объект; битый JSON — ParseError (400), как у DRF JSONParser"""
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError as e:
+        raise exceptions.ParseError(f"JSON parse error - {e}")
+    return data if isinstance(data, dict) else {}
+
+
+class AsyncAPIView(View):
+    """
+    Проверки DRF APIView для async-обработчиков: authentication_classes и
+    permission_classes (по умолчанию из REST_FRAMEWORK). CSRF, как и в DRF,
+    проверяется только при сессионной аутентификации.
+    """
+
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = api_settings.DEFAULT_PERMISSION_CLASSES
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        drf_request = Request(request, authenticators=[auth() for auth in self.authentication_classes])
+        try:
+            # аутентификация может ходить в БД (JWT -> пользователь)
+            await sync_to_async(self.check_access)(drf_request)
+        except exceptions.APIException as e:
+            return self.access_denied(drf_request, e)
+        request.user = drf_request.user
+        try:
+            response = await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as e:
+            return json_response({"detail": e.detail}, status=e.status_code)
+        return render_response(response)
+
+    def check_access(self, request: Request):
+        """Как APIView.perform_authentication + check_permissions"""
+        request.user
+        for permission_class in self.permission_classes:
+            permission = permission_class()
+            if not permission.has_permission(request, self):
+                if request.authenticators and not request.successful_authenticator:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(getattr(permission, "message", None))
+
+    @staticmethod
+    def access_denied(request: Request, e: exceptions.APIException) -> HttpResponse:
+        """401 с WWW-Authenticate или 403 — как APIView.handle_exception"""
+        response = json_response({"detail": e.detail}, status=e.status_code)
+        if isinstance(e, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            header = request.authenticators[0].authenticate_header(request) if request.authenticators else None
+            if header:
+                response["WWW-Authenticate"] = header
+            else:
+                response.status_code = exceptions.PermissionDenied.status_code
+        return response
+
+
+class AsyncAssetsTypeListView(AsyncAPIView):
+    async def get(self, request):
+        service = AsyncAssetsService()
+        types = await service.get_asset_types()
+        return json_response(types)
+
+
+class AsyncAssetsListView(AsyncAPIView):
+    async def get(self, request):
+        service = AsyncAssetsService()
+        filters = {k: v for k, v in request.GET.items() if v}
+        assets = await service.get_assets(**filters)
+        return json_response(assets)
+
+
+class AsyncAssetDetailView(AsyncAPIView):
+    async def get(self, request, asset_id):
+        service = AsyncAssetsService()
+        try:
+            asset = await service.get_asset_by_id(asset_id)
+            return json_response(asset)
+        except AssetsServiceError as e:
+            return json_response({"detail": str(e)}, status=404)
+
+
+class AsyncIdempotentPostMixin:
+    """
+    Async-аналог IdempotentPostMixin: наследники реализуют
+    async handle_post(request, data) -> Response, data — разобранное тело.
+    """
+
+    async def post(self, request):
+        data = parse_json_body(request)
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return await self.handle_post(request, data)
+        # IdempotencyService синхронный (БД, ожидание дубля) — в потоке, операция — обратно в event loop
+        return await sync_to_async(idempotent_response)(
+            request, key, data, lambda: async_to_sync(self.handle_post)(request, data)
+        )
+
+
+class AsyncAssetsCreateView(AsyncIdempotentPostMixin, AsyncAPIView):
+    async def handle_post(self, request, data):
+        items = data.get("items")
+        storage_location_id = data.get("storage_location_id")
+        delivery_task = data.get("delivery_task")
+
+        if not all([items, storage_location_id, delivery_task]):
+            return Response({"error": "Не хватает параметров"}, status=400)
+
+        params = {"items": items, "storage_location_id": storage_location_id, "delivery_task": delivery_task}
+        job_response = await sync_to_async(background_job_response)(
+            request, "assets_create", params, asset_count(items)
+        )
+        if job_response:
+            return job_response
+
+        service = AsyncAssetsService()
+
+        try:
+            result = await service.create_assets(
+                items=items,
+                storage_location_id=int(storage_location_id),
+                delivery_task=delivery_task
+            )
+            payload, http_status = create_response_payload(result)
+            return Response(payload, status=http_status)
+        except AssetsServiceError as e:
+            return Response({"detail": str(e)}, status=404)
+
+
+class AsyncBaseAssetOperationView(AsyncIdempotentPostMixin, AsyncAPIView):
+    """
+    Async-аналог BaseAssetOperationView.
+    Наследники должны определить client_method_name.
+    """
+
+    client_method_name: str = None
+
+    async def handle_post(self, request, data):
+        if not self.client_method_name:
+            return Response({"detail": "client_method_name не задан"}, status=500)
+
+        device_id = data.get("device_id")
+        asset_ids = data.get("asset_ids")
+        jira_task = data.get("jira_task")
+
+        if not all([device_id, asset_ids, jira_task]):
+            return Response(
+                {"error": "Не хватает параметров: device_id, asset_ids, jira_task"},
+                status=400,
+            )
+
+        params = {"asset_ids": asset_ids, "device_id": device_id, "jira_task": jira_task}
+        job_response = await sync_to_async(background_job_response)(
+            request, self.client_method_name, params, len(asset_ids)
+        )
+        if job_response:
+            return job_response
+
+        service = AsyncAssetsService()
+        client_method = getattr(service, self.client_method_name)
+
+        try:
+            result = await client_method(
+                asset_ids=asset_ids,
+                device_id=device_id,
+                jira_task=jira_task,
+            )
+            return Response(result)
+
+        except AssetsServiceError as e:
+            return Response(service_error_payload(e), status=404)
+
+
+class AsyncAssetsRepairView(AsyncBaseAssetOperationView):
+    client_method_name = "assets_repair"
+
+
+class AsyncAssetsModernizationView(AsyncBaseAssetOperationView):
+    client_method_name = "assets_modernization"
+
+
+class AsyncSitesLocationListView(AsyncAPIView):
+    async def get(self, request):
+        service = AsyncBaseService()
+        site_location = await service.get_site_location_map()
+        return json_response(site_location)
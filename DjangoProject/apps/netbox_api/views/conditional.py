@@ -0,0 +1,143 @@
+"""
+Conditional GET для read-эндпоинтов: ETag + If-None-Match -> 304.
+
+ETag считается не по телу ответа, а по версии данных:
+    - reference_cache — tag записи (хэш значения, посчитанный при записи в кэш);
+    - зеркало — count + max(last_updated) запросом в БД;
+    - NetBox — то же, но через GET одного объекта (get_assets_version).
+К версии добавляются путь, параметры запроса и формат ответа, поэтому
+ETag сильный: одинаковый ETag — побайтно одинаковый ответ.
+
+Тот же ETag — ключ response_cache: JSON-ответ рендерится и сжимается
+один раз на версию данных, дальше отдаётся готовыми байтами в кодировке
+по Accept-Encoding. У сжатых вариантов свой ETag ("…-gzip", "…-br").
+"""
+import hashlib
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from rest_framework.response import Response
+from rest_framework import status
+
+from apps.netbox_api.services.response_cache import (
+    ENCODINGS,
+    IDENTITY,
+    CachedResponse,
+    compress,
+    negotiate_encoding,
+    response_cache,
+)
+from apps.netbox_api.timing import timed
+
+# заголовки ответа, которые кэшируются вместе с телом; X-Mirror-Age пересчитывается при отдаче
+CACHED_HEADERS = ("X-Data-Source", "X-Mirror-Synced-At")
+
+
+def make_etag(request, source: str, version: str) -> str:
+    parts = [
+        request.path,
+        source,
+        request.accepted_renderer.format,
+        sorted(request.query_params.lists()),
+        version,
+    ]
+    digest = hashlib.blake2b(json.dumps(parts, ensure_ascii=False).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag варианта тела в кодировке encoding: "abc" -> "abc-gzip" """
+    return etag if encoding == IDENTITY else f'{etag[:-1]}-{encoding}"'
+
+
+def matching_etag(request, etag: str):
+    """
+    ETag из If-None-Match, совпавший с etag в любой кодировке, или None.
+    * совпадает со всем, W/ не учитывается (слабое сравнение).
+    """
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return None
+    if header.strip() == "*":
+        return etag
+    variants = {encoded_etag(etag, encoding) for encoding in (IDENTITY, *ENCODINGS)}
+    for tag in header.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if tag in variants:
+            return tag
+    return None
+
+
+def conditional_get(request, get_version, build):
+    """
+    get_version() -> (источник, версия) или None — без ETag и без кэша;
+    build() -> Response, вызывается, только если у клиента не та версия
+    и готового ответа нет в response_cache.
+    """
+    version = get_version() if settings.ETAG_HEADERS else None
+    if version is None:
+        return build()
+
+    etag = make_etag(request, *version)
+    matched = matching_etag(request, etag)
+    if matched:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        response["ETag"] = matched
+        if settings.RESPONSE_CACHE_ENABLED:
+            patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+    if settings.RESPONSE_CACHE_ENABLED and request.accepted_renderer.format == "json":
+        return cached_response(request, etag, build)
+
+    response = build()
+    if response.status_code == status.HTTP_200_OK:
+        response["ETag"] = etag
+    return response
+
+
+def cached_response(request, etag: str, build):
+    """Готовый ответ из response_cache; при промахе build() рендерится, сжимается и кэшируется"""
+    match = request.resolver_match
+    cached = response_cache.get(etag, match.view_name if match else "")
+    if cached is None:
+        response = build()
+        if not isinstance(response, Response) or response.status_code != status.HTTP_200_OK:
+            return response
+        cached = render_cached(request, response)
+        response_cache.put(etag, cached)
+    return encoded_response(request, cached, etag)
+
+
+def render_cached(request, response: Response) -> CachedResponse:
+    """Рендер DRF Response так же, как в finalize_response, и все варианты сжатия"""
+    view = request.parser_context.get("view")
+    response.accepted_renderer = request.accepted_renderer
+    response.accepted_media_type = request.accepted_media_type
+    response.renderer_context = view.get_renderer_context() if view else {"request": request}
+    with timed("render"):
+        response.render()
+    with timed("compress"):
+        variants = compress(response.content)
+    headers = tuple((name, response[name]) for name in CACHED_HEADERS if response.has_header(name))
+    return CachedResponse(response["Content-Type"], variants, headers)
+
+
+def encoded_response(request, cached: CachedResponse, etag: str) -> HttpResponse:
+    encoding = negotiate_encoding(request.headers.get("Accept-Encoding", ""), cached.variants)
+    response = HttpResponse(cached.variants[encoding], content_type=cached.content_type)
+    for name, value in cached.headers:
+        response[name] = value
+    if response.has_header("X-Mirror-Synced-At"):
+        # синхронизация без изменений не меняет версию: возраст считаем от первой — не меньше реального
+        synced_at = datetime.fromisoformat(response["X-Mirror-Synced-At"])
+        response["X-Mirror-Age"] = str(int((timezone.now() - synced_at).total_seconds()))
+    if encoding != IDENTITY:
+        response["Content-Encoding"] = encoding
+    response["ETag"] = encoded_etag(etag, encoding)
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
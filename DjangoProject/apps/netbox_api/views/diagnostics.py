@@ -0,0 +1,65 @@
+from django.http import HttpResponse
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from apps.netbox_api.identity_map import identity_map_stats, reset_identity_map_stats
+from apps.netbox_api.metrics import render_metrics
+from apps.netbox_api.netbox_client import get_netbox_client
+from apps.netbox_api.services.reference_cache import reference_cache
+from apps.netbox_api.services.response_cache import response_cache
+
+
+class NetBoxPoolStatsView(APIView):
+    """Состояние пула соединений к NetBox в текущем процессе."""
+    def get(self, request):
+        client = get_netbox_client()
+        return Response({"pools": client.pool_stats()})
+
+
+class ReferenceCacheView(APIView):
+    """Статистика кэша справочников; DELETE — сбросить кэш"""
+    def get(self, request):
+        return Response(reference_cache.stats())
+
+    def delete(self, request):
+        reference_cache.invalidate(request.query_params.get("key"))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ResponseCacheView(APIView):
+    """Статистика кэша готовых ответов; DELETE — сбросить кэш"""
+    def get(self, request):
+        return Response(response_cache.stats())
+
+    def delete(self, request):
+        response_cache.invalidate()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class IdentityMapStatsView(APIView):
+    """Сколько повторных загрузок Records сэкономил identity map; DELETE — обнулить"""
+    def get(self, request):
+        return Response(identity_map_stats())
+
+    def delete(self, request):
+        reset_identity_map_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class MetricsView(APIView):
+    """Метрики процесса в текстовом формате Prometheus"""
+    def get(self, request):
+        return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+class NetBoxHealthView(APIView):
+    """
+    Circuit breaker и bulkhead NetBox в текущем процессе; 503, пока breaker
+    открыт (запросов в NetBox не делает)
+    """
+    def get(self, request):
+        client = get_netbox_client()
+        stats = client.breaker_stats()
+        http_status = status.HTTP_503_SERVICE_UNAVAILABLE if stats["state"] == "open" else status.HTTP_200_OK
+        return Response({**stats, "bulkhead": client.bulkhead_stats()}, status=http_status)
@@ -0,0 +1,68 @@
+from rest_framework import status
+from rest_framework.response import Response
+
+from apps.netbox_api.services.idempotency import (
+    IdempotencyConflict,
+    IdempotencyInProgress,
+    IdempotencyService,
+    request_fingerprint,
+)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# заголовки ответа, которые сохраняются вместе с телом и отдаются при повторе
+REPLAYED_HEADERS = ("Location", "ETag", "Last-Modified")
+
+
+def idempotent_response(request, key: str, data, handle) -> Response:
+    """
+    Выполняет handle() -> Response один раз на Idempotency-Key (request — для scope,
+    data — тело запроса для отпечатка); повтор получает сохранённый ответ.
+    Общая часть sync- и async-вьюх.
+    """
+    if len(key) > 255:
+        return Response(
+            {"detail": f"{IDEMPOTENCY_HEADER} длиннее 255 символов"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    executed = []
+
+    def execute():
+        response = handle()
+        executed.append(response)
+        headers = {name: response[name] for name in REPLAYED_HEADERS if response.has_header(name)}
+        return response.status_code, response.data, headers
+
+    try:
+        status_code, body, headers, replayed = IdempotencyService().run(
+            scope=f"{request.method} {request.path}",
+            key=key,
+            request_hash=request_fingerprint(data),
+            execute=execute,
+        )
+    except IdempotencyConflict as e:
+        return Response({"detail": str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    except IdempotencyInProgress as e:
+        return Response({"detail": str(e)}, status=status.HTTP_409_CONFLICT)
+
+    if not replayed:
+        # исходный ответ целиком, со всеми заголовками
+        return executed[0]
+    response = Response(body, status=status_code, headers=headers)
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+class IdempotentPostMixin:
+    """
+    Поддержка заголовка Idempotency-Key для POST.
+    Наследники реализуют handle_post(request) -> Response вместо post().
+    Без заголовка запрос выполняется как обычно.
+    """
+
+    def post(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return self.handle_post(request, *args, **kwargs)
+        return idempotent_response(request, key, request.data, lambda: self.handle_post(request, *args, **kwargs))
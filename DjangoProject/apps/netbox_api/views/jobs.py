@@ -0,0 +1,48 @@
+from django.urls import reverse
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from apps.netbox_api.models import Job
+from apps.netbox_api.services.jobs import JOB_HANDLERS, enqueue, job_payload, run_in_background
+
+
+def wants_background(request) -> bool:
+    """?background=1 — выполнить в очереди независимо от размера (DRF и django request)"""
+    return request.GET.get("background", "").lower() in ("1", "true", "yes")
+
+
+def background_job_response(request, kind: str, params: dict, object_count: int):
+    """202 с id задачи, если операцию надо увести в очередь; иначе None"""
+    if not run_in_background(object_count, force=wants_background(request)):
+        return None
+    return job_accepted_response(enqueue(kind, params))
+
+
+def job_accepted_response(job: Job) -> Response:
+    status_url = reverse("job_detail", args=[job.id])
+    response = Response({**job_payload(job), "status_url": status_url}, status=status.HTTP_202_ACCEPTED)
+    response["Location"] = status_url
+    return response
+
+
+class JobCreateView(APIView):
+    """Поставить задачу в очередь напрямую: {"kind": ..., "params": {...}}"""
+    def post(self, request):
+        kind = request.data.get("kind")
+        params = request.data.get("params")
+        if kind not in JOB_HANDLERS or not isinstance(params, dict):
+            return Response(
+                {"error": f"Нужны kind ({', '.join(JOB_HANDLERS)}) и params"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return job_accepted_response(enqueue(kind, params))
+
+
+class JobDetailView(APIView):
+    """Состояние задачи: progress/total, result или error"""
+    def get(self, request, job_id):
+        job = Job.objects.filter(id=job_id).first()
+        if job is None:
+            return Response({"detail": f"Задача {job_id} не найдена"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job_payload(job))
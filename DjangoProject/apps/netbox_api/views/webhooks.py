@@ -0,0 +1,34 @@
+import json
+
+from django.conf import settings
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from apps.netbox_api.services.webhooks import (
+    SIGNATURE_HEADER,
+    NetBoxWebhookService,
+    WebhookError,
+    parse_event,
+    verify_signature,
+)
+
+
+class NetBoxWebhookView(APIView):
+    """
+    Приём вебхуков NetBox (create/update/delete) для обновления кэшей.
+    Подпись проверяется по сырому телу, поэтому JSON разбираем сами.
+    """
+    authentication_classes = []
+
+    def post(self, request):
+        body = request.body
+        if not verify_signature(body, request.headers.get(SIGNATURE_HEADER, ""), settings.NETBOX_WEBHOOK_SECRET):
+            return Response({"detail": "Неверная подпись вебхука"}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            event = parse_event(json.loads(body))
+        except (ValueError, WebhookError) as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(NetBoxWebhookService().apply(event))
@@ -0,0 +1,115 @@
+"""
+Быстрые JSON renderer/parser для DRF на orjson.
+
+Вывод байт-в-байт совпадает с rest_framework.renderers.JSONRenderer
+(компактные разделители, UNICODE_JSON, экранирование \\u2028/\\u2029,
+datetime/Decimal/UUID через DRF JSONEncoder). Если orjson не установлен
+или запрос не укладывается в быстрый путь (indent, ensure_ascii, non-strict,
+float в экспоненциальной записи, int > 64 бит) — работает обычный stdlib json.
+
+Исключение — NaN/Infinity: orjson пишет их как null, а DRF (STRICT_JSON)
+бросает ValueError. Проверять это — обходить весь ответ в Python, что
+медленнее самого stdlib-рендера, а в данных NetBox и БД таких float не бывает.
+Stdlib-путь (без orjson, fallback) по-прежнему бросает ValueError.
+"""
+import json
+import re
+
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import json as drf_json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - зависит от окружения
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+# orjson и stdlib по-разному пишут float < 1e-4 и >= 1e16 ("1e16" / "1e+16",
+# "0.00001" / "1e-05"). Регулярка начинается с литерала — поиск быстрый.
+_EXPONENT = re.compile(rb"e[-+0-9]")
+_DIGITS = frozenset(b"0123456789")
+
+
+def _float_mismatch(ret: bytes) -> bool:
+    """Есть ли в выводе float, который stdlib записал бы иначе (или похожий текст)"""
+    if b"0.0000" in ret:
+        return True
+    return any(ret[m.start() - 1] in _DIGITS for m in _EXPONENT.finditer(ret))
+
+
+_default = JSONEncoder().default
+
+
+def _orjson_dumps(data):
+    """bytes или None, если быстрый путь не гарантирует совпадения со stdlib"""
+    try:
+        ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+    except (TypeError, orjson.JSONEncodeError):
+        return None
+    if _float_mismatch(ret):
+        return None
+    return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+
+
+def dumps(data) -> bytes:
+    """Компактный JSON как у JSONRenderer с UNICODE_JSON=True и STRICT_JSON=True"""
+    if orjson is not None:
+        ret = _orjson_dumps(data)
+        if ret is not None:
+            return ret
+    ret = json.dumps(data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    return ret.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029").encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        if (
+            orjson is not None
+            and self.compact
+            and self.strict
+            and not self.ensure_ascii
+            and self.encoder_class is JSONEncoder
+            and self.get_indent(accepted_media_type, renderer_context or {}) is None
+        ):
+            ret = _orjson_dumps(data)
+            if ret is not None:
+                return ret
+
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+
+        raw = stream.read() if stream is not None else b""
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+
+        # orjson строже stdlib (NaN/Infinity, пустое тело, ...) —
+        # повторяем разбор stdlib, чтобы поведение и текст ошибки совпадали
+        try:
+            parse_constant = drf_json.strict_constant if self.strict else None
+            return json.loads(raw.decode(encoding), parse_constant=parse_constant)
+        except ValueError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
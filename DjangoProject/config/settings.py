@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/5.2/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
+import json
 import os
 from dotenv import load_dotenv
 from pathlib import Path
@@ -26,6 +27,97 @@ NETBOX_URL = os.getenv('NETBOX_URL_LOCAL')
 NETBOX_TOKEN = os.getenv('NETBOX_TOKEN_LOCAL_TWO')
 JIRA_URL = os.getenv('JIRA_URL')
 
+# Пул соединений к NetBox (общий для всего процесса)
+NETBOX_POOL_CONNECTIONS = int(os.getenv('NETBOX_POOL_CONNECTIONS', 4))
+NETBOX_POOL_MAXSIZE = int(os.getenv('NETBOX_POOL_MAXSIZE', 32))
+NETBOX_POOL_BLOCK = os.getenv('NETBOX_POOL_BLOCK', '0') == '1'
+NETBOX_CONNECT_TIMEOUT = float(os.getenv('NETBOX_CONNECT_TIMEOUT', 5))
+NETBOX_READ_TIMEOUT = float(os.getenv('NETBOX_READ_TIMEOUT', 60))
+NETBOX_TCP_KEEPALIVE = os.getenv('NETBOX_TCP_KEEPALIVE', '1') == '1'
+# read-таймаут (сек) отдельных операций или под-клиентов вместо NETBOX_READ_TIMEOUT,
+# JSON: {"assets.get_assets_data": 120, "general": 10}; это бюджет запроса вместе с повторами
+NETBOX_OPERATION_TIMEOUTS = json.loads(os.getenv('NETBOX_OPERATION_TIMEOUTS', '{}'))
+# Повторы GET при обрыве/таймауте/502-504: сколько раз и база паузы (сек, со случайным разбросом)
+NETBOX_RETRY_ATTEMPTS = int(os.getenv('NETBOX_RETRY_ATTEMPTS', 2))
+NETBOX_RETRY_BACKOFF = float(os.getenv('NETBOX_RETRY_BACKOFF', 0.2))
+# Circuit breaker: если за окно (сек) из не меньше MIN_REQUESTS запросов доля
+# отказов >= ERROR_RATE — отвечаем 503 без запроса в NetBox COOLDOWN сек
+NETBOX_BREAKER_ENABLED = os.getenv('NETBOX_BREAKER_ENABLED', '1') == '1'
+NETBOX_BREAKER_WINDOW = float(os.getenv('NETBOX_BREAKER_WINDOW', 30))
+NETBOX_BREAKER_MIN_REQUESTS = int(os.getenv('NETBOX_BREAKER_MIN_REQUESTS', 10))
+NETBOX_BREAKER_ERROR_RATE = float(os.getenv('NETBOX_BREAKER_ERROR_RATE', 0.5))
+NETBOX_BREAKER_COOLDOWN = float(os.getenv('NETBOX_BREAKER_COOLDOWN', 15))
+# Bulkhead: сколько запросов к NetBox одновременно на процесс (чтение / запись),
+# сколько ждущих держать в очереди и сколько ждать слот (сек), дальше 503
+NETBOX_BULKHEAD_ENABLED = os.getenv('NETBOX_BULKHEAD_ENABLED', '1') == '1'
+NETBOX_MAX_CONCURRENT_READS = int(os.getenv('NETBOX_MAX_CONCURRENT_READS', 16))
+NETBOX_MAX_CONCURRENT_WRITES = int(os.getenv('NETBOX_MAX_CONCURRENT_WRITES', 8))
+NETBOX_BULKHEAD_QUEUE = int(os.getenv('NETBOX_BULKHEAD_QUEUE', 100))
+NETBOX_BULKHEAD_TIMEOUT = float(os.getenv('NETBOX_BULKHEAD_TIMEOUT', 10))
+# Сколько id передавать в одном filter(id=[...]) (ограничение длины URL)
+NETBOX_ID_BATCH_SIZE = int(os.getenv('NETBOX_ID_BATCH_SIZE', 100))
+# Размер чанка для bulk PATCH/DELETE
+NETBOX_BULK_CHUNK_SIZE = int(os.getenv('NETBOX_BULK_CHUNK_SIZE', 100))
+# Создание assets: размер чанка и сколько POST отправлять параллельно
+NETBOX_CREATE_CHUNK_SIZE = int(os.getenv('NETBOX_CREATE_CHUNK_SIZE', 100))
+NETBOX_CREATE_MAX_WORKERS = int(os.getenv('NETBOX_CREATE_MAX_WORKERS', 4))
+# Чтение assets сырым JSON: ?fields= только нужных полей (NetBox 4+), размер страницы
+NETBOX_ASSET_FIELD_PROJECTION = os.getenv('NETBOX_ASSET_FIELD_PROJECTION', '1') == '1'
+NETBOX_RAW_PAGE_SIZE = int(os.getenv('NETBOX_RAW_PAGE_SIZE', 1000))
+# Потоки для параллельных шагов repair/modernization
+NETBOX_WORKFLOW_MAX_WORKERS = int(os.getenv('NETBOX_WORKFLOW_MAX_WORKERS', 16))
+# Потоки под async-клиент NetBox (сколько запросов одновременно "в полёте")
+NETBOX_ASYNC_MAX_WORKERS = int(os.getenv('NETBOX_ASYNC_MAX_WORKERS', 128))
+
+# Локальное зеркало NetBox (manage.py sync_netbox_mirror)
+NETBOX_MIRROR_READS = os.getenv('NETBOX_MIRROR_READS', '0') == '1'
+# если зеркало старше (сек) — читаем из NetBox напрямую; 0 = без ограничения
+NETBOX_MIRROR_MAX_AGE = int(os.getenv('NETBOX_MIRROR_MAX_AGE', 900))
+
+# Пагинация /inventory/assets_list/ (?limit=&cursor=) и потоковая выдача (?stream=1)
+ASSETS_PAGE_MAX_LIMIT = int(os.getenv('ASSETS_PAGE_MAX_LIMIT', 1000))
+ASSETS_STREAM_PAGE_SIZE = int(os.getenv('ASSETS_STREAM_PAGE_SIZE', 500))
+# ETag / If-None-Match -> 304 на assets_list, site_location, asset_types
+# (для assets_list из NetBox — лишний лёгкий запрос версии на каждый ответ)
+ETAG_HEADERS = os.getenv('ETAG_HEADERS', '1') == '1'
+# Кэш готовых (отрендеренных и сжатых gzip/br) JSON-ответов этих эндпоинтов
+# по ETag; работает только вместе с ETAG_HEADERS
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', '1') == '1'
+# предел памяти кэша на процесс, байт (все кодировки вместе)
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+# Приёмка поставки из Excel/CSV: сколько assets создавать одним POST
+DELIVERY_IMPORT_BATCH_SIZE = int(os.getenv('DELIVERY_IMPORT_BATCH_SIZE', 500))
+
+# Idempotency-Key для create/repair/modernization: сколько хранить ответ,
+# сколько ждать параллельный дубль и когда считать зависший запрос брошенным, сек
+IDEMPOTENCY_KEY_TTL = int(os.getenv('IDEMPOTENCY_KEY_TTL', 86400))
+IDEMPOTENCY_WAIT_TIMEOUT = int(os.getenv('IDEMPOTENCY_WAIT_TIMEOUT', 120))
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv('IDEMPOTENCY_LOCK_TIMEOUT', 900))
+
+# Фоновые задачи (manage.py run_jobs): операции больше этого кол-ва объектов
+# assets уходят в очередь и отвечают 202; ?background=1 — всегда
+JOBS_INLINE_MAX_OBJECTS = int(os.getenv('JOBS_INLINE_MAX_OBJECTS', 200))
+JOBS_POLL_INTERVAL = float(os.getenv('JOBS_POLL_INTERVAL', 1))
+# воркер отмечается у задачи раз в JOBS_HEARTBEAT_INTERVAL сек; задача без отметки
+# дольше JOBS_STALE_TIMEOUT сек — воркер умер, она помечается failed
+JOBS_HEARTBEAT_INTERVAL = float(os.getenv('JOBS_HEARTBEAT_INTERVAL', 10))
+JOBS_STALE_TIMEOUT = int(os.getenv('JOBS_STALE_TIMEOUT', 120))
+
+# Server-Timing: разбивка времени запроса (NetBox по операциям, journal, simplify, render)
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', '1') == '1'
+# запросы дольше порога (мс) пишутся в лог apps.netbox_api.timing одной JSON-строкой
+SLOW_REQUEST_THRESHOLD_MS = int(os.getenv('SLOW_REQUEST_THRESHOLD_MS', 2000))
+
+# Кэш справочников NetBox (сайты/локации, типы assets, роли/типы устройств), сек
+NETBOX_REFERENCE_CACHE_TTL = int(os.getenv('NETBOX_REFERENCE_CACHE_TTL', 300))
+# сколько ещё отдавать устаревшее значение, обновляя его в фоне
+NETBOX_REFERENCE_CACHE_STALE = int(os.getenv('NETBOX_REFERENCE_CACHE_STALE', 3600))
+# Секрет вебхуков NetBox (/inventory/webhooks/netbox/, подпись X-Hook-Signature);
+# пусто — вебхуки не принимаются. Вебхук правит reference_cache только того воркера,
+# который его принял, остальные видят изменения по NETBOX_REFERENCE_CACHE_TTL —
+# поэтому TTL с вебхуками не поднимать
+NETBOX_WEBHOOK_SECRET = os.getenv('NETBOX_WEBHOOK_SECRET', '')
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
@@ -62,6 +154,10 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.netbox_api.metrics.RequestMetricsMiddleware',
+    'apps.netbox_api.timing.ServerTimingMiddleware',
+    'apps.netbox_api.identity_map.NetBoxIdentityMapMiddleware',
+    'apps.netbox_api.resilience.NetBoxUnavailableMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -145,6 +241,16 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
     ),
+    # orjson, если установлен; иначе stdlib json (вывод одинаковый)
+    'DEFAULT_RENDERER_CLASSES': (
+        'config.fastjson.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'config.fastjson.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 SIMPLE_JWT = {